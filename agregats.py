@@ -0,0 +1,413 @@
+"""
+Agrégats incrémentaux des performances par sport et par jour.
+
+Les totaux, nombres de valeurs et premières/dernières valeurs sont tenus dans
+des matrices NumPy (une ligne par sport, une colonne par jour) mises à jour à
+chaque ajout. Les métriques d'une période se calculent alors en sommant les
+colonnes de la période, en O(jours) au lieu de parcourir toutes les séances.
+
+Des cumuls par semaine ISO et par mois sont matérialisés de la même façon
+pour les vues regroupées dans le temps (widget hebdomadaire, objectifs,
+intensité hebdomadaire).
+"""
+import numpy as np
+import pandas as pd
+
+from stockage import COLONNES_NUMERIQUES
+
+# Colonnes dont on garde la première et la dernière valeur (progression)
+COLONNES_PROGRESSION = ['distance_km', 'vitesse_moy']
+# Instants (secondes) des cellules sans séance
+INSTANT_MAX = np.iinfo(np.int64).max
+INSTANT_MIN = np.iinfo(np.int64).min
+
+# Volumes cumulés par période (en plus du nombre de séances)
+COLONNES_CUMULEES = ['distance_km', 'duree_min', 'calories', 'elevation_m']
+
+MARGE_JOURS = 366
+MARGE_PERIODES = {'semaine': 53, 'mois': 12}
+
+
+def _jour(valeur, arrondi_superieur=False):
+    """Numéro de jour (depuis 1970) d'une date, arrondi au jour complet"""
+    horodatage = pd.Timestamp(valeur)
+    jour = horodatage.normalize()
+    if arrondi_superieur and jour < horodatage:
+        jour += pd.Timedelta(days=1)
+    return int(jour.value // 86_400_000_000_000)
+
+
+def _index_periode(jours, periode):
+    """Indice de période (jour, semaine ISO commençant le lundi, mois) de numéros de jour"""
+    jours = np.asarray(jours, dtype=np.int64)
+    if periode == 'jour':
+        return jours
+    if periode == 'semaine':
+        # Le 1er janvier 1970 était un jeudi : +3 aligne les semaines sur le lundi
+        return (jours + 3) // 7
+    return jours.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+
+
+def _premier_jour(index, periode):
+    """Numéro du premier jour des périodes d'indice donné"""
+    index = np.asarray(index, dtype=np.int64)
+    if periode == 'jour':
+        return index
+    if periode == 'semaine':
+        return index * 7 - 3
+    return index.astype('datetime64[M]').astype('datetime64[D]').astype(np.int64)
+
+
+class CumulsPeriodiques:
+    """Cumuls sport × période (semaine ISO ou mois) des volumes d'entraînement"""
+
+    def __init__(self, periode):
+        self.periode = periode
+        self.reinitialiser()
+
+    def reinitialiser(self):
+        self.origine = 0
+        self.n_periodes = 0
+        self._allouer(1, 0)
+
+    def _allouer(self, n_lignes, n_periodes):
+        forme = (n_lignes, n_periodes)
+        self.seances = np.zeros(forme, dtype=np.int64)
+        self.sommes = {col: np.zeros(forme) for col in COLONNES_CUMULEES}
+
+    def _reserver(self, n_lignes, p_min, p_max):
+        """Agrandit la grille pour couvrir les lignes et périodes demandées"""
+        ancienne_forme = self.seances.shape
+        fin = self.origine + self.n_periodes
+        if self.n_periodes and n_lignes <= ancienne_forme[0] and self.origine <= p_min and p_max < fin:
+            return
+        marge = MARGE_PERIODES[self.periode]
+        n_lignes = max(n_lignes, ancienne_forme[0])
+        if self.n_periodes == 0:
+            origine, fin = p_min - marge, p_max + 1 + marge
+        else:
+            origine = p_min - marge if p_min < self.origine else self.origine
+            fin = p_max + 1 + marge if p_max >= fin else fin
+        anciennes = [self.seances, *self.sommes.values()]
+        decalage = self.origine - origine
+        self._allouer(n_lignes, fin - origine)
+        for ancienne, nouvelle in zip(anciennes, [self.seances, *self.sommes.values()]):
+            nouvelle[:ancienne_forme[0], decalage:decalage + ancienne_forme[1]] = ancienne
+        self.origine = origine
+        self.n_periodes = fin - origine
+
+    def ajouter_lot(self, jours, lignes, valeurs, n_lignes):
+        """Intègre des séances (numéros de jour, lignes de sport, valeurs par colonne)"""
+        periodes = _index_periode(jours, self.periode)
+        self._reserver(n_lignes, int(periodes.min()), int(periodes.max()))
+        cellules = lignes * self.n_periodes + (periodes - self.origine)
+        taille = self.seances.size
+        self.seances += np.bincount(cellules, minlength=taille).reshape(self.seances.shape)
+        for col in COLONNES_CUMULEES:
+            colonne = np.nan_to_num(np.asarray(valeurs[col], dtype=np.float64))
+            self.sommes[col] += np.bincount(cellules, weights=colonne, minlength=taille).reshape(self.seances.shape)
+
+    def extraire(self, lignes, p0, p1):
+        """Cumuls des périodes p0..p1 (incluses) sommés sur les lignes, zéros hors de la grille"""
+        n = p1 - p0 + 1
+        seances = np.zeros(n, dtype=np.int64)
+        sommes = {col: np.zeros(n) for col in COLONNES_CUMULEES}
+        lignes = lignes[lignes < self.seances.shape[0]]
+        debut, fin = max(p0, self.origine), min(p1, self.origine + self.n_periodes - 1)
+        if debut <= fin and len(lignes):
+            source = slice(debut - self.origine, fin - self.origine + 1)
+            cible = slice(debut - p0, fin - p0 + 1)
+            seances[cible] = self.seances[lignes, source].sum(axis=0)
+            for col in COLONNES_CUMULEES:
+                sommes[col][cible] = self.sommes[col][lignes, source].sum(axis=0)
+        return seances, sommes
+
+
+class AgregatsPerformances:
+    """Matrices sport × jour des totaux de performances"""
+
+    def __init__(self):
+        self.reinitialiser()
+
+    def _allouer(self, n_lignes, n_jours):
+        forme = (n_lignes, n_jours)
+        self.comptes = np.zeros(forme, dtype=np.int64)
+        self.sommes = {col: np.zeros(forme) for col in COLONNES_NUMERIQUES}
+        self.n_valeurs = {col: np.zeros(forme, dtype=np.int64) for col in COLONNES_NUMERIQUES}
+        # Séance la plus tôt et la plus tard de chaque cellule : instant (secondes), puis ordre d'insertion
+        self.instant_premier = np.full(forme, INSTANT_MAX, dtype=np.int64)
+        self.instant_dernier = np.full(forme, INSTANT_MIN, dtype=np.int64)
+        self.seq_premier = np.full(forme, -1, dtype=np.int64)
+        self.seq_dernier = np.full(forme, -1, dtype=np.int64)
+        self.premier = {col: np.full(forme, np.nan) for col in COLONNES_PROGRESSION}
+        self.dernier = {col: np.full(forme, np.nan) for col in COLONNES_PROGRESSION}
+
+    def _matrices(self):
+        yield self.comptes
+        yield self.instant_premier
+        yield self.instant_dernier
+        yield self.seq_premier
+        yield self.seq_dernier
+        for groupe in (self.sommes, self.n_valeurs, self.premier, self.dernier):
+            yield from groupe.values()
+
+    def _redimensionner(self, n_lignes, origine, n_jours):
+        """Recopie les matrices dans une grille plus grande"""
+        anciennes = list(self._matrices())
+        ancienne_forme = self.comptes.shape
+        decalage = self.origine - origine
+        self._allouer(n_lignes, n_jours)
+        for ancienne, nouvelle in zip(anciennes, self._matrices()):
+            nouvelle[:ancienne_forme[0], decalage:decalage + ancienne_forme[1]] = ancienne
+        self.origine = origine
+        self.n_jours = n_jours
+
+    def _lignes(self, sports):
+        """Lignes des sports (créées au besoin) ; None désigne un sport manquant"""
+        lignes = []
+        for sport in sports:
+            ligne = self.lignes_sports.get(sport)
+            if ligne is None:
+                ligne = self.lignes_sports[sport] = len(self.lignes_sports)
+            lignes.append(ligne)
+        return np.asarray(lignes, dtype=np.int64)
+
+    def _reserver(self, jour_min, jour_max):
+        """Agrandit la grille pour couvrir de nouveaux sports ou jours"""
+        n_lignes = self.comptes.shape[0]
+        if len(self.lignes_sports) > n_lignes:
+            n_lignes = max(len(self.lignes_sports), 2 * n_lignes)
+        if self.n_jours == 0:
+            self._redimensionner(n_lignes, jour_min - MARGE_JOURS, jour_max - jour_min + 1 + 2 * MARGE_JOURS)
+            return
+        fin = self.origine + self.n_jours
+        if jour_min >= self.origine and jour_max < fin and n_lignes == self.comptes.shape[0]:
+            return
+        origine = jour_min - MARGE_JOURS if jour_min < self.origine else self.origine
+        fin = jour_max + 1 + MARGE_JOURS if jour_max >= fin else fin
+        self._redimensionner(n_lignes, origine, fin - origine)
+
+    def ajouter_lot(self, dates, sports, valeurs):
+        """
+        Intègre un lot de séances.
+        dates: tableau datetime64, sports: libellés (None si manquant),
+        valeurs: dict colonne -> tableau de valeurs numériques
+        """
+        instants = np.asarray(dates, dtype='datetime64[s]')
+        dates = instants.astype('datetime64[D]')
+        valides = ~np.isnat(dates)
+        n_total = len(dates)
+        sequences = self.sequence + np.arange(n_total, dtype=np.int64)
+        self.sequence += n_total
+        if not valides.any():
+            return
+
+        jours = dates[valides].astype(np.int64)
+        codes, uniques = pd.factorize(pd.Series(sports, dtype=object)[valides], use_na_sentinel=False)
+        lignes = self._lignes([None if pd.isna(sport) else sport for sport in uniques])[codes]
+        self._reserver(int(jours.min()), int(jours.max()))
+
+        cellules = lignes * self.n_jours + (jours - self.origine)
+        taille = self.comptes.size
+        self.comptes += np.bincount(cellules, minlength=taille).reshape(self.comptes.shape)
+        for col in COLONNES_NUMERIQUES:
+            colonne = np.asarray(valeurs[col], dtype=np.float64)[valides]
+            presentes = ~np.isnan(colonne)
+            self.sommes[col] += np.bincount(
+                cellules[presentes], weights=colonne[presentes], minlength=taille
+            ).reshape(self.comptes.shape)
+            self.n_valeurs[col] += np.bincount(cellules[presentes], minlength=taille).reshape(self.comptes.shape)
+
+        for cumuls in self.cumuls_periodiques.values():
+            cumuls.ajouter_lot(jours, lignes, {col: np.asarray(valeurs[col])[valides] for col in COLONNES_CUMULEES},
+                               self.comptes.shape[0])
+
+        # Séances la plus tôt et la plus tard de chaque cellule (heure, puis ordre d'insertion) :
+        # le résultat ne dépend pas de l'ordre des lignes importées
+        sequences = sequences[valides]
+        instants = instants[valides].astype(np.int64)
+        ordre = np.lexsort((sequences, instants, cellules))
+        cellules_triees = cellules[ordre]
+        debuts = np.flatnonzero(np.r_[True, cellules_triees[1:] != cellules_triees[:-1]])
+        cellules_uniques = cellules_triees[debuts]
+        idx_premier = ordre[debuts]
+        idx_dernier = ordre[np.r_[debuts[1:], len(ordre)] - 1]
+
+        # Une séance déjà intégrée a une séquence plus petite : elle l'emporte à instant égal pour
+        # la première séance, la nouvelle l'emporte pour la dernière
+        plus_tot = instants[idx_premier] < self.instant_premier.reshape(-1)[cellules_uniques]
+        cibles, sources = cellules_uniques[plus_tot], idx_premier[plus_tot]
+        plus_tard = instants[idx_dernier] >= self.instant_dernier.reshape(-1)[cellules_uniques]
+        cibles_d, sources_d = cellules_uniques[plus_tard], idx_dernier[plus_tard]
+        self.instant_premier.reshape(-1)[cibles] = instants[sources]
+        self.seq_premier.reshape(-1)[cibles] = sequences[sources]
+        self.instant_dernier.reshape(-1)[cibles_d] = instants[sources_d]
+        self.seq_dernier.reshape(-1)[cibles_d] = sequences[sources_d]
+        for col in COLONNES_PROGRESSION:
+            colonne = np.asarray(valeurs[col], dtype=np.float64)[valides]
+            self.premier[col].reshape(-1)[cibles] = colonne[sources]
+            self.dernier[col].reshape(-1)[cibles_d] = colonne[sources_d]
+
+    def ajouter(self, date, sport, valeurs):
+        """Intègre une seule séance"""
+        self.ajouter_lot(
+            np.array([date], dtype='datetime64[s]'), [sport],
+            {col: [valeurs.get(col, np.nan)] for col in COLONNES_NUMERIQUES}
+        )
+
+    def reinitialiser(self):
+        """Vide tous les agrégats (remplacement des données)"""
+        self.lignes_sports = {}
+        self.origine = 0
+        self.n_jours = 0
+        self.sequence = 0
+        self._allouer(1, 0)
+        self.cumuls_periodiques = {periode: CumulsPeriodiques(periode) for periode in ('semaine', 'mois')}
+
+    def _lignes_selection(self, sports):
+        if sports is None:
+            return np.arange(self.comptes.shape[0])
+        return np.asarray([self.lignes_sports[s] for s in sports if s in self.lignes_sports], dtype=np.int64)
+
+    def _cumuls_jours(self, lignes, jour0, jour1):
+        """Cumuls des jours jour0..jour1 (inclus), jour par jour, sommés sur les lignes"""
+        fenetre = slice(jour0 - self.origine, jour1 - self.origine + 1)
+        seances = self.comptes[lignes, fenetre].sum(axis=0)
+        sommes = {col: self.sommes[col][lignes, fenetre].sum(axis=0) for col in COLONNES_CUMULEES}
+        return seances, sommes
+
+    def _fenetre(self, debut, fin):
+        """Premier et dernier numéros de jour (inclus) de la période dans la grille, None si vide"""
+        if self.n_jours == 0:
+            return None
+        dernier = self.origine + self.n_jours - 1
+        jour0 = self.origine if debut is None else max(self.origine, _jour(debut, arrondi_superieur=True))
+        jour1 = dernier if fin is None else min(dernier, _jour(fin))
+        return (jour0, jour1) if jour0 <= jour1 else None
+
+    def cumuls(self, periode='jour', sports=None, debut=None, fin=None, vides=False):
+        """
+        Tableau des cumuls par jour, semaine ISO ou mois (bornes incluses) :
+        colonnes periode (premier jour), seances et volumes de COLONNES_CUMULEES.
+        Les périodes tronquées par debut/fin sont recalculées depuis les cumuls quotidiens.
+        """
+        colonnes = ['periode', 'seances'] + COLONNES_CUMULEES
+        lignes = self._lignes_selection(sports)
+        fenetre = self._fenetre(debut, fin)
+        if fenetre is None or len(lignes) == 0:
+            return pd.DataFrame(columns=colonnes)
+        jour0, jour1 = fenetre
+
+        if periode == 'jour':
+            seances, sommes = self._cumuls_jours(lignes, jour0, jour1)
+            premiers_jours = np.arange(jour0, jour1 + 1)
+        else:
+            p0, p1 = int(_index_periode(jour0, periode)), int(_index_periode(jour1, periode))
+            seances, sommes = self.cumuls_periodiques[periode].extraire(lignes, p0, p1)
+            premiers_jours = _premier_jour(np.arange(p0, p1 + 1), periode)
+            derniers_jours = _premier_jour(np.arange(p0 + 1, p1 + 2), periode) - 1
+            # Périodes tronquées par debut/fin : recalculées depuis les cumuls quotidiens
+            for i in {0, len(premiers_jours) - 1}:
+                a, b = max(jour0, premiers_jours[i]), min(jour1, derniers_jours[i])
+                if a > premiers_jours[i] or b < derniers_jours[i]:
+                    seances_jours, sommes_jours = self._cumuls_jours(lignes, a, b)
+                    seances[i] = seances_jours.sum()
+                    for col in COLONNES_CUMULEES:
+                        sommes[col][i] = sommes_jours[col].sum()
+
+        tableau = pd.DataFrame({'periode': premiers_jours.astype('datetime64[D]'), 'seances': seances, **sommes})
+        tableau['periode'] = tableau['periode'].astype('datetime64[s]')
+        if not vides:
+            tableau = tableau[tableau['seances'] > 0].reset_index(drop=True)
+        return tableau
+
+    def moyennes(self, col, periode='semaine', sports=None, debut=None, fin=None):
+        """
+        Moyenne de col par jour, semaine ISO ou mois (bornes incluses), sur les valeurs
+        renseignées : colonnes periode (premier jour) et col, périodes sans valeur exclues.
+        """
+        lignes = self._lignes_selection(sports)
+        fenetre = self._fenetre(debut, fin)
+        if fenetre is None or len(lignes) == 0:
+            return pd.DataFrame(columns=['periode', col])
+        jour0, jour1 = fenetre
+        colonnes = slice(jour0 - self.origine, jour1 - self.origine + 1)
+        periodes = _index_periode(np.arange(jour0, jour1 + 1), periode)
+        codes = periodes - periodes[0]
+        sommes = np.bincount(codes, weights=self.sommes[col][lignes, colonnes].sum(axis=0))
+        n = np.bincount(codes, weights=self.n_valeurs[col][lignes, colonnes].sum(axis=0))
+        renseignees = np.flatnonzero(n > 0)
+        return pd.DataFrame({
+            'periode': _premier_jour(periodes[0] + renseignees, periode).astype('datetime64[D]').astype('datetime64[s]'),
+            col: sommes[renseignees] / n[renseignees],
+        })
+
+    def seances_par_sport(self, sports=None, debut=None, fin=None):
+        """Nombre de séances de chaque sport sur la période (bornes incluses), sports sans séance exclus"""
+        fenetre = self._fenetre(debut, fin)
+        noms = [sport for sport in self.lignes_sports if sport is not None and (sports is None or sport in sports)]
+        if fenetre is None or not noms:
+            return pd.Series(dtype=np.int64)
+        jour0, jour1 = fenetre
+        lignes = [self.lignes_sports[sport] for sport in noms]
+        comptes = self.comptes[lignes, jour0 - self.origine:jour1 - self.origine + 1].sum(axis=1)
+        repartition = pd.Series(comptes, index=noms)
+        return repartition[repartition > 0].sort_values(ascending=False)
+
+    def totaux(self, periode, date, sports=None):
+        """Totaux de la semaine ISO ou du mois contenant date (lecture directe des cumuls)"""
+        p = int(_index_periode(_jour(date), periode))
+        seances, sommes = self.cumuls_periodiques[periode].extraire(self._lignes_selection(sports), p, p)
+        return {'seances': int(seances[0]), **{col: float(sommes[col][0]) for col in COLONNES_CUMULEES}}
+
+    def metriques(self, sports=None, debut=None, fin=None):
+        """
+        Métriques clés d'une sélection de sports sur une période (bornes incluses).
+        Même dictionnaire que calculer_metriques_avancees.
+        """
+        if self.n_jours == 0:
+            return {}
+        lignes = self._lignes_selection(sports)
+        j0 = 0 if debut is None else max(0, _jour(debut, arrondi_superieur=True) - self.origine)
+        j1 = self.n_jours if fin is None else min(self.n_jours, _jour(fin) - self.origine + 1)
+        if len(lignes) == 0 or j0 >= j1:
+            return {}
+
+        comptes = self.comptes[lignes, j0:j1]
+        total = int(comptes.sum())
+        if total == 0:
+            return {}
+
+        def somme(col):
+            return float(self.sommes[col][lignes, j0:j1].sum())
+
+        def moyenne(col):
+            n = self.n_valeurs[col][lignes, j0:j1].sum()
+            return somme(col) / n if n > 0 else np.nan
+
+        metriques = {
+            'total_entrainements': total,
+            'duree_totale': somme('duree_min'),
+            'distance_totale': somme('distance_km'),
+            'calories_totales': somme('calories'),
+            'vitesse_moyenne': moyenne('vitesse_moy'),
+            'fc_moyenne': moyenne('frequence_cardiaque_moy'),
+            'elevation_totale': somme('elevation_m')
+        }
+
+        if total > 1:
+            # Séance la plus tôt du premier jour actif et la plus tard du dernier, tous sports confondus
+            jours_actifs = np.flatnonzero(comptes.sum(axis=0))
+            premier_jour, dernier_jour = j0 + jours_actifs[0], j0 + jours_actifs[-1]
+            ligne_premier = lignes[np.lexsort((
+                self.seq_premier[lignes, premier_jour], self.instant_premier[lignes, premier_jour]
+            ))[0]]
+            ligne_dernier = lignes[np.lexsort((
+                self.seq_dernier[lignes, dernier_jour], self.instant_dernier[lignes, dernier_jour]
+            ))[-1]]
+            for col, cle in [('distance_km', 'progression_distance'), ('vitesse_moy', 'progression_vitesse')]:
+                debut_val = self.premier[col][ligne_premier, premier_jour]
+                fin_val = self.dernier[col][ligne_dernier, dernier_jour]
+                metriques[cle] = (fin_val - debut_val) / debut_val * 100 if debut_val > 0 else 0
+
+        return metriques
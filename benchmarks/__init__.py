@@ -0,0 +1,13 @@
+"""
+Mesures de performance des calculs et des pages, à plusieurs tailles d'historique.
+
+Lancement depuis la racine du projet ::
+
+    python -m benchmarks                          # 1 000, 10 000 et 100 000 séances
+    python -m benchmarks --tailles 1000000 --sans-pages
+    python -m benchmarks --enregistrer            # nouvelles références
+
+Les temps sont comparés aux références de ``references.json`` ; une mesure
+plus lente que la référence au-delà du seuil est signalée comme régression
+(code de sortie 1).
+"""
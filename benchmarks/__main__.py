@@ -0,0 +1,81 @@
+"""Exécution des mesures et comparaison aux références (python -m benchmarks)"""
+import argparse
+import json
+import os
+import platform
+import sys
+
+from benchmarks.mesures import TAILLE_MAX_PDF, mesurer_calculs
+from benchmarks.pages import mesurer_pages
+
+REFERENCES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'references.json')
+TAILLES = [1_000, 10_000, 100_000]
+# Rapport temps / référence au-delà duquel une mesure est une régression
+SEUIL_REGRESSION = 1.5
+# Écart absolu minimal (secondes) : les mesures de quelques millisecondes sont trop bruitées
+ECART_MIN_S = 0.005
+
+
+def charger_references(chemin=REFERENCES):
+    """Références enregistrées : {'nom@taille': secondes}"""
+    if not os.path.exists(chemin):
+        return {}
+    with open(chemin, encoding='utf-8') as f:
+        return json.load(f)['temps']
+
+
+def enregistrer_references(temps, chemin=REFERENCES):
+    """Fusionne temps dans le fichier de références (les autres mesures sont gardées)"""
+    references = charger_references(chemin)
+    references.update(temps)
+    with open(chemin, 'w', encoding='utf-8') as f:
+        json.dump({
+            'machine': f"{platform.machine()} {platform.system()}, Python {platform.python_version()}",
+            'temps': dict(sorted(references.items(), key=lambda r: (int(r[0].split('@')[1]), r[0]))),
+        }, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+
+
+def est_regression(temps, reference, seuil=SEUIL_REGRESSION):
+    return temps > seuil * reference and temps - reference > ECART_MIN_S
+
+
+def main(arguments=None):
+    analyseur = argparse.ArgumentParser(prog='python -m benchmarks', description="Mesures de performance")
+    analyseur.add_argument('--tailles', type=int, nargs='+', default=TAILLES, help="nombres de séances")
+    analyseur.add_argument('-r', '--repetitions', type=int, default=3, help="répétitions par mesure (meilleur temps)")
+    analyseur.add_argument('--sans-pages', action='store_true', help="calculs seulement (pas d'AppTest)")
+    analyseur.add_argument('--pdf-max', type=int, default=TAILLE_MAX_PDF, help="taille maximale du rapport PDF")
+    analyseur.add_argument('--seuil', type=float, default=SEUIL_REGRESSION, help="rapport signalé comme régression")
+    analyseur.add_argument('--enregistrer', action='store_true', help="enregistre les temps comme références")
+    args = analyseur.parse_args(arguments)
+
+    references = charger_references()
+    temps, regressions = {}, []
+    for taille in args.tailles:
+        mesures = mesurer_calculs(taille, args.repetitions, args.pdf_max)
+        if not args.sans_pages:
+            mesures.update(mesurer_pages(taille, args.repetitions))
+        print(f"\n{taille:,} séances".replace(',', ' '))
+        for nom, secondes in mesures.items():
+            cle = f"{nom}@{taille}"
+            temps[cle] = secondes
+            ligne = f"  {nom:24s} {secondes * 1000:10.1f} ms"
+            if cle in references:
+                ligne += f"   réf. {references[cle] * 1000:10.1f} ms  ×{secondes / references[cle]:.2f}"
+                if est_regression(secondes, references[cle], args.seuil):
+                    ligne += "  ⚠ régression"
+                    regressions.append(cle)
+            print(ligne, flush=True)
+
+    if args.enregistrer:
+        enregistrer_references(temps)
+        print(f"\nRéférences enregistrées dans {REFERENCES}")
+    elif regressions:
+        print(f"\n{len(regressions)} régression(s) : {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
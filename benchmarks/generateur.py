@@ -0,0 +1,70 @@
+"""
+Historique synthétique de séances, au schéma canonique.
+
+Les valeurs suivent des profils plausibles par sport (vitesse, durée,
+dénivelé) pour que les analyses (records, zones, cumuls) travaillent sur
+des distributions réalistes. Le tirage est reproductible (graine).
+"""
+import numpy as np
+import pandas as pd
+
+from stockage import appliquer_schema
+
+# Sport -> (part des séances, vitesse moyenne km/h, écart-type, dénivelé moyen m/h)
+PROFILS_SPORTS = {
+    'Course à pied': (0.40, 11.0, 1.5, 120),
+    'Cyclisme': (0.30, 27.0, 4.0, 350),
+    'Natation': (0.12, 3.0, 0.4, 0),
+    'Marche': (0.08, 5.5, 0.6, 80),
+    'Randonnée': (0.05, 4.5, 0.7, 400),
+    'Fitness': (0.05, 0.0, 0.0, 0),
+}
+# Type d'entraînement -> (part, FC moyenne en % de la FC max)
+TYPES_ENTRAINEMENT = {
+    'Endurance': (0.55, 0.70),
+    'Récupération': (0.15, 0.60),
+    'Tempo': (0.15, 0.80),
+    'Fractionné': (0.10, 0.85),
+    'Compétition': (0.05, 0.90),
+}
+FC_MAX = 190
+
+
+def generer_historique(n, annees=10, graine=0, fin=None):
+    """
+    n séances réparties uniformément sur les `annees` années précédant fin
+    (aujourd'hui par défaut), triées par date, au schéma canonique.
+    """
+    rng = np.random.default_rng(graine)
+    fin = pd.Timestamp(fin if fin is not None else pd.Timestamp.now()).normalize()
+    secondes = rng.integers(0, int(annees * 365.25 * 86400), n)
+    dates = np.sort(fin.to_datetime64().astype('datetime64[s]') - secondes.astype('timedelta64[s]'))
+
+    sports = list(PROFILS_SPORTS)
+    parts, vitesses, ecarts, deniveles = (np.array(v, dtype=float) for v in zip(*PROFILS_SPORTS.values()))
+    i_sport = rng.choice(len(sports), n, p=parts / parts.sum())
+    types = list(TYPES_ENTRAINEMENT)
+    parts_types, intensites = (np.array(v) for v in zip(*TYPES_ENTRAINEMENT.values()))
+    i_type = rng.choice(len(types), n, p=parts_types / parts_types.sum())
+
+    duree = np.clip(rng.lognormal(np.log(50), 0.45, n), 10, 360).round()
+    vitesse = np.clip(rng.normal(vitesses[i_sport], ecarts[i_sport]), 0, None).round(1)
+    distance = (vitesse * duree / 60).round(2)
+    fc_moy = np.clip(rng.normal(FC_MAX * intensites[i_type], 6), 90, FC_MAX - 5).round()
+    fc_max = np.minimum(fc_moy + rng.uniform(8, 30, n), FC_MAX + 5).round()
+    calories = (duree * (fc_moy - 60) * rng.uniform(0.09, 0.12, n)).round()
+    elevation = (deniveles[i_sport] * duree / 60 * rng.uniform(0.3, 1.7, n)).round()
+
+    return appliquer_schema(pd.DataFrame({
+        'date': dates,
+        'sport': np.array(sports)[i_sport],
+        'type_entrainement': np.array(types)[i_type],
+        'duree_min': duree,
+        'distance_km': distance,
+        'calories': calories,
+        'frequence_cardiaque_moy': fc_moy,
+        'frequence_cardiaque_max': fc_max,
+        'vitesse_moy': vitesse,
+        'elevation_m': elevation,
+        'notes': '',
+    }))
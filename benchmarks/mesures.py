@@ -0,0 +1,83 @@
+"""
+Chronométrage des calculs sur un historique synthétique.
+
+Chaque mesure est le meilleur temps de plusieurs répétitions (le minimum
+est le moins sensible au bruit de la machine). La préparation (génération
+de l'historique, écriture du CSV, construction du tampon) n'est pas chronométrée.
+"""
+import os
+import tempfile
+import time
+
+from benchmarks.generateur import generer_historique
+from calculs import (
+    calculer_metriques_avancees, calculer_progression_objectifs, metriques_depuis_agregats, obtenir_records_personnels
+)
+from importation import importer_csv
+from tampon import TamponPerformances
+
+# Objectifs par défaut de l'application
+OBJECTIFS = {
+    'distance_hebdo': 50.0,
+    'distance_mensuel': 200.0,
+    'seances_hebdo': 4,
+    'calories_hebdo': 2000,
+    'duree_hebdo': 300
+}
+# Taille au-delà de laquelle le rapport PDF n'est plus mesuré (une page pour ~45 séances)
+TAILLE_MAX_PDF = 100_000
+
+
+def chronometrer(fonction, repetitions=3):
+    """Meilleur temps (secondes) de `repetitions` appels de fonction()"""
+    meilleur = float('inf')
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    return meilleur
+
+
+def hebdo_groupby(df):
+    """Intensité hebdomadaire par groupby pandas (calcul d'origine de la page Analyse)"""
+    semaines = df['date'].dt.to_period('W').astype(str)
+    return df.groupby(semaines).agg({'distance_km': 'sum', 'duree_min': 'sum', 'calories': 'sum'})
+
+
+def _importer(chemin):
+    with open(chemin, 'rb') as fichier:
+        importer_csv(fichier, TamponPerformances())
+
+
+def _rapport(df, tampon):
+    from rapport_pdf import generer_rapport_pdf, graphiques_rapport
+    metriques = metriques_depuis_agregats(tampon.agregats)
+    return generer_rapport_pdf(df, metriques, graphiques_rapport(tampon.agregats, None, None, None))
+
+
+def mesurer_calculs(taille, repetitions=3, taille_max_pdf=TAILLE_MAX_PDF):
+    """Temps (secondes) de chaque calcul sur un historique de `taille` séances : {nom: temps}"""
+    df = generer_historique(taille)
+    tampon = TamponPerformances(df)
+    df = tampon.vue()
+
+    mesures = {
+        'chargement_tampon': lambda: TamponPerformances(df),
+        'metriques': lambda: calculer_metriques_avancees(df),
+        'metriques_agregats': lambda: metriques_depuis_agregats(tampon.agregats),
+        'records': lambda: obtenir_records_personnels(df),
+        'progression_objectifs': lambda: calculer_progression_objectifs(df, OBJECTIFS),
+        'progression_agregats': lambda: calculer_progression_objectifs(df, OBJECTIFS, tampon.agregats),
+        'hebdo_groupby': lambda: hebdo_groupby(df),
+        'hebdo_agregats': lambda: tampon.agregats.cumuls('semaine'),
+    }
+    temps = {nom: chronometrer(fonction, repetitions) for nom, fonction in mesures.items()}
+    if taille <= taille_max_pdf:
+        # Plusieurs secondes par rapport : une seule génération suffit
+        temps['rapport_pdf'] = chronometrer(lambda: _rapport(df, tampon), 1)
+
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, 'historique.csv')
+        df.to_csv(chemin, index=False)
+        temps['import_csv'] = chronometrer(lambda: _importer(chemin), repetitions)
+    return temps
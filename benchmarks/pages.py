@@ -0,0 +1,68 @@
+"""
+Chronométrage des pages de l'application par le banc d'essai AppTest de Streamlit.
+
+Chaque taille est mesurée dans un processus séparé : le dossier de données
+(SPORTS_PERF_DATA) est lu à l'import de stockage.py, et chaque mesure part
+ainsi d'un interpréteur neuf. Le temps d'une page est le meilleur de
+plusieurs réexécutions complètes du script, une fois la page affichée.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Section du menu -> nom de la mesure
+PAGES = {
+    "📊 Tableau de bord": 'page_tableau_de_bord',
+    "➕ Ajouter Performance": 'page_ajout',
+    "📈 Analyse Avancée": 'page_analyse',
+    "⚡ Forme & Fatigue": 'page_forme',
+    "🎯 Objectifs & Records": 'page_objectifs',
+    "🧮 Calculateurs": 'page_calculateurs',
+    "📥 Import/Export": 'page_import_export',
+}
+
+
+def _chronometrer_pages(repetitions):
+    """Temps de démarrage et de chaque page (processus fils, données déjà en place)"""
+    from streamlit.testing.v1 import AppTest
+
+    def executer(app):
+        debut = time.perf_counter()
+        app.run()
+        if app.exception:
+            raise RuntimeError(app.exception[0].message)
+        return time.perf_counter() - debut
+
+    app = AppTest.from_file(os.path.join(RACINE, 'mainapp.py'), default_timeout=600)
+    temps = {'page_demarrage': executer(app)}
+    for section, nom in PAGES.items():
+        app.selectbox[0].set_value(section)
+        executer(app)
+        temps[nom] = min(executer(app) for _ in range(repetitions))
+    return temps
+
+
+def mesurer_pages(taille, repetitions=3):
+    """Temps (secondes) du démarrage et de chaque page avec `taille` séances enregistrées"""
+    from benchmarks.generateur import generer_historique
+    from stockage import StockagePerformances
+
+    with tempfile.TemporaryDirectory() as dossier:
+        StockagePerformances(dossier).sauvegarder(generer_historique(taille))
+        resultat = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.pages', str(repetitions)],
+            cwd=RACINE, env={**os.environ, 'SPORTS_PERF_DATA': dossier},
+            capture_output=True, text=True
+        )
+    if resultat.returncode != 0:
+        raise RuntimeError(resultat.stderr.strip().splitlines()[-1] if resultat.stderr.strip() else 'échec')
+    return json.loads(resultat.stdout.strip().splitlines()[-1])
+
+
+if __name__ == '__main__':
+    print(json.dumps(_chronometrer_pages(int(sys.argv[1]))))
@@ -0,0 +1,97 @@
+"""
+Cache des analyses, indexé par la version des données.
+
+Le tampon incrémente un compteur de version à chaque ajout, import ou
+changement de profil. Une analyse mise en cache est identifiée par
+(fonction, version, arguments) : tant que les données ne changent pas, le
+résultat est réutilisé d'une page et d'une interaction à l'autre ; dès que la
+version change, les anciens résultats sont abandonnés. Le nombre d'entrées est
+borné, les moins récemment utilisées étant évincées en premier.
+
+Les figures Plotly déjà construites sont gardées de la même façon, dans un
+cache séparé : une interaction qui ne change ni les données ni les filtres
+d'un graphique ne le reconstruit pas.
+
+Les résultats sont partagés : ils ne doivent pas être modifiés par l'appelant.
+"""
+import functools
+from collections import OrderedDict
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+TAILLE_MAX = 64
+# Les figures sont plus volumineuses que les analyses : cache plus petit
+TAILLE_MAX_FIGURES = 32
+
+
+def _figer(valeur):
+    """Forme hachable et stable d'un argument (listes, dictionnaires, dates)"""
+    if isinstance(valeur, (list, tuple, set, frozenset, np.ndarray)):
+        elements = [_figer(v) for v in valeur]
+        return tuple(sorted(elements, key=repr) if isinstance(valeur, (set, frozenset)) else elements)
+    if isinstance(valeur, dict):
+        return tuple(sorted((cle, _figer(v)) for cle, v in valeur.items()))
+    if isinstance(valeur, (datetime, date, np.datetime64)):
+        return pd.Timestamp(valeur)
+    return valeur
+
+
+class CacheAnalyses:
+    """Cache LRU de taille bornée, vidé lorsque la version des données change"""
+
+    def __init__(self, taille_max=TAILLE_MAX):
+        self.taille_max = taille_max
+        self.version = None
+        self.entrees = OrderedDict()
+        self.succes = 0
+        self.echecs = 0
+
+    def __len__(self):
+        return len(self.entrees)
+
+    def vider(self):
+        self.entrees.clear()
+
+    def obtenir(self, version, cle, calcul):
+        """Renvoie le résultat en cache pour (version, cle) ou le calcule et le mémorise"""
+        if version != self.version:
+            # Nouvelles données : tous les résultats précédents sont périmés
+            self.vider()
+            self.version = version
+        if cle in self.entrees:
+            self.entrees.move_to_end(cle)
+            self.succes += 1
+            return self.entrees[cle]
+        self.echecs += 1
+        resultat = calcul()
+        self.entrees[cle] = resultat
+        if len(self.entrees) > self.taille_max:
+            self.entrees.popitem(last=False)
+        return resultat
+
+
+def _mettre_en_cache(fonction, attribut):
+    @functools.wraps(fonction)
+    def enveloppe(tampon, *args, **kwargs):
+        cle = (fonction.__module__, fonction.__qualname__, _figer(args), _figer(kwargs))
+        cache = getattr(tampon, attribut)
+        return cache.obtenir(tampon.version, cle, lambda: fonction(tampon, *args, **kwargs))
+    return enveloppe
+
+
+def analyse_en_cache(fonction):
+    """
+    Décorateur pour les analyses dont le premier argument est le tampon :
+    le résultat est mis en cache selon la version du tampon et les autres arguments.
+    """
+    return _mettre_en_cache(fonction, 'cache')
+
+
+def figure_en_cache(fonction):
+    """
+    Comme analyse_en_cache, pour les fonctions qui construisent des figures Plotly :
+    elles ont leur propre cache (tampon.figures), pour ne pas évincer les analyses.
+    """
+    return _mettre_en_cache(fonction, 'figures')
@@ -0,0 +1,178 @@
+"""
+Calculs sur les performances, sans interface.
+
+Fonctions importables depuis n'importe quel processus (application
+Streamlit, ligne de commande, scripts) : elles ne dépendent que de pandas,
+NumPy et des modules de données du projet.
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from records import IndexRecords
+from stockage import COLONNES_NUMERIQUES, appliquer_schema
+
+
+def metriques_depuis_agregats(agregats, sports=None, debut=None, fin=None):
+    """
+    Métriques clés de la sélection (sports, debut, fin), lues dans les agrégats
+    incrémentaux sans parcourir les séances. Mêmes clés que calculer_metriques_avancees.
+    """
+    return agregats.metriques(sports=sports, debut=debut, fin=fin)
+
+
+def calculer_metriques_avancees(df):
+    """Calcule les métriques clés d'un ensemble de performances"""
+    if df.empty:
+        return {}
+    
+    metriques = {
+        'total_entrainements': len(df),
+        'duree_totale': float(df['duree_min'].sum()),
+        'distance_totale': float(df['distance_km'].sum()),
+        'calories_totales': float(df['calories'].sum()),
+        'vitesse_moyenne': float(df['vitesse_moy'].mean()),
+        'fc_moyenne': float(df['frequence_cardiaque_moy'].mean()),
+        'elevation_totale': float(df['elevation_m'].sum())
+    }
+    
+    if len(df) > 1:
+        df_sorted = df.sort_values('date')
+        metriques['progression_distance'] = (
+            (df_sorted['distance_km'].iloc[-1] - df_sorted['distance_km'].iloc[0]) / 
+            df_sorted['distance_km'].iloc[0] * 100 if df_sorted['distance_km'].iloc[0] > 0 else 0
+        )
+        metriques['progression_vitesse'] = (
+            (df_sorted['vitesse_moy'].iloc[-1] - df_sorted['vitesse_moy'].iloc[0]) / 
+            df_sorted['vitesse_moy'].iloc[0] * 100 if df_sorted['vitesse_moy'].iloc[0] > 0 else 0
+        )
+    
+    return metriques
+
+
+def calculer_zones_fc(fc_max, fc_repos=60):
+    zones = {
+        'Zone 1 (Récupération)': (fc_repos + 0.5 * (fc_max - fc_repos), fc_repos + 0.6 * (fc_max - fc_repos)),
+        'Zone 2 (Endurance)': (fc_repos + 0.6 * (fc_max - fc_repos), fc_repos + 0.7 * (fc_max - fc_repos)),
+        'Zone 3 (Tempo)': (fc_repos + 0.7 * (fc_max - fc_repos), fc_repos + 0.8 * (fc_max - fc_repos)),
+        'Zone 4 (Seuil)': (fc_repos + 0.8 * (fc_max - fc_repos), fc_repos + 0.9 * (fc_max - fc_repos)),
+        'Zone 5 (VO2 Max)': (fc_repos + 0.9 * (fc_max - fc_repos), fc_max)
+    }
+    return zones
+
+
+def calculer_trimp(duree_min, fc_moy, fc_repos, fc_max, sexe='Homme'):
+    """
+    Calcul du TRIMP (Training Impulse) - Mesure de la charge d'entraînement
+    Formule de Banister: TRIMP = durée × ΔFC × facteur d'intensité
+    """
+    if fc_max <= fc_repos:
+        return 0
+    
+    delta_fc = (fc_moy - fc_repos) / (fc_max - fc_repos)
+    delta_fc = max(0, min(1, delta_fc))  # Limiter entre 0 et 1
+    
+    # Facteur selon le sexe (coefficient exponentiel)
+    if sexe == 'Homme':
+        y = 0.64 * np.exp(1.92 * delta_fc)
+    else:
+        y = 0.86 * np.exp(1.67 * delta_fc)
+    
+    trimp = duree_min * delta_fc * y
+    return round(trimp, 1)
+
+
+def calculer_pace(distance_km, duree_min):
+    """Calcule l'allure en min/km"""
+    if distance_km <= 0:
+        return 0, 0
+    pace_total = duree_min / distance_km
+    pace_min = int(pace_total)
+    pace_sec = int((pace_total - pace_min) * 60)
+    return pace_min, pace_sec
+
+
+def predire_temps_course(distance_ref, temps_ref_min, distance_cible):
+    """
+    Prédit le temps pour une distance cible basé sur une performance de référence
+    Utilise la formule de Riegel: T2 = T1 × (D2/D1)^1.06
+    """
+    if distance_ref <= 0 or temps_ref_min <= 0:
+        return 0
+    temps_predit = temps_ref_min * (distance_cible / distance_ref) ** 1.06
+    return temps_predit
+
+
+def calculer_imc(poids, taille_cm):
+    """Calcule l'IMC (Indice de Masse Corporelle)"""
+    taille_m = taille_cm / 100
+    if taille_m <= 0:
+        return 0
+    return round(poids / (taille_m ** 2), 1)
+
+
+def calculer_fc_max_theorique(age):
+    """Calcule la FC max théorique selon la formule de Tanaka"""
+    return round(208 - 0.7 * age)
+
+
+def calculer_vo2max_estime(fc_repos, fc_max):
+    """Estime le VO2max basé sur la fréquence cardiaque (formule d'Uth)"""
+    if fc_repos <= 0:
+        return 0
+    return round(15.3 * (fc_max / fc_repos), 1)
+
+
+def obtenir_records_personnels(df):
+    """Identifie les records personnels par sport (une seule passe groupby/idxmax)"""
+    if df.empty:
+        return {}
+    
+    index = IndexRecords()
+    df = appliquer_schema(df)
+    index.ajouter_lot(
+        df['sport'].to_numpy(dtype=object), np.arange(len(df)), df['date'].to_numpy(),
+        {col: df[col].to_numpy() for col in COLONNES_NUMERIQUES}
+    )
+    return index.records()
+
+
+def calculer_progression_objectifs(df, objectifs, agregats=None):
+    """
+    Calcule la progression vers les objectifs.
+    Avec les agrégats, la semaine ISO et le mois en cours sont lus dans les cumuls matérialisés.
+    """
+    today = datetime.now()
+    start_of_week = today - timedelta(days=today.weekday())
+    start_of_month = today.replace(day=1)
+    
+    if agregats is not None:
+        semaine = agregats.totaux('semaine', today)
+        mois = agregats.totaux('mois', today)
+        return {
+            'distance_hebdo': semaine['distance_km'],
+            'distance_mensuel': mois['distance_km'],
+            'seances_hebdo': semaine['seances'],
+            'calories_hebdo': semaine['calories'],
+            'duree_hebdo': semaine['duree_min']
+        }
+    
+    if df.empty:
+        return {
+            'distance_hebdo': 0,
+            'distance_mensuel': 0,
+            'seances_hebdo': 0,
+            'calories_hebdo': 0,
+            'duree_hebdo': 0
+        }
+    
+    df_week = df[df['date'] >= start_of_week]
+    df_month = df[df['date'] >= start_of_month]
+    
+    return {
+        'distance_hebdo': float(df_week['distance_km'].sum()),
+        'distance_mensuel': float(df_month['distance_km'].sum()),
+        'seances_hebdo': len(df_week),
+        'calories_hebdo': float(df_week['calories'].sum()),
+        'duree_hebdo': float(df_week['duree_min'].sum())
+    }
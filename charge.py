@@ -0,0 +1,161 @@
+"""
+Charge d'entraînement calculée sur tout l'historique.
+
+Version colonnaire du TRIMP de Banister : une seule passe NumPy pour toutes
+les séances, à partir du profil (FC repos, FC max, sexe). Le modèle
+forme/fatigue (CTL/ATL/TSB) est tenu à jour de façon incrémentale.
+"""
+import numpy as np
+import pandas as pd
+
+
+def cle_profil_trimp(fc_repos, fc_max, sexe):
+    """Clé identifiant les paramètres du profil utilisés pour le TRIMP"""
+    return (float(fc_repos), float(fc_max), sexe)
+
+
+def calculer_trimp_lot(duree_min, fc_moy, fc_repos, fc_max, sexe='Homme'):
+    """
+    TRIMP de Banister pour des tableaux de séances (même formule que calculer_trimp).
+    Les séances sans durée ou sans FC moyenne donnent NaN.
+    """
+    duree_min = np.asarray(duree_min, dtype=np.float64)
+    fc_moy = np.asarray(fc_moy, dtype=np.float64)
+    if fc_max <= fc_repos:
+        return np.where(np.isnan(duree_min) | np.isnan(fc_moy), np.nan, 0.0).astype(np.float32)
+
+    delta_fc = np.clip((fc_moy - fc_repos) / (fc_max - fc_repos), 0, 1)
+    if sexe == 'Homme':
+        y = 0.64 * np.exp(1.92 * delta_fc)
+    else:
+        y = 0.86 * np.exp(1.67 * delta_fc)
+
+    return np.round(duree_min * delta_fc * y, 1).astype(np.float32)
+
+
+# Constantes de temps du modèle de Banister (jours)
+TAU_CTL = 42
+TAU_ATL = 7
+# Capacité initiale des séries quotidiennes (jours)
+CAPACITE_INITIALE_JOURS = 512
+
+
+def _ewma(charges, tau, initial=0.0):
+    """Moyenne exponentielle y[t] = y[t-1] + α (x[t] - y[t-1]) partant de initial"""
+    alpha = 1 - np.exp(-1 / tau)
+    serie = pd.Series(np.concatenate([[initial], charges]))
+    return serie.ewm(alpha=alpha, adjust=False).mean().to_numpy()[1:]
+
+
+class ModeleBanister:
+    """
+    Modèle forme/fatigue de Banister sur la charge quotidienne (somme des TRIMP).
+    CTL (charge chronique, 42 j) et ATL (charge aiguë, 7 j) sont des moyennes
+    exponentielles ; TSB (forme) = CTL - ATL de la veille. Un ajout ne recalcule
+    que les jours à partir de la date de la séance.
+    """
+
+    def __init__(self):
+        self.reinitialiser()
+
+    def reinitialiser(self):
+        self.origine = None
+        self.n_jours = 0
+        # Séries préallouées (capacité doublée au besoin) : seuls les n_jours premiers sont utilisés
+        self._charges = np.zeros(0)
+        self._ctl = np.zeros(0)
+        self._atl = np.zeros(0)
+
+    @property
+    def charges(self):
+        return self._charges[:self.n_jours]
+
+    @property
+    def ctl(self):
+        return self._ctl[:self.n_jours]
+
+    @property
+    def atl(self):
+        return self._atl[:self.n_jours]
+
+    def _recalculer(self, debut):
+        """Recalcule CTL/ATL à partir du jour d'indice debut (la queue seulement)"""
+        ctl0 = self._ctl[debut - 1] if debut > 0 else 0.0
+        atl0 = self._atl[debut - 1] if debut > 0 else 0.0
+        self.ctl[debut:] = _ewma(self.charges[debut:], TAU_CTL, ctl0)
+        self.atl[debut:] = _ewma(self.charges[debut:], TAU_ATL, atl0)
+
+    def _reserver(self, n_jours, decalage=0):
+        """
+        Garantit la place pour n_jours ; avec decalage, les jours existants sont
+        déplacés de decalage cases (jours ajoutés avant l'origine).
+        """
+        capacite = len(self._charges)
+        if n_jours <= capacite and decalage == 0:
+            return
+        capacite = max(capacite, CAPACITE_INITIALE_JOURS)
+        while capacite < n_jours:
+            capacite *= 2
+        anciennes = (self._charges, self._ctl, self._atl)
+        self._charges, self._ctl, self._atl = np.zeros(capacite), np.zeros(capacite), np.zeros(capacite)
+        for serie, ancienne in zip((self._charges, self._ctl, self._atl), anciennes):
+            serie[decalage:decalage + self.n_jours] = ancienne[:self.n_jours]
+
+    def _etendre(self, jour_min, jour_max):
+        """Agrandit les séries pour couvrir [jour_min, jour_max] ; renvoie le premier indice à recalculer"""
+        if self.origine is None:
+            self.origine = jour_min
+        debut = self.n_jours
+        if jour_min < self.origine:
+            avant = self.origine - jour_min
+            self._reserver(self.n_jours + avant, decalage=avant)
+            self.n_jours += avant
+            self.origine = jour_min
+            debut = 0
+        n_jours = jour_max - self.origine + 1
+        if n_jours > self.n_jours:
+            self._reserver(n_jours)
+            self.n_jours = n_jours
+        return debut
+
+    def ajouter_lot(self, dates, trimps):
+        """Ajoute la charge d'un lot de séances et met à jour la queue des séries"""
+        dates = np.asarray(dates, dtype='datetime64[D]')
+        trimps = np.asarray(trimps, dtype=np.float64)
+        valides = ~np.isnat(dates) & ~np.isnan(trimps)
+        if not valides.any():
+            return
+        jours = dates[valides].astype(np.int64)
+        jour_min, jour_max = int(jours.min()), int(jours.max())
+        debut = self._etendre(jour_min, jour_max)
+        indices = jours - self.origine
+        self.charges[:] += np.bincount(indices, weights=trimps[valides], minlength=self.n_jours)
+        self._recalculer(min(debut, int(indices.min())))
+
+    def ajouter(self, date, trimp):
+        self.ajouter_lot(np.array([date], dtype='datetime64[D]'), [trimp])
+
+    def reconstruire(self, dates, trimps):
+        """Recalcul complet (changement de profil)"""
+        self.reinitialiser()
+        self.ajouter_lot(dates, trimps)
+
+    def series(self, fin=None):
+        """
+        DataFrame quotidien date/charge/ctl/atl/tsb, prolongé sans charge jusqu'à fin
+        (par défaut aujourd'hui) pour montrer la récupération.
+        """
+        if self.origine is None:
+            return pd.DataFrame(columns=['date', 'charge', 'ctl', 'atl', 'tsb'])
+        charges, ctl, atl = self.charges, self.ctl, self.atl
+        fin = pd.Timestamp.now() if fin is None else pd.Timestamp(fin)
+        jour_fin = int(np.datetime64(fin.normalize(), 'D').astype(np.int64))
+        manquants = jour_fin - (self.origine + len(charges) - 1)
+        if manquants > 0:
+            zeros = np.zeros(manquants)
+            charges = np.concatenate([charges, zeros])
+            ctl = np.concatenate([ctl, _ewma(zeros, TAU_CTL, ctl[-1])])
+            atl = np.concatenate([atl, _ewma(zeros, TAU_ATL, atl[-1])])
+        tsb = np.concatenate([[0.0], ctl[:-1] - atl[:-1]])
+        dates = np.arange(self.origine, self.origine + len(charges)).astype('datetime64[D]')
+        return pd.DataFrame({'date': dates, 'charge': charges, 'ctl': ctl, 'atl': atl, 'tsb': tsb})
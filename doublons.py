@@ -0,0 +1,59 @@
+"""
+Détection des séances en double.
+
+Chaque séance est identifiée par un hachage 64 bits de sa clé naturelle
+(date, sport, durée, distance, FC moyenne). L'index garde ces clés dans un
+tableau NumPy trié : tester un lot de M séances contre N séances existantes
+coûte O(M log N) par recherche dichotomique, et l'insertion d'un lot se fait
+en une seule fusion. Les clés sont persistées avec l'instantané.
+"""
+import numpy as np
+import pandas as pd
+
+COLONNES_CLE = ['date', 'sport', 'duree_min', 'distance_km', 'frequence_cardiaque_moy']
+
+# Clé réservée aux séances dont le hachage n'est pas encore calculé
+CLE_ABSENTE = np.uint64(0)
+
+
+def calculer_cles(colonnes):
+    """
+    Hachage de la clé naturelle de chaque séance.
+    colonnes : tableaux des COLONNES_CLE au schéma canonique (sport en catégories).
+    """
+    cadre = pd.DataFrame({col: colonnes[col] for col in COLONNES_CLE}, copy=False)
+    cles = pd.util.hash_pandas_object(cadre, index=False).to_numpy(dtype=np.uint64)
+    return np.where(cles == CLE_ABSENTE, np.uint64(1), cles)
+
+
+class IndexDoublons:
+    """Ensemble trié des clés des séances connues"""
+
+    def __init__(self):
+        self.reinitialiser()
+
+    def reinitialiser(self):
+        self.cles = np.empty(0, dtype=np.uint64)
+
+    def __len__(self):
+        return len(self.cles)
+
+    def contient(self, cles):
+        """Masque des clés déjà présentes dans l'index"""
+        cles = np.asarray(cles, dtype=np.uint64)
+        if len(self.cles) == 0:
+            return np.zeros(len(cles), dtype=bool)
+        positions = np.searchsorted(self.cles, cles)
+        return self.cles[np.minimum(positions, len(self.cles) - 1)] == cles
+
+    def nouvelles(self, cles):
+        """Masque des séances à garder : absentes de l'index et première occurrence dans le lot"""
+        cles = np.asarray(cles, dtype=np.uint64)
+        premieres = np.zeros(len(cles), dtype=bool)
+        premieres[np.unique(cles, return_index=True)[1]] = True
+        return premieres & ~self.contient(cles)
+
+    def ajouter(self, cles):
+        """Insère des clés en conservant l'ordre (une seule fusion par lot)"""
+        cles = np.sort(np.asarray(cles, dtype=np.uint64))
+        self.cles = np.insert(self.cles, np.searchsorted(self.cles, cles), cles)
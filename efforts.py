@@ -0,0 +1,126 @@
+"""
+Courbe des meilleurs efforts (moyennes maximales par durée).
+
+Pour chaque durée de 5 s à 3 h, la meilleure moyenne (vitesse, FC, ...)
+tenue sur l'ensemble des séances ayant des flux seconde par seconde. Chaque
+séance est traitée par sommes cumulées : son intégrale est rééchantillonnée
+à la seconde, et la moyenne de toutes les fenêtres d'une durée d est
+``(F[d:] - F[:-d]) / d``, soit O(n) par durée au lieu de O(n·d).
+
+La courbe est fusionnée séance par séance (maximum élément par élément) :
+une nouvelle séance ne coûte que son propre calcul. Elle n'est reconstruite
+que si une séance détenant un record est remplacée ou supprimée.
+"""
+import numpy as np
+import pandas as pd
+
+from flux import ECART_MAX_ECHANTILLON_S
+
+# Durées de la courbe (secondes), de 5 s à 3 h
+DUREES_EFFORT = np.array([
+    5, 10, 15, 20, 30, 45, 60, 90, 120, 180, 240, 300, 420, 600, 900,
+    1200, 1800, 2700, 3600, 5400, 7200, 10800
+])
+
+# Champ des flux -> libellé
+CHAMPS_EFFORT = {'vitesse_kmh': 'Vitesse (km/h)', 'fc': 'Fréquence cardiaque (bpm)', 'cadence': 'Cadence'}
+
+
+def libelle_duree(secondes):
+    """Libellé court d'une durée : '45 s', '1 min 30', '2 h'"""
+    secondes = int(secondes)
+    if secondes < 60:
+        return f"{secondes} s"
+    if secondes < 3600:
+        minutes, reste = divmod(secondes, 60)
+        return f"{minutes} min {reste:02d}" if reste else f"{minutes} min"
+    heures, reste = divmod(secondes // 60, 60)
+    return f"{heures} h {reste:02d}" if reste else f"{heures} h"
+
+
+def integrale_seconde(temps, valeurs):
+    """
+    Intégrale cumulée des valeurs, rééchantillonnée à chaque seconde.
+    Une valeur vaut jusqu'à l'échantillon suivant ; les pauses sont ramenées
+    à ECART_MAX_ECHANTILLON_S. None si moins de deux échantillons valides.
+    """
+    temps = np.asarray(temps, dtype=np.float64)
+    valeurs = np.asarray(valeurs, dtype=np.float64)
+    valides = ~(np.isnan(temps) | np.isnan(valeurs))
+    temps, valeurs = temps[valides], valeurs[valides]
+    if len(temps) < 2:
+        return None
+    ecarts = np.clip(np.diff(temps), 0, ECART_MAX_ECHANTILLON_S)
+    temps_actif = np.concatenate(([0.0], np.cumsum(ecarts)))
+    cumul = np.concatenate(([0.0], np.cumsum(valeurs[:-1] * ecarts)))
+    return np.interp(np.arange(int(temps_actif[-1]) + 1), temps_actif, cumul)
+
+
+def meilleures_moyennes(temps, valeurs, durees=DUREES_EFFORT):
+    """Meilleure moyenne d'une séance pour chaque durée (NaN si la séance est plus courte)"""
+    moyennes = np.full(len(durees), np.nan)
+    cumul = integrale_seconde(temps, valeurs)
+    if cumul is None:
+        return moyennes
+    for i, duree in enumerate(durees):
+        if duree >= len(cumul):
+            break
+        moyennes[i] = (cumul[duree:] - cumul[:-duree]).max() / duree
+    return moyennes
+
+
+class CourbeEfforts:
+    """Meilleure moyenne par durée d'un champ des flux, sur un ensemble de séances"""
+
+    def __init__(self, champ, durees=DUREES_EFFORT):
+        self.champ = champ
+        self.durees = np.asarray(durees)
+        self.reinitialiser()
+
+    def reinitialiser(self):
+        self.valeurs = np.full(len(self.durees), np.nan)
+        self.seances = np.zeros(len(self.durees), dtype=np.uint64)
+        # Séances déjà fusionnées : {clé: état du fichier de flux}
+        self.fusionnees = {}
+
+    def fusionner(self, cle, moyennes):
+        """Intègre les meilleures moyennes d'une séance à la courbe"""
+        meilleures = moyennes > np.nan_to_num(self.valeurs, nan=-np.inf)
+        self.valeurs[meilleures] = moyennes[meilleures]
+        self.seances[meilleures] = cle
+
+    def mettre_a_jour(self, stockage, cles=None):
+        """
+        Fusionne les séances nouvelles ou modifiées de stockage (StockageFlux),
+        restreintes à cles si donné. Renvoie le nombre de séances calculées.
+        """
+        etats = stockage.etats()
+        if cles is not None:
+            cles = {int(cle) for cle in cles}
+            etats = {cle: etat for cle, etat in etats.items() if cle in cles}
+        perimees = {cle for cle, etat in self.fusionnees.items() if etats.get(cle) != etat}
+        if perimees:
+            detentrices = {int(cle) for cle in self.seances[~np.isnan(self.valeurs)]}
+            if perimees & detentrices:
+                # Un maximum ne se retire pas : reconstruction complète
+                self.reinitialiser()
+            else:
+                for cle in perimees:
+                    del self.fusionnees[cle]
+
+        a_calculer = [cle for cle in etats if cle not in self.fusionnees]
+        for cle in a_calculer:
+            flux = stockage.lire(cle)
+            if flux is not None:
+                self.fusionner(cle, meilleures_moyennes(flux['temps_s'], flux[self.champ], self.durees))
+            self.fusionnees[cle] = etats[cle]
+        return len(a_calculer)
+
+    def tableau(self):
+        """Courbe sous forme de DataFrame (duree_s, valeur, cle de la séance)"""
+        definies = ~np.isnan(self.valeurs)
+        return pd.DataFrame({
+            'duree_s': self.durees[definies],
+            'valeur': self.valeurs[definies],
+            'cle': self.seances[definies],
+        })
@@ -0,0 +1,215 @@
+"""
+Décodeur FIT (format binaire des montres et compteurs Garmin, Wahoo, ...).
+
+Lecture en pur Python, en un seul passage sur le contenu du fichier : les
+messages sont lus directement dans le tampon d'origine (``memoryview`` et
+``struct.unpack_from``), sans copie. Chaque message de définition est compilé
+une fois en ``struct.Struct`` ; les messages qui ne nous intéressent pas
+(points GPS, enregistrements seconde par seconde) sont simplement sautés.
+
+Seuls les résumés de séance (message ``session``) sont convertis en lignes
+de performances.
+"""
+import struct
+
+import numpy as np
+import pandas as pd
+
+from importation import importer_fichiers
+
+# Les horodatages FIT comptent les secondes depuis le 31/12/1989 00:00 UTC
+EPOQUE_FIT = 631065600
+
+MESSAGE_SESSION = 18
+
+# Numéro de type de base -> (format struct, valeur invalide)
+TYPES_BASE = {
+    0: ('B', 0xFF),                  # enum
+    1: ('b', 0x7F),                  # sint8
+    2: ('B', 0xFF),                  # uint8
+    3: ('h', 0x7FFF),                # sint16
+    4: ('H', 0xFFFF),                # uint16
+    5: ('i', 0x7FFFFFFF),            # sint32
+    6: ('I', 0xFFFFFFFF),            # uint32
+    8: ('f', None),                  # float32
+    9: ('d', None),                  # float64
+    10: ('B', 0),                    # uint8z
+    11: ('H', 0),                    # uint16z
+    12: ('I', 0),                    # uint32z
+    14: ('q', 0x7FFFFFFFFFFFFFFF),   # sint64
+    15: ('Q', 0xFFFFFFFFFFFFFFFF),   # uint64
+    16: ('Q', 0),                    # uint64z
+}
+TYPE_CHAINE = 7
+
+# Champs du message session : numéro -> (nom, échelle)
+CHAMPS_SESSION = {
+    2: ('start_time', 1),
+    5: ('sport', 1),
+    7: ('total_elapsed_time', 1000),
+    8: ('total_timer_time', 1000),
+    9: ('total_distance', 100),
+    11: ('total_calories', 1),
+    14: ('avg_speed', 1000),
+    16: ('avg_heart_rate', 1),
+    17: ('max_heart_rate', 1),
+    22: ('total_ascent', 1),
+    124: ('enhanced_avg_speed', 1000),
+    253: ('timestamp', 1),
+}
+
+# Sport FIT -> sport de l'application
+SPORTS_FIT = {
+    1: 'Course à pied',
+    2: 'Cyclisme',
+    4: 'Fitness',
+    5: 'Natation',
+    10: 'Fitness',
+    11: 'Marche',
+    17: 'Randonnée',
+}
+
+
+class _Definition:
+    """Message de définition compilé : structure des messages de données d'un type local"""
+    __slots__ = ('message', 'taille', 'structure', 'champs')
+
+    def __init__(self, message, grand_boutiste, champs, champs_developpeur):
+        formats, self.champs = [], []
+        for numero, taille, type_base in champs:
+            numero_type = type_base & 0x1F
+            format_type, invalide = TYPES_BASE.get(numero_type, ('s', None))
+            if format_type != 's' and struct.calcsize(format_type) == taille:
+                formats.append(format_type)
+                self.champs.append((numero, invalide, False))
+            else:
+                # Tableaux, chaînes et types inconnus : lus comme octets bruts
+                formats.append(f'{taille}s')
+                self.champs.append((numero, None, numero_type == TYPE_CHAINE))
+        # Les champs développeur sont sautés
+        formats.extend(f'{taille}x' for taille in champs_developpeur)
+        self.message = message
+        self.structure = struct.Struct(('>' if grand_boutiste else '<') + ''.join(formats))
+        self.taille = self.structure.size
+
+    def decoder(self, donnees, position):
+        """Valeurs du message de données lu à position ({numéro de champ: valeur})"""
+        valeurs = {}
+        for (numero, invalide, chaine), valeur in zip(self.champs, self.structure.unpack_from(donnees, position)):
+            if chaine:
+                valeur = valeur.split(b'\0', 1)[0].decode('utf-8', errors='replace')
+            elif valeur == invalide or (invalide is None and isinstance(valeur, float) and valeur != valeur):
+                continue
+            valeurs[numero] = valeur
+        return valeurs
+
+
+def _lire_definition(donnees, position, developpeur):
+    """Lit un message de définition ; renvoie (_Definition, position suivante)"""
+    grand_boutiste = donnees[position + 1] == 1
+    message, = struct.unpack_from('>H' if grand_boutiste else '<H', donnees, position + 2)
+    n_champs = donnees[position + 4]
+    position += 5
+    if position + 3 * n_champs > len(donnees):
+        # Les tranches ne lèvent pas d'IndexError : une définition coupée donnerait des champs incomplets
+        raise ValueError("Fichier FIT tronqué ou corrompu (définition incomplète)")
+    champs = [tuple(donnees[position + 3 * i:position + 3 * i + 3]) for i in range(n_champs)]
+    position += 3 * n_champs
+    champs_developpeur = []
+    if developpeur:
+        n_champs_developpeur = donnees[position]
+        position += 1
+        champs_developpeur = [donnees[position + 3 * i + 1] for i in range(n_champs_developpeur)]
+        position += 3 * n_champs_developpeur
+    return _Definition(message, grand_boutiste, champs, champs_developpeur), position
+
+
+def iterer_messages(donnees, messages=None):
+    """
+    Parcourt les messages de données d'un fichier FIT (éventuellement chaîné).
+    Produit (numéro global du message, {numéro de champ: valeur}) pour les messages demandés ;
+    lève ValueError si le fichier est invalide, tronqué ou corrompu.
+    """
+    try:
+        yield from _parcourir_messages(donnees, messages)
+    except (IndexError, struct.error) as e:
+        # Lecture au-delà de la fin des données : message ou définition tronqué
+        raise ValueError(f"Fichier FIT tronqué ou corrompu ({e})") from e
+
+
+def _parcourir_messages(donnees, messages):
+    donnees = memoryview(donnees)
+    debut = 0
+    while debut + 12 <= len(donnees):
+        taille_entete = donnees[debut]
+        if bytes(donnees[debut + 8:debut + 12]) != b'.FIT':
+            raise ValueError("Fichier FIT invalide (signature .FIT absente)")
+        taille_donnees, = struct.unpack_from('<I', donnees, debut + 4)
+        position = debut + taille_entete
+        fin = position + taille_donnees
+        if fin > len(donnees):
+            raise ValueError("Fichier FIT tronqué")
+
+        definitions = {}
+        while position < fin:
+            entete = donnees[position]
+            position += 1
+            if entete & 0x80:
+                # En-tête à horodatage compressé : message de données, type local sur 2 bits
+                local = (entete >> 5) & 0x03
+            elif entete & 0x40:
+                definitions[entete & 0x0F], position = _lire_definition(donnees, position, entete & 0x20)
+                continue
+            else:
+                local = entete & 0x0F
+            definition = definitions.get(local)
+            if definition is None:
+                raise ValueError(f"Message FIT sans définition (type local {local})")
+            if messages is None or definition.message in messages:
+                yield definition.message, definition.decoder(donnees, position)
+            position += definition.taille
+        # CRC de fin de fichier
+        debut = fin + 2
+
+
+def _seance_vers_performance(champs, nom_fichier=''):
+    """Convertit un message session en performance (dict des colonnes de l'application)"""
+    valeurs = {nom: champs[numero] / echelle for numero, (nom, echelle) in CHAMPS_SESSION.items() if numero in champs}
+    horodatage = valeurs.get('start_time', valeurs.get('timestamp'))
+    duree_s = valeurs.get('total_timer_time', valeurs.get('total_elapsed_time'))
+    distance_m = valeurs.get('total_distance')
+    vitesse = valeurs.get('enhanced_avg_speed', valeurs.get('avg_speed'))
+    if vitesse is None and distance_m is not None and duree_s:
+        vitesse = distance_m / duree_s
+    return {
+        'date': pd.Timestamp(EPOQUE_FIT + horodatage, unit='s') if horodatage is not None else pd.NaT,
+        'sport': SPORTS_FIT.get(champs.get(5), 'Autre'),
+        'type_entrainement': None,
+        'duree_min': duree_s / 60 if duree_s is not None else np.nan,
+        'distance_km': distance_m / 1000 if distance_m is not None else np.nan,
+        'calories': valeurs.get('total_calories', np.nan),
+        'frequence_cardiaque_moy': valeurs.get('avg_heart_rate', np.nan),
+        'frequence_cardiaque_max': valeurs.get('max_heart_rate', np.nan),
+        'vitesse_moy': vitesse * 3.6 if vitesse is not None else np.nan,
+        'elevation_m': valeurs.get('total_ascent', np.nan),
+        'notes': f"Import FIT : {nom_fichier}" if nom_fichier else "Import FIT"
+    }
+
+
+def lire_seances_fit(donnees, nom_fichier=''):
+    """Performances (liste de dicts) des résumés de séance d'un fichier FIT"""
+    return [
+        _seance_vers_performance(champs, nom_fichier)
+        for _, champs in iterer_messages(donnees, messages=(MESSAGE_SESSION,))
+    ]
+
+
+def importer_fit(fichiers, tampon, dedoublonner=True):
+    """
+    Importe une liste de fichiers FIT (objets avec .name et .getvalue()) dans le tampon.
+    Renvoie (séances importées, doublons ignorés, {nom de fichier: erreur}).
+    """
+    return importer_fichiers(
+        fichiers, lambda fichier: lire_seances_fit(fichier.getvalue(), fichier.name),
+        tampon, (ValueError,), dedoublonner
+    )
@@ -0,0 +1,204 @@
+"""
+Stockage des données seconde par seconde (flux) des séances.
+
+Chaque séance peut avoir ses échantillons (temps, FC, vitesse, altitude,
+cadence) dans un fichier NumPy ``flux/<clé>.npy`` : un tableau structuré de
+flottants 32 bits (20 octets par échantillon). La clé est l'identifiant de la
+séance (aléatoire, persisté avec l'instantané et le journal) : le lien survit
+aux rechargements et aux tris, et deux séances identiques ont chacune leurs flux.
+Les flux des séances qui ne sont plus dans les données sont supprimés.
+
+Les fichiers sont ouverts en mémoire projetée (``mmap_mode='r'``) : lire les
+flux d'une séance ne charge ni les autres séances ni les colonnes inutilisées.
+
+Le temps passé dans chaque zone de FC est calculé pour toutes les séances
+d'un coup et gardé en cache par séance.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from stockage import DOSSIER_DONNEES
+
+DOSSIER_FLUX = os.path.join(DOSSIER_DONNEES, 'flux')
+
+CHAMPS_FLUX = ['temps_s', 'fc', 'vitesse_kmh', 'altitude_m', 'cadence']
+TYPE_FLUX = np.dtype([(champ, np.float32) for champ in CHAMPS_FLUX])
+
+# Un écart plus long entre deux échantillons est une pause : il ne compte que pour cette durée
+ECART_MAX_ECHANTILLON_S = 30
+# Nombre de jeux de zones différents gardés en cache
+MAX_JEUX_ZONES = 8
+
+# Noms de colonnes reconnus dans les CSV d'échantillons -> champ
+ALIAS_FLUX = {
+    'temps_s': 'temps_s', 'temps': 'temps_s', 'time': 'temps_s', 'secs': 'temps_s',
+    'seconds': 'temps_s', 'timestamp': 'temps_s',
+    'fc': 'fc', 'hr': 'fc', 'heartrate': 'fc', 'heart_rate': 'fc',
+    'vitesse_kmh': 'vitesse_kmh', 'vitesse': 'vitesse_kmh', 'kph': 'vitesse_kmh', 'speed_kmh': 'vitesse_kmh',
+    'altitude_m': 'altitude_m', 'altitude': 'altitude_m', 'alt': 'altitude_m', 'elevation': 'altitude_m',
+    'cadence': 'cadence', 'cad': 'cadence', 'rpm': 'cadence',
+}
+
+
+def lire_csv_flux(fichier):
+    """
+    Lit un CSV d'échantillons (une ligne par échantillon) en tableau structuré TYPE_FLUX.
+    Le temps peut être en secondes ou en horodatages ; il est ramené au début de la séance.
+    """
+    df = pd.read_csv(fichier)
+    df.columns = [ALIAS_FLUX.get(str(col).strip().lower(), col) for col in df.columns]
+    if 'temps_s' not in df:
+        raise ValueError("Colonne de temps manquante (temps_s, time, secs...)")
+
+    temps = pd.to_numeric(df['temps_s'], errors='coerce')
+    if temps.isna().all():
+        # Horodatages : secondes écoulées depuis le premier échantillon
+        horodatages = pd.to_datetime(df['temps_s'], errors='coerce', utc=True)
+        temps = (horodatages - horodatages.min()).dt.total_seconds()
+    df = df.assign(temps_s=temps)[temps.notna()].sort_values('temps_s', kind='stable')
+    if df.empty:
+        raise ValueError("Aucun échantillon avec un temps valide")
+
+    flux = np.empty(len(df), dtype=TYPE_FLUX)
+    for champ in CHAMPS_FLUX:
+        valeurs = df[champ] if champ in df else pd.Series(np.nan, index=df.index)
+        flux[champ] = pd.to_numeric(valeurs, errors='coerce').to_numpy(dtype=np.float32)
+    flux['temps_s'] -= flux['temps_s'][0]
+    return flux
+
+
+def temps_en_zones(liste_flux, bornes):
+    """
+    Secondes passées dans chaque zone de FC pour une liste de flux, en un seul calcul
+    sur tous les échantillons (np.digitize puis np.bincount pondéré par la durée).
+    bornes : FC de début de chaque zone. Colonne 0 : sous la première zone.
+    """
+    n_cases = len(bornes) + 1
+    if not liste_flux:
+        return np.zeros((0, n_cases))
+    fc = np.concatenate([f['fc'] for f in liste_flux])
+    # Durée d'un échantillon : temps jusqu'au suivant (0 pour le dernier)
+    durees = np.concatenate([np.diff(f['temps_s'], append=f['temps_s'][-1]) for f in liste_flux])
+    seances = np.repeat(np.arange(len(liste_flux)), [len(f) for f in liste_flux])
+    valides = ~np.isnan(fc)
+    cases = seances[valides] * n_cases + np.digitize(fc[valides], bornes)
+    secondes = np.bincount(
+        cases, weights=np.clip(durees[valides], 0, ECART_MAX_ECHANTILLON_S), minlength=len(liste_flux) * n_cases
+    )
+    return secondes.reshape(len(liste_flux), n_cases)
+
+
+class StockageFlux:
+    """Un fichier .npy (mémoire projetée) par séance, nommé d'après sa clé"""
+
+    def __init__(self, dossier=DOSSIER_FLUX):
+        self.dossier = dossier
+        os.makedirs(dossier, exist_ok=True)
+        # Temps en zones déjà calculés : {bornes: {clé: secondes par zone}}
+        self._zones = {}
+
+    def _chemin(self, cle):
+        return os.path.join(self.dossier, f'{int(cle):016x}.npy')
+
+    def cles(self):
+        """Clés des séances ayant des flux"""
+        return {
+            int(entree.name[:-4], 16) for entree in os.scandir(self.dossier)
+            if entree.name.endswith('.npy') and len(entree.name) == 20
+        }
+
+    def etats(self):
+        """État du fichier de flux de chaque séance : {clé: (inode, date de modification en ns)}"""
+        return {
+            int(entree.name[:-4], 16): (entree.inode(), entree.stat().st_mtime_ns) for entree in os.scandir(self.dossier)
+            if entree.name.endswith('.npy') and len(entree.name) == 20
+        }
+
+    def contient(self, cle):
+        return os.path.exists(self._chemin(cle))
+
+    def enregistrer(self, cle, flux):
+        """Écrit les flux d'une séance (remplace les précédents)"""
+        flux = np.asarray(flux, dtype=TYPE_FLUX)
+        chemin = self._chemin(cle)
+        chemin_tmp = chemin + '.tmp'
+        with open(chemin_tmp, 'wb') as f:
+            np.save(f, flux)
+        os.replace(chemin_tmp, chemin)
+        self._oublier(cle)
+
+    def lire(self, cle):
+        """Flux d'une séance en mémoire projetée (lecture seule), None si absents"""
+        chemin = self._chemin(cle)
+        if not os.path.exists(chemin):
+            return None
+        return np.load(chemin, mmap_mode='r')
+
+    def supprimer(self, cle):
+        chemin = self._chemin(cle)
+        if os.path.exists(chemin):
+            os.remove(chemin)
+        self._oublier(cle)
+
+    def purger(self, cles):
+        """Supprime les flux des séances données (séances retirées des données)"""
+        for cle in set(int(cle) for cle in cles) & self.cles():
+            self.supprimer(cle)
+
+    def nettoyer(self, cles, avant_ns):
+        """
+        Supprime les flux orphelins : séances absentes de cles, fichier antérieur à avant_ns
+        (moment du chargement des données ; un fichier plus récent peut appartenir à une
+        séance ajoutée entre-temps par une autre session). Renvoie le nombre supprimé.
+        """
+        cles = set(int(cle) for cle in cles)
+        orphelines = [
+            cle for cle, chemin in ((cle, self._chemin(cle)) for cle in self.cles() - cles)
+            if os.stat(chemin).st_mtime_ns < avant_ns
+        ]
+        for cle in orphelines:
+            self.supprimer(cle)
+        return len(orphelines)
+
+    def migrer(self, cles_naturelles, identifiants):
+        """
+        Renomme les flux encore nommés d'après la clé naturelle de leur séance
+        (ancien format) avec l'identifiant de la première séance de cette clé.
+        """
+        connus = set(int(ident) for ident in identifiants)
+        premieres = {}
+        for cle, ident in zip(cles_naturelles.tolist(), identifiants.tolist()):
+            premieres.setdefault(cle, ident)
+        for cle in self.cles() - connus:
+            if cle in premieres:
+                os.replace(self._chemin(cle), self._chemin(premieres[cle]))
+                self._oublier(cle)
+
+    def _oublier(self, cle):
+        for par_cle in self._zones.values():
+            par_cle.pop(int(cle), None)
+
+    def temps_en_zones(self, cles, bornes):
+        """
+        Secondes par zone (une ligne par clé) ; chaque séance n'est calculée
+        qu'une fois par jeu de zones, les séances manquantes en un seul lot.
+        """
+        bornes = tuple(float(borne) for borne in bornes)
+        par_cle = self._zones.pop(bornes, {})
+        # Le jeu de zones utilisé passe en dernier (le plus ancien est évincé en premier)
+        self._zones[bornes] = par_cle
+        if len(self._zones) > MAX_JEUX_ZONES:
+            del self._zones[next(iter(self._zones))]
+
+        cles = [int(cle) for cle in cles]
+        manquantes = [cle for cle in dict.fromkeys(cles) if cle not in par_cle]
+        if manquantes:
+            liste_flux = [self.lire(cle) for cle in manquantes]
+            presentes = [(cle, f) for cle, f in zip(manquantes, liste_flux) if f is not None and len(f)]
+            secondes = temps_en_zones([f for _, f in presentes], bornes)
+            for (cle, _), ligne in zip(presentes, secondes):
+                par_cle[cle] = ligne
+        vide = np.zeros(len(bornes) + 1)
+        return np.array([par_cle.get(cle, vide) for cle in cles]).reshape(len(cles), len(bornes) + 1)
@@ -0,0 +1,102 @@
+"""
+Import de performances depuis un fichier CSV, par lots.
+
+Le fichier n'est jamais chargé en entier dans un DataFrame : il est lu par
+blocs de ``TAILLE_LOT`` lignes, chaque bloc étant validé, converti au schéma
+canonique puis ajouté au tampon avant de lire le suivant. La mémoire de
+travail reste ainsi la même quelle que soit la taille du fichier.
+"""
+import pandas as pd
+
+from stockage import COLONNES, COLONNES_CATEGORIELLES, COLONNES_NUMERIQUES, appliquer_schema
+
+TAILLE_LOT = 50_000
+
+# Types de lecture : les textes répétés sont lus directement en catégories
+TYPES_LECTURE = {**{col: 'category' for col in COLONNES_CATEGORIELLES}, 'notes': 'object'}
+
+
+def _lire(fichier, **options):
+    return pd.read_csv(
+        fichier, usecols=lambda col: col in COLONNES, dtype=TYPES_LECTURE, **options
+    )
+
+
+def lire_apercu(fichier, n=10):
+    """Premières lignes du fichier, sans lire le reste"""
+    apercu = _lire(fichier, nrows=n)
+    fichier.seek(0)
+    return apercu
+
+
+def preparer_lot(lot):
+    """
+    Valide et convertit un bloc : les lignes sans date valide sont rejetées,
+    les valeurs numériques manquantes des colonnes présentes valent 0.
+    Renvoie (bloc converti, nombre de lignes rejetées).
+    """
+    colonnes_presentes = [col for col in COLONNES_NUMERIQUES if col in lot.columns]
+    lot = appliquer_schema(lot)
+    valides = lot['date'].notna()
+    rejetees = int((~valides).sum())
+    if rejetees:
+        lot = lot[valides]
+    lot[colonnes_presentes] = lot[colonnes_presentes].fillna(0)
+    return lot, rejetees
+
+
+def importer_csv(fichier, tampon, taille_lot=TAILLE_LOT, progression=None, dedoublonner=False):
+    """
+    Importe un CSV dans le tampon par blocs de taille_lot lignes.
+    progression(fraction) est appelée après chaque bloc (fraction du fichier lue).
+    Avec dedoublonner, les séances déjà connues du tampon (clé naturelle) sont ignorées.
+    Renvoie (lignes importées, lignes rejetées, doublons ignorés).
+    """
+    fichier.seek(0, 2)
+    taille_fichier = fichier.tell() or 1
+    fichier.seek(0)
+
+    importees = rejetees = doublons = 0
+    with _lire(fichier, chunksize=taille_lot) as lecteur:
+        for lot in lecteur:
+            if 'date' not in lot.columns:
+                raise ValueError("Colonne 'date' manquante dans le fichier")
+            lot, n_rejetees = preparer_lot(lot)
+            if dedoublonner:
+                lot, n_doublons = tampon.filtrer_doublons(lot)
+                doublons += n_doublons
+            tampon.ajouter_lot(lot)
+            importees += len(lot)
+            rejetees += n_rejetees
+            if progression is not None:
+                progression(min(fichier.tell() / taille_fichier, 1.0))
+    return importees, rejetees, doublons
+
+
+def ajouter_seances(seances, tampon, dedoublonner=True):
+    """Ajoute des performances (liste de dicts) au tampon ; renvoie (importées, doublons ignorés)"""
+    lot = appliquer_schema(pd.DataFrame(seances, columns=COLONNES))
+    lot = lot[lot['date'].notna()]
+    doublons = 0
+    if dedoublonner:
+        lot, doublons = tampon.filtrer_doublons(lot)
+    tampon.ajouter_lot(lot)
+    return len(lot), doublons
+
+
+def importer_fichiers(fichiers, lecteur, tampon, erreurs_lecture=(ValueError,), dedoublonner=True):
+    """
+    Importe des fichiers d'activité : lecteur(fichier) renvoie la liste de leurs performances.
+    Un fichier illisible est signalé sans interrompre les autres.
+    Renvoie (séances importées, doublons ignorés, {nom de fichier: erreur}).
+    """
+    seances, erreurs = [], {}
+    for fichier in fichiers:
+        try:
+            seances.extend(lecteur(fichier))
+        except erreurs_lecture as e:
+            erreurs[fichier.name] = str(e)
+    if not seances:
+        return 0, 0, erreurs
+    importees, doublons = ajouter_seances(seances, tampon, dedoublonner)
+    return importees, doublons, erreurs
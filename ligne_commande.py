@@ -0,0 +1,146 @@
+"""
+Traitement par lots en ligne de commande, sans interface.
+
+Pour chaque fichier CSV d'athlète, calcule les métriques clés et les records
+personnels, puis écrit dans le dossier de sortie :
+
+- ``<athlète>.pdf`` : le rapport PDF (mêmes contenus que l'export de l'application) ;
+- ``<athlète>.json`` : métriques et records ;
+- ``resume.csv`` : une ligne de métriques par athlète.
+
+Les fichiers sont traités en parallèle par un pool de processus.
+
+Exemple ::
+
+    python ligne_commande.py equipe/*.csv -o rapports/ --debut 2024-01-01 -j 4
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from calculs import calculer_metriques_avancees, obtenir_records_personnels
+from importation import importer_csv
+from tampon import TamponPerformances
+
+
+def _en_json(valeur):
+    """Copie de valeur sérialisable en JSON strict : NaN et dates manquantes deviennent None"""
+    if isinstance(valeur, dict):
+        return {str(cle): _en_json(v) for cle, v in valeur.items()}
+    if isinstance(valeur, (list, tuple)):
+        return [_en_json(v) for v in valeur]
+    if isinstance(valeur, (pd.Timestamp, np.datetime64)):
+        return None if pd.isna(valeur) else pd.Timestamp(valeur).isoformat()
+    if isinstance(valeur, (np.integer, np.bool_)):
+        return valeur.item()
+    if isinstance(valeur, (float, np.floating)):
+        return None if np.isnan(valeur) else float(valeur)
+    return valeur
+
+
+def noms_sortie(chemins):
+    """
+    Nom de sortie de chaque fichier (nom du fichier sans extension) ; les noms
+    identiques venant de dossiers différents sont numérotés (x_1, x_2, ...).
+    """
+    noms = [os.path.splitext(os.path.basename(chemin))[0] for chemin in chemins]
+    occurrences = {nom: noms.count(nom) for nom in noms}
+    numeros = {}
+    for i, nom in enumerate(noms):
+        if occurrences[nom] > 1:
+            numeros[nom] = numeros.get(nom, 0) + 1
+            noms[i] = f"{nom}_{numeros[nom]}"
+    return noms
+
+
+def traiter_athlete(chemin, nom, dossier_sortie, debut=None, fin=None, sports=None, pdf=True):
+    """
+    Importe le CSV d'un athlète puis écrit son rapport et ses résultats sous le nom donné.
+    Renvoie (nom, métriques) ; lève ValueError si le fichier n'a aucune séance retenue.
+    """
+    # Import dans les modules de rapport seulement ici : chaque processus ne paie reportlab qu'une fois
+    from rapport_pdf import generer_rapport_pdf, graphiques_rapport
+
+    tampon = TamponPerformances()
+    with open(chemin, 'rb') as fichier:
+        importer_csv(fichier, tampon, dedoublonner=True)
+
+    df = tampon.plage(debut, fin)
+    if sports:
+        df = df[df['sport'].isin(sports)]
+    metriques = calculer_metriques_avancees(df)
+    if not metriques:
+        raise ValueError("aucune séance dans la période")
+    records = obtenir_records_personnels(df)
+
+    if pdf:
+        graphiques = graphiques_rapport(tampon.agregats, sports, debut, fin)
+        with open(os.path.join(dossier_sortie, f'{nom}.pdf'), 'wb') as f:
+            f.write(generer_rapport_pdf(df, metriques, graphiques).getvalue())
+    with open(os.path.join(dossier_sortie, f'{nom}.json'), 'w', encoding='utf-8') as f:
+        json.dump(_en_json({'athlete': nom, 'metriques': metriques, 'records': records}),
+                  f, ensure_ascii=False, indent=2, allow_nan=False)
+    return nom, metriques
+
+
+def traiter_lot(chemins, dossier_sortie, processus=None, **options):
+    """
+    Traite les fichiers en parallèle (processus : taille du pool, par défaut le nombre de cœurs).
+    Un fichier en échec (quelle que soit l'erreur) n'interrompt pas le lot.
+    Renvoie (tableau récapitulatif, {fichier: erreur}).
+    """
+    os.makedirs(dossier_sortie, exist_ok=True)
+    # Un fichier donné deux fois n'est traité qu'une fois
+    chemins = list(dict.fromkeys(os.path.abspath(chemin) for chemin in chemins))
+    lignes, erreurs = [], {}
+    with ProcessPoolExecutor(max_workers=processus) as pool:
+        taches = {
+            pool.submit(traiter_athlete, chemin, nom, dossier_sortie, **options): chemin
+            for chemin, nom in zip(chemins, noms_sortie(chemins))
+        }
+        for tache in as_completed(taches):
+            chemin = taches[tache]
+            try:
+                nom, metriques = tache.result()
+            except Exception as e:
+                # Y compris BrokenProcessPool : les autres athlètes et le résumé sont conservés
+                erreurs[chemin] = f"{type(e).__name__}: {e}"
+                print(f"✗ {chemin} : {erreurs[chemin]}", file=sys.stderr)
+                continue
+            lignes.append({'athlete': nom, **metriques})
+            print(f"✓ {nom} : {metriques['total_entrainements']} séances")
+
+    resume = pd.DataFrame(lignes)
+    if not resume.empty:
+        resume = resume.sort_values('athlete')
+        resume.to_csv(os.path.join(dossier_sortie, 'resume.csv'), index=False, encoding='utf-8-sig')
+    return resume, erreurs
+
+
+def main(arguments=None):
+    analyseur = argparse.ArgumentParser(description="Rapports et métriques de performances pour plusieurs athlètes")
+    analyseur.add_argument('fichiers', nargs='+', help="fichiers CSV des athlètes (un par athlète)")
+    analyseur.add_argument('-o', '--sortie', default='rapports', help="dossier de sortie (défaut : rapports)")
+    analyseur.add_argument('--debut', help="date de début (AAAA-MM-JJ)")
+    analyseur.add_argument('--fin', help="date de fin (AAAA-MM-JJ)")
+    analyseur.add_argument('--sport', action='append', dest='sports', help="sport à inclure (répétable)")
+    analyseur.add_argument('-j', '--processus', type=int, help="nombre de processus (défaut : nombre de cœurs)")
+    analyseur.add_argument('--sans-pdf', action='store_true', help="métriques et records seulement")
+    args = analyseur.parse_args(arguments)
+
+    _, erreurs = traiter_lot(
+        args.fichiers, args.sortie, args.processus,
+        debut=pd.Timestamp(args.debut) if args.debut else None,
+        fin=pd.Timestamp(args.fin) if args.fin else None,
+        sports=args.sports, pdf=not args.sans_pdf
+    )
+    return 1 if erreurs else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,17 +1,29 @@
+import importlib.util
+import time
 import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
+from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
-from io import BytesIO
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Image
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
-import base64
+from stockage import StockagePerformances, nouveaux_identifiants
+from tampon import TamponPerformances
+from charge import cle_profil_trimp
+from calculs import (
+    calculer_fc_max_theorique, calculer_imc, calculer_pace, calculer_progression_objectifs,
+    calculer_trimp, calculer_vo2max_estime, calculer_zones_fc, metriques_depuis_agregats,
+    predire_temps_course
+)
+from cache import analyse_en_cache, figure_en_cache
+from records import LIBELLES_RECORDS
+from importation import TAILLE_LOT, importer_csv, lire_apercu
+from fit import importer_fit
+from traces import importer_traces
+from flux import StockageFlux, lire_csv_flux
+from efforts import CHAMPS_EFFORT, CourbeEfforts, libelle_duree
+from reduction import POINTS_MAX_GRAPHIQUE, reduire_serie, trace_serie
+from rapports import GenerateurRapports
 
 # Configuration de la page avec thème moderne
 st.set_page_config(
@@ -329,14 +341,6 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# Initialisation des données dans session_state
-if 'performances' not in st.session_state:
-    st.session_state.performances = pd.DataFrame(columns=[
-        'date', 'sport', 'type_entrainement', 'duree_min', 'distance_km', 
-        'calories', 'frequence_cardiaque_moy', 'frequence_cardiaque_max',
-        'vitesse_moy', 'elevation_m', 'notes'
-    ])
-
 # Initialisation des objectifs
 if 'objectifs' not in st.session_state:
     st.session_state.objectifs = {
@@ -358,255 +362,394 @@ if 'profil' not in st.session_state:
         'sexe': 'Homme'
     }
 
-# Fonctions de calcul des métriques
-def calculer_metriques_avancees(df):
-    if df.empty:
-        return {}
-    
-    metriques = {
-        'total_entrainements': len(df),
-        'duree_totale': df['duree_min'].sum(),
-        'distance_totale': df['distance_km'].sum(),
-        'calories_totales': df['calories'].sum(),
-        'vitesse_moyenne': df['vitesse_moy'].mean(),
-        'fc_moyenne': df['frequence_cardiaque_moy'].mean(),
-        'elevation_totale': df['elevation_m'].sum()
-    }
-    
-    if len(df) > 1:
-        df_sorted = df.sort_values('date')
-        metriques['progression_distance'] = (
-            (df_sorted['distance_km'].iloc[-1] - df_sorted['distance_km'].iloc[0]) / 
-            df_sorted['distance_km'].iloc[0] * 100 if df_sorted['distance_km'].iloc[0] > 0 else 0
-        )
-        metriques['progression_vitesse'] = (
-            (df_sorted['vitesse_moy'].iloc[-1] - df_sorted['vitesse_moy'].iloc[0]) / 
-            df_sorted['vitesse_moy'].iloc[0] * 100 if df_sorted['vitesse_moy'].iloc[0] > 0 else 0
-        )
-    
-    return metriques
+def sauvegarder_tampon(tampon):
+    """Réécrit l'instantané depuis le tampon (avec clés de doublons et identifiants de séance)"""
+    st.session_state.stockage.sauvegarder(tampon.vue(), tampon.cles_doublons(), tampon.identifiants())
 
-def calculer_zones_fc(fc_max, fc_repos=60):
-    zones = {
-        'Zone 1 (Récupération)': (fc_repos + 0.5 * (fc_max - fc_repos), fc_repos + 0.6 * (fc_max - fc_repos)),
-        'Zone 2 (Endurance)': (fc_repos + 0.6 * (fc_max - fc_repos), fc_repos + 0.7 * (fc_max - fc_repos)),
-        'Zone 3 (Tempo)': (fc_repos + 0.7 * (fc_max - fc_repos), fc_repos + 0.8 * (fc_max - fc_repos)),
-        'Zone 4 (Seuil)': (fc_repos + 0.8 * (fc_max - fc_repos), fc_repos + 0.9 * (fc_max - fc_repos)),
-        'Zone 5 (VO2 Max)': (fc_repos + 0.9 * (fc_max - fc_repos), fc_max)
-    }
-    return zones
+# Initialisation des données dans session_state (chargées depuis le disque)
+if 'stockage' not in st.session_state:
+    st.session_state.stockage = StockagePerformances()
+# Flux seconde par seconde, un fichier par séance (lus à la demande)
+if 'flux' not in st.session_state:
+    st.session_state.flux = StockageFlux()
+# Courbes des meilleurs efforts, complétées à chaque nouvelle séance : {(champ, sport): CourbeEfforts}
+if 'courbes_efforts' not in st.session_state:
+    st.session_state.courbes_efforts = {}
+# TRIMP de chaque séance : recalculé seulement si le profil a changé
+profil_trimp = cle_profil_trimp(
+    st.session_state.profil['fc_repos'], st.session_state.profil['fc_max'], st.session_state.profil['sexe']
+)
+if 'tampon' not in st.session_state:
+    chargement_ns = time.time_ns()
+    st.session_state.tampon = TamponPerformances(st.session_state.stockage.charger(), profil_trimp=profil_trimp)
+    if st.session_state.tampon.identifiants_generes:
+        # Données d'avant les identifiants de séance : identifiants persistés, flux renommés
+        st.session_state.flux.migrer(st.session_state.tampon.cles_doublons(), st.session_state.tampon.identifiants())
+        sauvegarder_tampon(st.session_state.tampon)
+    st.session_state.flux.nettoyer(st.session_state.tampon.identifiants(), avant_ns=chargement_ns)
+st.session_state.tampon.definir_profil_trimp(profil_trimp)
+# Vue DataFrame du tampon, reconstruite uniquement après un ajout
+st.session_state.performances = st.session_state.tampon.vue()
 
-def calculer_trimp(duree_min, fc_moy, fc_repos, fc_max, sexe='Homme'):
-    """
-    Calcul du TRIMP (Training Impulse) - Mesure de la charge d'entraînement
-    Formule de Banister: TRIMP = durée × ΔFC × facteur d'intensité
-    """
-    if fc_max <= fc_repos:
-        return 0
-    
-    delta_fc = (fc_moy - fc_repos) / (fc_max - fc_repos)
-    delta_fc = max(0, min(1, delta_fc))  # Limiter entre 0 et 1
-    
-    # Facteur selon le sexe (coefficient exponentiel)
-    if sexe == 'Homme':
-        y = 0.64 * np.exp(1.92 * delta_fc)
+# Couleur de chaque zone de FC (graphiques)
+COULEURS_ZONES = ['#48bb78', '#4299e1', '#ed8936', '#f56565', '#9f7aea']
+
+# Présence de statsmodels (droites de tendance), vérifiée sans l'importer
+STATSMODELS_DISPONIBLE = importlib.util.find_spec('statsmodels') is not None
+
+def generer_rapport(*args, **kwargs):
+    """Rapport PDF ; reportlab n'est importé qu'à la première génération (dans le fil des rapports)"""
+    from rapport_pdf import generer_rapport_pdf
+    return generer_rapport_pdf(*args, **kwargs)
+
+# Analyses mises en cache : recalculées seulement quand la version des données change
+@analyse_en_cache
+def statistiques_periode(tampon, debut=None):
+    """Statistiques générales des séances depuis debut"""
+    df = tampon.plage(debut=debut)
+    if len(df) > 1:
+        date_range_days = (df['date'].max() - df['date'].min()).days
+        if date_range_days > 0:
+            frequence = len(df) / (date_range_days / 7)
+        else:
+            # Si toutes les dates sont le même jour, on estime sur 1 semaine
+            frequence = len(df)
     else:
-        y = 0.86 * np.exp(1.67 * delta_fc)
-    
-    trimp = duree_min * delta_fc * y
-    return round(trimp, 1)
+        frequence = 0
+    return {
+        'nombre': len(df),
+        'distance_moy': float(df['distance_km'].mean()),
+        'duree_moy': float(df['duree_min'].mean()),
+        'frequence': frequence,
+        'vitesse_moy': float(df['vitesse_moy'].mean()),
+        'calories_moy': float(df['calories'].mean()),
+        'fc_moy': float(df['frequence_cardiaque_moy'].mean()),
+        'fc_max': float(df['frequence_cardiaque_max'].max())
+    }
 
-def calculer_pace(distance_km, duree_min):
-    """Calcule l'allure en min/km"""
-    if distance_km <= 0:
-        return 0, 0
-    pace_total = duree_min / distance_km
-    pace_min = int(pace_total)
-    pace_sec = int((pace_total - pace_min) * 60)
-    return pace_min, pace_sec
+@analyse_en_cache
+def donnees_correlations(tampon, debut=None):
+    """Séances de la période prêtes pour les nuages de corrélation"""
+    # Les colonnes sont déjà numériques (schéma canonique) : seules les valeurs manquantes sont remplacées
+    df_corr = tampon.plage(debut=debut).copy()
+    numeric_cols = ['distance_km', 'calories', 'duree_min', 'vitesse_moy', 'frequence_cardiaque_moy']
+    df_corr[numeric_cols] = df_corr[numeric_cols].fillna(0)
+    return df_corr
 
-def predire_temps_course(distance_ref, temps_ref_min, distance_cible):
-    """
-    Prédit le temps pour une distance cible basé sur une performance de référence
-    Utilise la formule de Riegel: T2 = T1 × (D2/D1)^1.06
-    """
-    if distance_ref <= 0 or temps_ref_min <= 0:
-        return 0
-    temps_predit = temps_ref_min * (distance_cible / distance_ref) ** 1.06
-    return temps_predit
+@analyse_en_cache
+def statistiques_par_sport(tampon, debut=None):
+    """Tableau récapitulatif par sport des séances depuis debut"""
+    sport_stats = tampon.plage(debut=debut).groupby('sport', observed=True).agg({
+        'distance_km': ['sum', 'mean', 'count'],
+        'duree_min': ['sum', 'mean'],
+        'calories': ['sum', 'mean'],
+        'vitesse_moy': 'mean'
+    }).round(2)
+    
+    sport_stats.columns = ['Distance Totale (km)', 'Distance Moy (km)', 'Nombre', 
+                          'Durée Totale (min)', 'Durée Moy (min)', 
+                          'Calories Totales', 'Calories Moy', 'Vitesse Moy (km/h)']
+    return sport_stats
 
-def calculer_imc(poids, taille_cm):
-    """Calcule l'IMC (Indice de Masse Corporelle)"""
-    taille_m = taille_cm / 100
-    if taille_m <= 0:
-        return 0
-    return round(poids / (taille_m ** 2), 1)
+def afficher_date_record(seance):
+    """Légende indiquant la séance ayant établi un record"""
+    if seance is not None and not pd.isna(seance['date']):
+        st.caption(f"📅 {seance['date'].strftime('%d/%m/%Y')}")
 
-def calculer_fc_max_theorique(age):
-    """Calcule la FC max théorique selon la formule de Tanaka"""
-    return round(208 - 0.7 * age)
+@st.fragment(run_every=0.5)
+def suivre_rapport(cle):
+    """Avancement d'un rapport en cours, interrogé toutes les 0,5 s ; page rechargée à la fin"""
+    tache = st.session_state.rapports.obtenir(cle)
+    if tache is None or tache.terminee():
+        st.rerun()
+    st.progress(tache.progression, text=f"⏳ Génération du rapport en cours... ({tache.duree():.0f} s)")
 
-def calculer_vo2max_estime(fc_repos, fc_max):
-    """Estime le VO2max basé sur la fréquence cardiaque (formule d'Uth)"""
-    if fc_repos <= 0:
-        return 0
-    return round(15.3 * (fc_max / fc_repos), 1)
+def afficher_rapport(cle):
+    """Avancement, erreur ou bouton de téléchargement du rapport cle"""
+    tache = st.session_state.rapports.obtenir(cle)
+    if tache is None:
+        return
+    if not tache.terminee():
+        suivre_rapport(cle)
+    elif tache.erreur() is not None:
+        st.error(f"❌ Échec de la génération du rapport : {tache.erreur()}")
+    else:
+        st.success(f"✅ Rapport prêt ({tache.duree():.1f} s)")
+        st.download_button(
+            label="📥 Télécharger le PDF",
+            data=tache.pdf(),
+            file_name=f"rapport_performances_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
+            mime="application/pdf",
+            use_container_width=True
+        )
 
-def obtenir_records_personnels(df):
-    """Identifie les records personnels par sport"""
-    if df.empty:
-        return {}
-    
-    records = {}
-    for sport in df['sport'].unique():
-        df_sport = df[df['sport'] == sport]
-        records[sport] = {
-            'distance_max': df_sport['distance_km'].max(),
-            'duree_max': df_sport['duree_min'].max(),
-            'vitesse_max': df_sport['vitesse_moy'].max(),
-            'calories_max': df_sport['calories'].max(),
-            'meilleur_pace': df_sport['distance_km'].max() / df_sport[df_sport['distance_km'] == df_sport['distance_km'].max()]['duree_min'].values[0] * 60 if df_sport['distance_km'].max() > 0 else 0
-        }
-    return records
+def libelle_seance(ligne):
+    """Libellé court d'une séance pour les listes de sélection"""
+    return (f"{ligne['date'].strftime('%d/%m/%Y')} — {ligne['sport']} — "
+            f"{ligne['distance_km']:.1f} km — {ligne['duree_min']:.0f} min")
 
-def calculer_progression_objectifs(df, objectifs):
-    """Calcule la progression vers les objectifs"""
-    today = datetime.now()
-    start_of_week = today - timedelta(days=today.weekday())
-    start_of_month = today.replace(day=1)
-    
-    if df.empty:
-        return {
-            'distance_hebdo': 0,
-            'distance_mensuel': 0,
-            'seances_hebdo': 0,
-            'calories_hebdo': 0,
-            'duree_hebdo': 0
-        }
+def choisir_seance(label, positions, key):
+    """Liste de sélection parmi les lignes données de la vue ; renvoie l'identifiant de la séance choisie"""
+    df = st.session_state.performances
+    cles = st.session_state.tampon.identifiants()
+    position = st.selectbox(label, positions, format_func=lambda i: libelle_seance(df.iloc[i]), key=key)
+    return int(cles[position])
+
+def afficher_flux(flux):
+    """Courbes FC, vitesse, altitude et cadence d'une séance en fonction du temps"""
+    courbes = [
+        ('fc', 'FC (bpm)', '#f56565'), ('vitesse_kmh', 'Vitesse (km/h)', '#667eea'),
+        ('altitude_m', 'Altitude (m)', '#48bb78'), ('cadence', 'Cadence', '#ed8936')
+    ]
+    courbes = [courbe for courbe in courbes if not np.isnan(flux[courbe[0]]).all()]
+    if not courbes:
+        st.info("Aucune mesure dans les flux de cette séance.")
+        return
+    minutes = flux['temps_s'] / 60
+    fig_flux = make_subplots(rows=len(courbes), cols=1, shared_xaxes=True, vertical_spacing=0.04)
+    for ligne, (champ, titre, couleur) in enumerate(courbes, start=1):
+        fig_flux.add_trace(go.Scatter(x=minutes, y=flux[champ], name=titre, line=dict(color=couleur, width=1.5)),
+                           row=ligne, col=1)
+        fig_flux.update_yaxes(title_text=titre, row=ligne, col=1)
+    fig_flux.update_xaxes(title_text='Temps (min)', row=len(courbes), col=1)
+    fig_flux.update_layout(height=180 * len(courbes) + 80, showlegend=False, template=None,
+                           plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)')
+    st.plotly_chart(fig_flux, use_container_width=True)
+
+def seances_filtrees(tampon, sport, debut, fin):
+    """Séances entre debut et fin (incluses), d'un sport ou de tous ('Tous')"""
+    df = tampon.plage(debut, fin)
+    return df if sport == 'Tous' else df[df['sport'] == sport]
+
+@figure_en_cache
+def figures_evolution(tampon, sport, debut, fin, points_max):
+    """
+    Courbes du tableau de bord (distance, durée, FC) des séances filtrées,
+    réduites à points_max points. Renvoie (fig, fig2, fig3, nombre de séances).
+    """
+    df_graphiques = seances_filtrees(tampon, sport, debut, fin)
+    
+    fig = go.Figure()
+    fig.add_trace(trace_serie(
+        df_graphiques['date'], df_graphiques['distance_km'], points_max,
+        mode='lines+markers', name='Distance (km)',
+        line=dict(color='#667eea', width=3),
+        marker=dict(size=8, color='#764ba2')
+    ))
+    fig.update_layout(
+        title='Évolution de la Distance',
+        xaxis_title='Date',
+        yaxis_title='Distance (km)',
+        height=400,
+        template=None,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        hovermode='x unified'
+    )
     
-    df['date'] = pd.to_datetime(df['date'])
-    df_week = df[df['date'] >= start_of_week]
-    df_month = df[df['date'] >= start_of_month]
+    dates_duree, durees = reduire_serie(df_graphiques['date'], df_graphiques['duree_min'], points_max)
+    fig2 = go.Figure()
+    fig2.add_trace(go.Bar(
+        x=dates_duree, y=durees,
+        name='Durée',
+        marker=dict(
+            color=durees,
+            colorscale='Viridis',
+            showscale=True
+        )
+    ))
+    fig2.update_layout(
+        title='Durée des Entraînements',
+        xaxis_title='Date',
+        yaxis_title='Durée (min)',
+        height=400,
+        template=None,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)'
+    )
     
-    return {
-        'distance_hebdo': df_week['distance_km'].sum(),
-        'distance_mensuel': df_month['distance_km'].sum(),
-        'seances_hebdo': len(df_week),
-        'calories_hebdo': df_week['calories'].sum(),
-        'duree_hebdo': df_week['duree_min'].sum()
-    }
+    fig3 = go.Figure()
+    fig3.add_trace(trace_serie(
+        df_graphiques['date'], df_graphiques['frequence_cardiaque_moy'], points_max,
+        mode='lines+markers', name='FC Moyenne',
+        line=dict(color='#e74c3c', width=3),
+        marker=dict(size=8)
+    ))
+    fig3.add_trace(trace_serie(
+        df_graphiques['date'], df_graphiques['frequence_cardiaque_max'], points_max,
+        mode='lines+markers', name='FC Max',
+        line=dict(color='#f39c12', width=3, dash='dash'),
+        marker=dict(size=8)
+    ))
+    fig3.update_layout(
+        title='Évolution de la Fréquence Cardiaque',
+        xaxis_title='Date',
+        yaxis_title='BPM',
+        height=400,
+        template=None,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        hovermode='x unified'
+    )
+    return fig, fig2, fig3, len(df_graphiques)
 
-def generer_rapport_pdf(df, metriques, graphiques_base64):
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=18)
-    
-    elements = []
-    styles = getSampleStyleSheet()
-    
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#667eea'),
-        spaceAfter=30,
-        alignment=TA_CENTER
+@figure_en_cache
+def figures_repartition(tampon, sport, debut, fin):
+    """Camemberts de répartition par sport et par type des séances filtrées (fig4, fig5)"""
+    df_filtre = seances_filtrees(tampon, sport, debut, fin)
+    
+    sport_counts = df_filtre['sport'].value_counts()
+    sport_counts = sport_counts[sport_counts > 0]
+    fig4 = px.pie(
+        values=sport_counts.values,
+        names=sport_counts.index,
+        title='Répartition par Sport',
+        color_discrete_sequence=px.colors.sequential.RdBu
     )
-    
-    elements.append(Paragraph("Rapport de Performance Sportive", title_style))
-    elements.append(Spacer(1, 12))
-    elements.append(Paragraph(f"Généré le {datetime.now().strftime('%d/%m/%Y à %H:%M')}", styles['Normal']))
-    elements.append(Spacer(1, 20))
-    
-    elements.append(Paragraph("Résumé des Performances", styles['Heading2']))
-    elements.append(Spacer(1, 12))
-    
-    metriques_data = [
-        ['Métrique', 'Valeur'],
-        ['Total d\'entraînements', f"{metriques['total_entrainements']}"],
-        ['Durée totale', f"{metriques['duree_totale']:.0f} min"],
-        ['Distance totale', f"{metriques['distance_totale']:.2f} km"],
-        ['Calories brûlées', f"{metriques['calories_totales']:.0f} kcal"],
-        ['Vitesse moyenne', f"{metriques['vitesse_moyenne']:.2f} km/h"],
-        ['FC moyenne', f"{metriques['fc_moyenne']:.0f} bpm"],
-        ['Élévation totale', f"{metriques['elevation_totale']:.0f} m"]
+    fig4.update_traces(textposition='inside', textinfo='percent+label')
+    
+    type_counts = df_filtre['type_entrainement'].value_counts()
+    type_counts = type_counts[type_counts > 0]
+    fig5 = px.pie(
+        values=type_counts.values,
+        names=type_counts.index,
+        title='Répartition par Type',
+        color_discrete_sequence=px.colors.sequential.Purples
+    )
+    fig5.update_traces(textposition='inside', textinfo='percent+label')
+    return fig4, fig5
+
+@figure_en_cache
+def figure_zones(tampon, debut, fc_repos):
+    """Zones de FC (calculées depuis la FC max de la période) et FC moyenne de la période"""
+    stats = statistiques_periode(tampon, debut)
+    zones = calculer_zones_fc(stats['fc_max'], fc_repos)
+    fig_zones = go.Figure()
+    for i, (zone, (min_fc, max_fc)) in enumerate(zones.items()):
+        fig_zones.add_trace(go.Bar(
+            name=zone,
+            x=[zone],
+            y=[(max_fc + min_fc) / 2],
+            error_y=dict(type='data', array=[(max_fc - min_fc) / 2]),
+            marker_color=COULEURS_ZONES[i]
+        ))
+    
+    # Ligne de FC moyenne
+    fig_zones.add_trace(go.Scatter(
+        x=list(zones.keys()),
+        y=[stats['fc_moy']] * len(zones),
+        mode='lines+markers',
+        name='Votre FC moyenne',
+        line=dict(color='red', width=3, dash='dash'),
+        marker=dict(size=10)
+    ))
+    
+    fig_zones.update_layout(
+        title='Zones de Fréquence Cardiaque',
+        yaxis_title='BPM',
+        height=400,
+        showlegend=True,
+        template=None,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig_zones
+
+@figure_en_cache
+def figure_hebdo(tampon, debut):
+    """Distance et durée par semaine ISO depuis debut (cumuls matérialisés)"""
+    # Cumuls par semaine ISO matérialisés (semaine repérée par son lundi)
+    intensite_hebdo = tampon.agregats.cumuls('semaine', debut=debut)
+    
+    fig_hebdo = go.Figure()
+    fig_hebdo.add_trace(go.Bar(
+        x=intensite_hebdo['periode'],
+        y=intensite_hebdo['distance_km'],
+        name='Distance (km)',
+        marker_color='#667eea'
+    ))
+    fig_hebdo.add_trace(go.Scatter(
+        x=intensite_hebdo['periode'],
+        y=intensite_hebdo['duree_min'],
+        name='Durée (min)',
+        yaxis='y2',
+        line=dict(color='#f56565', width=3)
+    ))
+    
+    fig_hebdo.update_layout(
+        title='Charge d\'entraînement hebdomadaire',
+        xaxis_title='Semaine',
+        yaxis_title='Distance (km)',
+        yaxis2=dict(title='Durée (min)', overlaying='y', side='right'),
+        height=400,
+        template=None,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig_hebdo
+
+@figure_en_cache
+def figure_radar(tampon, objectifs, progression):
+    """Radar objectifs / progression de la semaine"""
+    categories = ['Distance', 'Séances', 'Calories', 'Durée']
+    objectifs_vals = [
+        objectifs['distance_hebdo'],
+        objectifs['seances_hebdo'],
+        objectifs['calories_hebdo'] / 100,
+        objectifs['duree_hebdo'] / 10
+    ]
+    progression_vals = [
+        progression['distance_hebdo'],
+        progression['seances_hebdo'],
+        progression['calories_hebdo'] / 100,
+        progression['duree_hebdo'] / 10
     ]
     
-    t = Table(metriques_data, colWidths=[3*inch, 2*inch])
-    t.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#667eea')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    
-    elements.append(t)
-    elements.append(Spacer(1, 20))
-    
-    if not df.empty:
-        elements.append(PageBreak())
-        elements.append(Paragraph("Détail des Entraînements", styles['Heading2']))
-        elements.append(Spacer(1, 12))
-        
-        df_display = df.tail(10).copy()
-        df_display['date'] = pd.to_datetime(df_display['date']).dt.strftime('%d/%m/%Y')
-        
-        table_data = [['Date', 'Sport', 'Type', 'Durée', 'Distance', 'Vitesse']]
-        for _, row in df_display.iterrows():
-            table_data.append([
-                row['date'],
-                row['sport'],
-                row['type_entrainement'],
-                f"{row['duree_min']:.0f} min",
-                f"{row['distance_km']:.2f} km",
-                f"{row['vitesse_moy']:.2f} km/h"
-            ])
-        
-        t2 = Table(table_data, colWidths=[1.2*inch, 1*inch, 1.2*inch, 1*inch, 1.2*inch, 1.2*inch])
-        t2.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#667eea')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        
-        elements.append(t2)
-    
-    doc.build(elements)
-    buffer.seek(0)
-    return buffer
+    fig_radar = go.Figure()
+    fig_radar.add_trace(go.Scatterpolar(
+        r=objectifs_vals + [objectifs_vals[0]],
+        theta=categories + [categories[0]],
+        fill='toself',
+        name='Objectifs',
+        line_color='#667eea'
+    ))
+    fig_radar.add_trace(go.Scatterpolar(
+        r=progression_vals + [progression_vals[0]],
+        theta=categories + [categories[0]],
+        fill='toself',
+        name='Progression',
+        line_color='#48bb78'
+    ))
+    fig_radar.update_layout(
+        polar=dict(radialaxis=dict(visible=True)),
+        showlegend=True,
+        title="Radar de Progression"
+    )
+    return fig_radar
 
 def create_weekly_widget():
     """Widget style Nike pour les statistiques hebdomadaires - Version 100% Streamlit natif"""
-    df = st.session_state.performances.copy()
+    agregats = st.session_state.tampon.agregats
     
     # Header avec emojis
     st.markdown("#### 🏃 🚴 🏊")
     
-    if df.empty:
+    if st.session_state.performances.empty:
         st.info("📊 Ajoutez votre première performance pour voir vos statistiques !")
         return
     
-    df['date'] = pd.to_datetime(df['date'])
     today = datetime.now()
-    start_of_week = today - timedelta(days=today.weekday())
+    start_of_week = (today - timedelta(days=today.weekday())).date()
     
-    # Données de la semaine
-    df_week = df[df['date'] >= start_of_week]
-    distance_semaine = df_week['distance_km'].sum()
-    duree_semaine = df_week['duree_min'].sum()
+    # Données de la semaine (cumuls hebdomadaires et quotidiens matérialisés)
+    semaine = agregats.totaux('semaine', today)
+    distance_semaine = semaine['distance_km']
+    duree_semaine = semaine['duree_min']
+    jours_semaine = agregats.cumuls('jour', debut=start_of_week, fin=start_of_week + timedelta(days=6))
     
     # Données de l'année
-    start_of_year = datetime(today.year, 1, 1)
-    df_year = df[df['date'] >= start_of_year]
-    distance_annee = df_year['distance_km'].sum()
+    annee = agregats.cumuls('mois', debut=datetime(today.year, 1, 1), fin=datetime(today.year, 12, 31))
+    distance_annee = float(annee['distance_km'].sum())
     
     # Progression par rapport à l'objectif
     objectif_semaine = 50
@@ -621,7 +764,7 @@ def create_weekly_widget():
     
     # Jours actifs
     jours = ['L', 'M', 'M', 'J', 'V', 'S', 'D']
-    jours_actifs = df_week['date'].dt.dayofweek.unique().tolist()
+    jours_actifs = jours_semaine['periode'].dt.dayofweek.tolist()
     jours_display = " ".join([f"**{j}**" if i in jours_actifs else j for i, j in enumerate(jours)])
     st.markdown(f"Jours actifs: {jours_display}")
     
@@ -632,7 +775,7 @@ def create_weekly_widget():
         minutes = int(duree_semaine % 60)
         st.metric("Temps", f"{heures}h{minutes:02d}")
     with c2:
-        st.metric("Séances", len(df_week))
+        st.metric("Séances", semaine['seances'])
     
     # Barre de progression
     st.markdown(f"**Objectif:** {objectif_semaine} km")
@@ -666,7 +809,7 @@ with col_left:
     st.markdown("### 🎯 Navigation")
     menu = st.selectbox(
         "Choisir une section",
-        ["📊 Tableau de bord", "➕ Ajouter Performance", "📈 Analyse Avancée", 
+        ["📊 Tableau de bord", "➕ Ajouter Performance", "📈 Analyse Avancée", "⚡ Forme & Fatigue",
          "🎯 Objectifs & Records", "🧮 Calculateurs", "📥 Import/Export"],
         label_visibility="collapsed"
     )
@@ -690,8 +833,8 @@ with col_right:
                 </div>
             """, unsafe_allow_html=True)
         else:
-            df = st.session_state.performances.copy()
-            df['date'] = pd.to_datetime(df['date'])
+            df = st.session_state.performances
+            date_min, date_max = st.session_state.tampon.bornes_dates()
             
             # Filtres avec design amélioré
             st.markdown("### 🔍 Filtres")
@@ -700,20 +843,22 @@ with col_right:
                 sports = ['Tous'] + list(df['sport'].unique())
                 sport_filtre = st.selectbox("🏅 Sport", sports)
             with col2:
-                date_debut = st.date_input("📅 Date début", df['date'].min())
+                date_debut = st.date_input("📅 Date début", date_min)
             with col3:
-                date_fin = st.date_input("📅 Date fin", df['date'].max())
+                date_fin = st.date_input("📅 Date fin", date_max)
             
-            # Application des filtres
-            df_filtre = df.copy()
+            # Application des filtres : tranche de dates par recherche dichotomique, puis sport
+            df_filtre = st.session_state.tampon.plage(date_debut, date_fin)
             if sport_filtre != 'Tous':
                 df_filtre = df_filtre[df_filtre['sport'] == sport_filtre]
-            df_filtre = df_filtre[(df_filtre['date'] >= pd.to_datetime(date_debut)) & 
-                                   (df_filtre['date'] <= pd.to_datetime(date_fin))]
             
             # Métriques principales avec design amélioré
             st.markdown("### 📈 Métriques Clés")
-            metriques = calculer_metriques_avancees(df_filtre)
+            metriques = metriques_depuis_agregats(
+                st.session_state.tampon.agregats,
+                sports=None if sport_filtre == 'Tous' else [sport_filtre],
+                debut=date_debut, fin=date_fin
+            )
             
             col1, col2, col3, col4 = st.columns(4)
             with col1:
@@ -736,97 +881,41 @@ with col_right:
             # Graphiques avec thème amélioré
             st.markdown("### 📊 Visualisations")
             
+            # Au-delà de points_max séances, les courbes sont réduites (LTTB) et tracées en WebGL
+            with st.expander("⚙️ Affichage des graphiques"):
+                points_max = st.number_input("Points max par courbe", min_value=100, max_value=50_000,
+                                             value=POINTS_MAX_GRAPHIQUE, step=500)
+            debut_graphiques, fin_graphiques = date_debut, date_fin
+            if len(df_filtre) > points_max and date_debut < date_fin:
+                # Zoom : sur une période assez courte, toutes les séances sont affichées
+                debut_graphiques, fin_graphiques = st.slider(
+                    "🔎 Zoom sur une période", min_value=date_debut, max_value=date_fin,
+                    value=(date_debut, date_fin), format="DD/MM/YYYY"
+                )
+            # Figures reconstruites seulement si les données ou ces filtres ont changé
+            fig, fig2, fig3, n_graphiques = figures_evolution(
+                st.session_state.tampon, sport_filtre, debut_graphiques, fin_graphiques, points_max
+            )
+            if n_graphiques > points_max:
+                st.caption(f"Courbes réduites à {points_max} points sur {n_graphiques} séances : "
+                           "zoomez sur une période plus courte pour la pleine résolution.")
+            
             tab1, tab2, tab3 = st.tabs(["📏 Distance & Durée", "💓 Fréquence Cardiaque", "📊 Répartition"])
             
             with tab1:
-                fig = go.Figure()
-                fig.add_trace(go.Scatter(
-                    x=df_filtre['date'], y=df_filtre['distance_km'],
-                    mode='lines+markers', name='Distance (km)',
-                    line=dict(color='#667eea', width=3),
-                    marker=dict(size=8, color='#764ba2')
-                ))
-                fig.update_layout(
-                    title='Évolution de la Distance',
-                    xaxis_title='Date',
-                    yaxis_title='Distance (km)',
-                    height=400,
-                    template=None,
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    hovermode='x unified'
-                )
                 st.plotly_chart(fig, use_container_width=True)
-                
-                fig2 = go.Figure()
-                fig2.add_trace(go.Bar(
-                    x=df_filtre['date'], y=df_filtre['duree_min'],
-                    name='Durée',
-                    marker=dict(
-                        color=df_filtre['duree_min'],
-                        colorscale='Viridis',
-                        showscale=True
-                    )
-                ))
-                fig2.update_layout(
-                    title='Durée des Entraînements',
-                    xaxis_title='Date',
-                    yaxis_title='Durée (min)',
-                    height=400,
-                    template=None,
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)'
-                )
                 st.plotly_chart(fig2, use_container_width=True)
             
             with tab2:
-                fig3 = go.Figure()
-                fig3.add_trace(go.Scatter(
-                    x=df_filtre['date'], y=df_filtre['frequence_cardiaque_moy'],
-                    mode='lines+markers', name='FC Moyenne',
-                    line=dict(color='#e74c3c', width=3),
-                    marker=dict(size=8)
-                ))
-                fig3.add_trace(go.Scatter(
-                    x=df_filtre['date'], y=df_filtre['frequence_cardiaque_max'],
-                    mode='lines+markers', name='FC Max',
-                    line=dict(color='#f39c12', width=3, dash='dash'),
-                    marker=dict(size=8)
-                ))
-                fig3.update_layout(
-                    title='Évolution de la Fréquence Cardiaque',
-                    xaxis_title='Date',
-                    yaxis_title='BPM',
-                    height=400,
-                    template=None,
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    hovermode='x unified'
-                )
                 st.plotly_chart(fig3, use_container_width=True)
             
             with tab3:
+                fig4, fig5 = figures_repartition(st.session_state.tampon, sport_filtre, date_debut, date_fin)
                 col1, col2 = st.columns(2)
                 with col1:
-                    sport_counts = df_filtre['sport'].value_counts()
-                    fig4 = px.pie(
-                        values=sport_counts.values,
-                        names=sport_counts.index,
-                        title='Répartition par Sport',
-                        color_discrete_sequence=px.colors.sequential.RdBu
-                    )
-                    fig4.update_traces(textposition='inside', textinfo='percent+label')
                     st.plotly_chart(fig4, use_container_width=True)
                 
                 with col2:
-                    type_counts = df_filtre['type_entrainement'].value_counts()
-                    fig5 = px.pie(
-                        values=type_counts.values,
-                        names=type_counts.index,
-                        title='Répartition par Type',
-                        color_discrete_sequence=px.colors.sequential.Purples
-                    )
-                    fig5.update_traces(textposition='inside', textinfo='percent+label')
                     st.plotly_chart(fig5, use_container_width=True)
             
             # Tableau des dernières performances
@@ -834,7 +923,7 @@ with col_right:
             df_display = df_filtre.tail(10).copy()
             df_display['date'] = df_display['date'].dt.strftime('%d/%m/%Y')
             st.dataframe(
-                df_display[['date', 'sport', 'type_entrainement', 'duree_min', 'distance_km', 'vitesse_moy', 'calories']],
+                df_display[['date', 'sport', 'type_entrainement', 'duree_min', 'distance_km', 'vitesse_moy', 'calories', 'trimp']],
                 use_container_width=True,
                 hide_index=True
             )
@@ -880,22 +969,17 @@ with col_right:
                     'frequence_cardiaque_max': float(fc_max),
                     'vitesse_moy': float(vitesse_moy),
                     'elevation_m': float(elevation),
-                    'notes': notes
+                    'notes': notes,
+                    # Même identifiant dans le journal et dans le tampon
+                    'ident': int(nouveaux_identifiants(1)[0])
                 }
                 
-                new_df = pd.DataFrame([nouvelle_perf])
-                st.session_state.performances = pd.concat([
-                    st.session_state.performances,
-                    new_df
-                ], ignore_index=True)
-                
-                # Assurer les types numériques corrects
-                numeric_cols = ['duree_min', 'distance_km', 'calories', 'frequence_cardiaque_moy', 
-                               'frequence_cardiaque_max', 'vitesse_moy', 'elevation_m']
-                for col in numeric_cols:
-                    st.session_state.performances[col] = pd.to_numeric(st.session_state.performances[col], errors='coerce')
+                st.session_state.stockage.ajouter(nouvelle_perf)
+                records_battus = st.session_state.tampon.ajouter(nouvelle_perf)
                 
                 st.success("✅ Performance enregistrée avec succès!")
+                for record, ancien, nouveau in records_battus:
+                    st.success(f"🏆 Nouveau record ({sport}) : {LIBELLES_RECORDS[record]} — {nouveau:g} (ancien : {ancien:g})")
                 st.balloons()
 
     # Section 3: Analyse avancée
@@ -905,9 +989,6 @@ with col_right:
         if st.session_state.performances.empty:
             st.info("🔍 Aucune donnée disponible pour l'analyse.")
         else:
-            df = st.session_state.performances.copy()
-            df['date'] = pd.to_datetime(df['date'])
-            
             # Sélection de période
             st.markdown("### ⏰ Période d'Analyse")
             periode = st.selectbox(
@@ -916,64 +997,61 @@ with col_right:
             )
             
             if periode == "7 derniers jours":
-                df_analyse = df[df['date'] >= (datetime.now() - timedelta(days=7))]
+                debut_periode = datetime.now() - timedelta(days=7)
             elif periode == "30 derniers jours":
-                df_analyse = df[df['date'] >= (datetime.now() - timedelta(days=30))]
+                debut_periode = datetime.now() - timedelta(days=30)
             elif periode == "3 derniers mois":
-                df_analyse = df[df['date'] >= (datetime.now() - timedelta(days=90))]
+                debut_periode = datetime.now() - timedelta(days=90)
             elif periode == "6 derniers mois":
-                df_analyse = df[df['date'] >= (datetime.now() - timedelta(days=180))]
+                debut_periode = datetime.now() - timedelta(days=180)
             else:
-                df_analyse = df
+                debut_periode = None
+            if debut_periode is not None:
+                # Début du jour de départ (comme les agrégats) : la journée entière est incluse,
+                # et la clé de cache reste stable pendant toute la journée
+                debut_periode = pd.Timestamp(debut_periode).floor('D')
+            tampon = st.session_state.tampon
+            df_analyse = tampon.plage(debut=debut_periode)
             
             if not df_analyse.empty:
                 # Statistiques générales
                 st.markdown("### 📊 Statistiques Générales")
+                stats = statistiques_periode(tampon, debut_periode)
                 col1, col2, col3 = st.columns(3)
                 
                 with col1:
-                    st.metric("📅 Nombre d'entraînements", len(df_analyse))
-                    st.metric("📏 Distance moyenne/séance", f"{df_analyse['distance_km'].mean():.2f} km")
+                    st.metric("📅 Nombre d'entraînements", stats['nombre'])
+                    st.metric("📏 Distance moyenne/séance", f"{stats['distance_moy']:.2f} km")
                 
                 with col2:
-                    st.metric("⏱️ Durée moyenne/séance", f"{df_analyse['duree_min'].mean():.0f} min")
-                    # Calcul de la fréquence avec protection contre division par zéro
-                    if len(df_analyse) > 1:
-                        date_range_days = (df_analyse['date'].max() - df_analyse['date'].min()).days
-                        if date_range_days > 0:
-                            frequence = len(df_analyse) / (date_range_days / 7)
-                        else:
-                            # Si toutes les dates sont le même jour, on estime sur 1 semaine
-                            frequence = len(df_analyse)
-                    else:
-                        frequence = 0
-                    st.metric("🔄 Fréquence d'entraînement", f"{frequence:.1f} séances/semaine")
+                    st.metric("⏱️ Durée moyenne/séance", f"{stats['duree_moy']:.0f} min")
+                    # Fréquence calculée avec protection contre division par zéro
+                    st.metric("🔄 Fréquence d'entraînement", f"{stats['frequence']:.1f} séances/semaine")
                 
                 with col3:
-                    st.metric("⚡ Vitesse moyenne", f"{df_analyse['vitesse_moy'].mean():.2f} km/h")
-                    st.metric("🔥 Calories moyennes", f"{df_analyse['calories'].mean():.0f} kcal")
+                    st.metric("⚡ Vitesse moyenne", f"{stats['vitesse_moy']:.2f} km/h")
+                    st.metric("🔥 Calories moyennes", f"{stats['calories_moy']:.0f} kcal")
                 
                 # Progression
                 if len(df_analyse) > 1:
                     st.markdown("### 📈 Analyse de Progression")
-                    df_sorted = df_analyse.sort_values('date')
+                    # Premières/dernières valeurs lues dans les agrégats, sans retrier la période
+                    metriques_periode = metriques_depuis_agregats(tampon.agregats, debut=debut_periode)
                     
                     col1, col2 = st.columns(2)
                     with col1:
-                        prog_distance = ((df_sorted['distance_km'].iloc[-1] - df_sorted['distance_km'].iloc[0]) / 
-                                       df_sorted['distance_km'].iloc[0] * 100) if df_sorted['distance_km'].iloc[0] > 0 else 0
+                        prog_distance = metriques_periode.get('progression_distance', 0)
                         st.metric("📏 Progression Distance", f"{prog_distance:+.1f}%", 
                                  delta=f"{prog_distance:.1f}%")
                     
                     with col2:
-                        prog_vitesse = ((df_sorted['vitesse_moy'].iloc[-1] - df_sorted['vitesse_moy'].iloc[0]) / 
-                                      df_sorted['vitesse_moy'].iloc[0] * 100) if df_sorted['vitesse_moy'].iloc[0] > 0 else 0
+                        prog_vitesse = metriques_periode.get('progression_vitesse', 0)
                         st.metric("⚡ Progression Vitesse", f"{prog_vitesse:+.1f}%",
                                  delta=f"{prog_vitesse:.1f}%")
                 
                 # Zones de fréquence cardiaque
                 st.markdown("### 💓 Analyse de la Fréquence Cardiaque")
-                fc_max_utilisateur = df_analyse['frequence_cardiaque_max'].max()
+                fc_max_utilisateur = stats['fc_max']
                 fc_repos = st.slider("FC de repos (bpm)", 40, 80, 60)
                 zones = calculer_zones_fc(fc_max_utilisateur, fc_repos)
                 
@@ -981,36 +1059,7 @@ with col_right:
                 col1, col2 = st.columns([2, 1])
                 with col1:
                     # Graphique des zones FC
-                    fig_zones = go.Figure()
-                    colors_zones = ['#48bb78', '#4299e1', '#ed8936', '#f56565', '#9f7aea']
-                    for i, (zone, (min_fc, max_fc)) in enumerate(zones.items()):
-                        fig_zones.add_trace(go.Bar(
-                            name=zone,
-                            x=[zone],
-                            y=[(max_fc + min_fc) / 2],
-                            error_y=dict(type='data', array=[(max_fc - min_fc) / 2]),
-                            marker_color=colors_zones[i]
-                        ))
-                    
-                    # Ligne de FC moyenne
-                    fig_zones.add_trace(go.Scatter(
-                        x=list(zones.keys()),
-                        y=[df_analyse['frequence_cardiaque_moy'].mean()] * len(zones),
-                        mode='lines+markers',
-                        name='Votre FC moyenne',
-                        line=dict(color='red', width=3, dash='dash'),
-                        marker=dict(size=10)
-                    ))
-                    
-                    fig_zones.update_layout(
-                        title='Zones de Fréquence Cardiaque',
-                        yaxis_title='BPM',
-                        height=400,
-                        showlegend=True,
-                        template=None,
-                        plot_bgcolor='rgba(0,0,0,0)',
-                        paper_bgcolor='rgba(0,0,0,0)'
-                    )
+                    fig_zones = figure_zones(tampon, debut_periode, fc_repos)
                     st.plotly_chart(fig_zones, use_container_width=True)
                 
                 with col2:
@@ -1024,23 +1073,51 @@ with col_right:
                             </div>
                         """, unsafe_allow_html=True)
                 
+                # Temps passé dans chaque zone, à partir des flux seconde par seconde
+                cles_periode = tampon.identifiants()[df_analyse.index.to_numpy()]
+                avec_flux = np.isin(cles_periode, list(st.session_state.flux.cles()))
+                if avec_flux.any():
+                    st.markdown("#### ⏱️ Temps passé par Zone")
+                    bornes = [min_fc for min_fc, _ in zones.values()]
+                    secondes = st.session_state.flux.temps_en_zones(cles_periode[avec_flux], bornes)
+                    noms_zones = ['Sous zone 1'] + list(zones.keys())
+                    df_zones = pd.DataFrame(secondes / 60, columns=noms_zones).round(1)
+                    seances_flux = df_analyse[avec_flux]
+                    df_zones.insert(0, 'date', seances_flux['date'].to_numpy())
+                    df_zones.insert(1, 'sport', seances_flux['sport'].to_numpy())
+                    # Semaine ISO repérée par son lundi
+                    semaines = df_zones['date'].dt.normalize() - pd.to_timedelta(df_zones['date'].dt.weekday, unit='D')
+                    zones_hebdo = df_zones.groupby(semaines)[noms_zones].sum()
+                    
+                    fig_temps_zones = go.Figure()
+                    for nom_zone, couleur in zip(noms_zones, ['#a0aec0'] + COULEURS_ZONES):
+                        fig_temps_zones.add_trace(go.Bar(
+                            name=nom_zone, x=zones_hebdo.index, y=zones_hebdo[nom_zone], marker_color=couleur
+                        ))
+                    fig_temps_zones.update_layout(
+                        barmode='stack',
+                        title='Temps par zone et par semaine',
+                        xaxis_title='Semaine',
+                        yaxis_title='Minutes',
+                        height=400,
+                        template=None,
+                        plot_bgcolor='rgba(0,0,0,0)',
+                        paper_bgcolor='rgba(0,0,0,0)'
+                    )
+                    st.plotly_chart(fig_temps_zones, use_container_width=True)
+                    
+                    with st.expander("📋 Minutes par zone et par séance"):
+                        df_zones['date'] = df_zones['date'].dt.strftime('%d/%m/%Y')
+                        st.dataframe(df_zones, use_container_width=True, hide_index=True)
+                
                 # Corrélations entre métriques
                 st.markdown("### 🔗 Corrélations entre Métriques")
                 col1, col2 = st.columns(2)
                 
-                # Convertir les colonnes numériques pour éviter les erreurs de type
-                df_corr = df_analyse.copy()
-                numeric_cols = ['distance_km', 'calories', 'duree_min', 'vitesse_moy', 'frequence_cardiaque_moy']
-                for col in numeric_cols:
-                    if col in df_corr.columns:
-                        df_corr[col] = pd.to_numeric(df_corr[col], errors='coerce').fillna(0)
+                df_corr = donnees_correlations(tampon, debut_periode)
                 
-                # Vérifier si statsmodels est disponible pour les trendlines
-                try:
-                    import statsmodels
-                    trendline_option = 'ols'
-                except ImportError:
-                    trendline_option = None
+                # Droites de tendance si statsmodels est installé (chargé par plotly au premier tracé)
+                trendline_option = 'ols' if STATSMODELS_DISPONIBLE else None
                 
                 with col1:
                     try:
@@ -1090,56 +1167,107 @@ with col_right:
                 
                 # Analyse par sport
                 st.markdown("### 🏅 Analyse par Sport")
-                sport_stats = df_analyse.groupby('sport').agg({
-                    'distance_km': ['sum', 'mean', 'count'],
-                    'duree_min': ['sum', 'mean'],
-                    'calories': ['sum', 'mean'],
-                    'vitesse_moy': 'mean'
-                }).round(2)
-                
-                sport_stats.columns = ['Distance Totale (km)', 'Distance Moy (km)', 'Nombre', 
-                                      'Durée Totale (min)', 'Durée Moy (min)', 
-                                      'Calories Totales', 'Calories Moy', 'Vitesse Moy (km/h)']
+                sport_stats = statistiques_par_sport(tampon, debut_periode)
                 
                 st.dataframe(sport_stats, use_container_width=True)
                 
                 # Graphique d'intensité par semaine
                 st.markdown("### 📅 Intensité Hebdomadaire")
-                df_analyse['semaine'] = df_analyse['date'].dt.to_period('W').astype(str)
-                intensite_hebdo = df_analyse.groupby('semaine').agg({
-                    'distance_km': 'sum',
-                    'duree_min': 'sum',
-                    'calories': 'sum'
-                }).reset_index()
-                
-                fig_hebdo = go.Figure()
-                fig_hebdo.add_trace(go.Bar(
-                    x=intensite_hebdo['semaine'],
-                    y=intensite_hebdo['distance_km'],
-                    name='Distance (km)',
-                    marker_color='#667eea'
-                ))
-                fig_hebdo.add_trace(go.Scatter(
-                    x=intensite_hebdo['semaine'],
-                    y=intensite_hebdo['duree_min'],
-                    name='Durée (min)',
-                    yaxis='y2',
-                    line=dict(color='#f56565', width=3)
-                ))
-                
-                fig_hebdo.update_layout(
-                    title='Charge d\'entraînement hebdomadaire',
-                    xaxis_title='Semaine',
-                    yaxis_title='Distance (km)',
-                    yaxis2=dict(title='Durée (min)', overlaying='y', side='right'),
-                    height=400,
-                    template=None,
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)'
-                )
+                fig_hebdo = figure_hebdo(tampon, debut_periode)
                 st.plotly_chart(fig_hebdo, use_container_width=True)
             else:
                 st.warning("⚠️ Aucune donnée disponible pour cette période.")
+            
+            # Détail seconde par seconde des séances ayant des flux
+            cles_flux = st.session_state.flux.cles()
+            if cles_flux:
+                st.markdown("### 🔬 Détail d'une Séance")
+                positions = np.flatnonzero(np.isin(st.session_state.tampon.identifiants(), list(cles_flux)))[::-1]
+                if len(positions):
+                    cle = choisir_seance("Séance", positions, key="seance_flux")
+                    afficher_flux(st.session_state.flux.lire(cle))
+
+    # Section: Forme & Fatigue (modèle de Banister)
+    elif menu == "⚡ Forme & Fatigue":
+        st.markdown("## ⚡ Forme & Fatigue")
+        st.caption("Modèle de Banister sur la charge quotidienne (TRIMP) : CTL = charge chronique (42 j), "
+                   "ATL = charge aiguë (7 j), TSB = forme (CTL - ATL de la veille)")
+        
+        series_charge = st.session_state.tampon.banister.series()
+        
+        if series_charge.empty:
+            st.info("🔍 Aucune séance avec fréquence cardiaque pour calculer la charge d'entraînement.")
+        else:
+            derniere = series_charge.iloc[-1]
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("🏋️ Forme physique (CTL)", f"{derniere['ctl']:.1f}")
+            with col2:
+                st.metric("😓 Fatigue (ATL)", f"{derniere['atl']:.1f}")
+            with col3:
+                st.metric("⚖️ Forme du jour (TSB)", f"{derniere['tsb']:+.1f}")
+                if derniere['tsb'] > 5:
+                    st.caption("🟢 Frais - prêt pour une compétition")
+                elif derniere['tsb'] > -10:
+                    st.caption("🟡 Neutre")
+                elif derniere['tsb'] > -30:
+                    st.caption("🟠 Entraînement productif")
+                else:
+                    st.caption("🔴 Risque de surcharge")
+            
+            periode_charge = st.selectbox(
+                "Choisir une période",
+                ["3 derniers mois", "6 derniers mois", "1 an", "Tout"],
+                key="periode_charge"
+            )
+            jours_periode = {"3 derniers mois": 90, "6 derniers mois": 180, "1 an": 365}
+            if periode_charge in jours_periode:
+                debut_charge = datetime.now() - timedelta(days=jours_periode[periode_charge])
+                series_affichee = series_charge[series_charge['date'] >= debut_charge]
+            else:
+                series_affichee = series_charge
+            
+            fig_banister = go.Figure()
+            fig_banister.add_trace(go.Scatter(
+                x=series_affichee['date'], y=series_affichee['ctl'],
+                name='CTL (forme)', line=dict(color='#667eea', width=3)
+            ))
+            fig_banister.add_trace(go.Scatter(
+                x=series_affichee['date'], y=series_affichee['atl'],
+                name='ATL (fatigue)', line=dict(color='#f56565', width=2)
+            ))
+            fig_banister.add_trace(go.Bar(
+                x=series_affichee['date'], y=series_affichee['tsb'],
+                name='TSB (forme du jour)', yaxis='y2', marker_color='#48bb78', opacity=0.4
+            ))
+            fig_banister.update_layout(
+                title='Forme, Fatigue et Fraîcheur',
+                xaxis_title='Date',
+                yaxis_title='Charge (TRIMP/jour)',
+                yaxis2=dict(title='TSB', overlaying='y', side='right'),
+                height=450,
+                template=None,
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                hovermode='x unified'
+            )
+            st.plotly_chart(fig_banister, use_container_width=True)
+            
+            fig_charge = go.Figure()
+            fig_charge.add_trace(go.Bar(
+                x=series_affichee['date'], y=series_affichee['charge'],
+                name='Charge quotidienne', marker_color='#764ba2'
+            ))
+            fig_charge.update_layout(
+                title='Charge Quotidienne (TRIMP)',
+                xaxis_title='Date',
+                yaxis_title='TRIMP',
+                height=300,
+                template=None,
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)'
+            )
+            st.plotly_chart(fig_charge, use_container_width=True)
 
     # Section 4: Objectifs & Records
     elif menu == "🎯 Objectifs & Records":
@@ -1206,7 +1334,8 @@ with col_right:
             
             progression = calculer_progression_objectifs(
                 st.session_state.performances, 
-                st.session_state.objectifs
+                st.session_state.objectifs,
+                st.session_state.tampon.agregats
             )
             
             col1, col2, col3 = st.columns(3)
@@ -1228,39 +1357,8 @@ with col_right:
             
             # Graphique radar des objectifs
             if not st.session_state.performances.empty:
-                categories = ['Distance', 'Séances', 'Calories', 'Durée']
-                objectifs_vals = [
-                    st.session_state.objectifs['distance_hebdo'],
-                    st.session_state.objectifs['seances_hebdo'],
-                    st.session_state.objectifs['calories_hebdo'] / 100,
-                    st.session_state.objectifs['duree_hebdo'] / 10
-                ]
-                progression_vals = [
-                    progression['distance_hebdo'],
-                    progression['seances_hebdo'],
-                    progression['calories_hebdo'] / 100,
-                    progression['duree_hebdo'] / 10
-                ]
-                
-                fig_radar = go.Figure()
-                fig_radar.add_trace(go.Scatterpolar(
-                    r=objectifs_vals + [objectifs_vals[0]],
-                    theta=categories + [categories[0]],
-                    fill='toself',
-                    name='Objectifs',
-                    line_color='#667eea'
-                ))
-                fig_radar.add_trace(go.Scatterpolar(
-                    r=progression_vals + [progression_vals[0]],
-                    theta=categories + [categories[0]],
-                    fill='toself',
-                    name='Progression',
-                    line_color='#48bb78'
-                ))
-                fig_radar.update_layout(
-                    polar=dict(radialaxis=dict(visible=True)),
-                    showlegend=True,
-                    title="Radar de Progression"
+                fig_radar = figure_radar(
+                    st.session_state.tampon, st.session_state.objectifs, progression
                 )
                 st.plotly_chart(fig_radar, use_container_width=True)
         
@@ -1270,21 +1368,79 @@ with col_right:
             if st.session_state.performances.empty:
                 st.info("📊 Ajoutez des performances pour voir vos records!")
             else:
-                df = st.session_state.performances.copy()
-                records = obtenir_records_personnels(df)
+                # Index tenu à jour à chaque ajout : aucune passe sur l'historique
+                records = st.session_state.tampon.records.records()
                 
                 for sport, sport_records in records.items():
                     st.markdown(f"#### 🏅 {sport}")
+                    seances = sport_records['seances']
                     col1, col2, col3, col4 = st.columns(4)
                     with col1:
                         st.metric("📏 Plus longue distance", f"{sport_records['distance_max']:.2f} km")
+                        afficher_date_record(seances.get('distance_max'))
                     with col2:
                         st.metric("⏱️ Plus longue durée", f"{sport_records['duree_max']:.0f} min")
+                        afficher_date_record(seances.get('duree_max'))
                     with col3:
                         st.metric("⚡ Meilleure vitesse", f"{sport_records['vitesse_max']:.2f} km/h")
+                        afficher_date_record(seances.get('vitesse_max'))
                     with col4:
                         st.metric("🔥 Plus de calories", f"{sport_records['calories_max']:.0f} kcal")
+                        afficher_date_record(seances.get('calories_max'))
                     st.markdown("---")
+            
+            # Meilleurs efforts par durée, à partir des flux seconde par seconde
+            cles_flux = st.session_state.flux.cles()
+            cles = st.session_state.tampon.identifiants()
+            avec_flux = np.isin(cles, list(cles_flux))
+            if avec_flux.any():
+                st.markdown("### 📈 Courbe des Meilleurs Efforts")
+                seances_flux = st.session_state.performances[avec_flux].assign(cle=cles[avec_flux])
+                col1, col2 = st.columns(2)
+                with col1:
+                    champ_effort = st.selectbox("Mesure", list(CHAMPS_EFFORT), format_func=CHAMPS_EFFORT.get)
+                with col2:
+                    sport_effort = st.selectbox("Sport", ["Tous"] + sorted(seances_flux['sport'].dropna().unique()),
+                                                key="sport_effort")
+                if sport_effort != "Tous":
+                    seances_flux = seances_flux[seances_flux['sport'] == sport_effort]
+                
+                courbe = st.session_state.courbes_efforts.setdefault(
+                    (champ_effort, sport_effort), CourbeEfforts(champ_effort)
+                )
+                courbe.mettre_a_jour(st.session_state.flux, seances_flux['cle'])
+                df_courbe = courbe.tableau().merge(seances_flux[['cle', 'date', 'sport']], on='cle', how='left')
+                
+                if df_courbe.empty:
+                    st.info("Aucune mesure de ce type dans les flux enregistrés.")
+                else:
+                    df_courbe['duree'] = df_courbe['duree_s'].map(libelle_duree)
+                    graduations = [5, 30, 60, 300, 600, 1800, 3600, 10800]
+                    fig_efforts = go.Figure(go.Scatter(
+                        x=df_courbe['duree_s'], y=df_courbe['valeur'], mode='lines+markers',
+                        customdata=np.stack([df_courbe['duree'], df_courbe['date'].dt.strftime('%d/%m/%Y')], axis=-1),
+                        hovertemplate='%{customdata[0]} : %{y:.1f}<br>%{customdata[1]}<extra></extra>',
+                        line=dict(color='#667eea', width=3)
+                    ))
+                    fig_efforts.update_layout(
+                        xaxis=dict(title='Durée', type='log', tickvals=graduations,
+                                   ticktext=[libelle_duree(d) for d in graduations]),
+                        yaxis_title=CHAMPS_EFFORT[champ_effort],
+                        height=400,
+                        template=None,
+                        plot_bgcolor='rgba(0,0,0,0)',
+                        paper_bgcolor='rgba(0,0,0,0)'
+                    )
+                    st.plotly_chart(fig_efforts, use_container_width=True)
+                    
+                    with st.expander("📋 Détail par durée"):
+                        df_courbe['date'] = df_courbe['date'].dt.strftime('%d/%m/%Y')
+                        st.dataframe(
+                            df_courbe[['duree', 'valeur', 'date', 'sport']].round(1)
+                            .rename(columns={'duree': 'Durée', 'valeur': CHAMPS_EFFORT[champ_effort],
+                                             'date': 'Date', 'sport': 'Sport'}),
+                            use_container_width=True, hide_index=True
+                        )
         
         with tab3:
             st.markdown("### 👤 Mon Profil Sportif")
@@ -1516,16 +1672,16 @@ with col_right:
             if st.session_state.performances.empty:
                 st.info("🔍 Aucune donnée disponible pour l'export.")
             else:
-                df = st.session_state.performances.copy()
-                df['date'] = pd.to_datetime(df['date'])
+                df = st.session_state.performances
+                date_min, date_max = st.session_state.tampon.bornes_dates()
                 
                 st.markdown("#### ⚙️ Configuration de l'Export")
                 
                 col1, col2 = st.columns(2)
                 with col1:
-                    date_debut = st.date_input("📅 Date de début", df['date'].min(), key="export_start")
+                    date_debut = st.date_input("📅 Date de début", date_min, key="export_start")
                 with col2:
-                    date_fin = st.date_input("📅 Date de fin", df['date'].max(), key="export_end")
+                    date_fin = st.date_input("📅 Date de fin", date_max, key="export_end")
                 
                 sport_filtre = st.multiselect(
                     "🏅 Sports à inclure",
@@ -1533,12 +1689,14 @@ with col_right:
                     default=list(df['sport'].unique())
                 )
                 
-                df_export = df[(df['date'] >= pd.to_datetime(date_debut)) & 
-                               (df['date'] <= pd.to_datetime(date_fin)) &
-                               (df['sport'].isin(sport_filtre))]
+                df_export = st.session_state.tampon.plage(date_debut, date_fin)
+                df_export = df_export[df_export['sport'].isin(sport_filtre)]
                 
                 if not df_export.empty:
-                    metriques = calculer_metriques_avancees(df_export)
+                    metriques = metriques_depuis_agregats(
+                        st.session_state.tampon.agregats,
+                        sports=sport_filtre, debut=date_debut, fin=date_fin
+                    )
                     
                     st.markdown("#### 👁️ Aperçu")
                     col1, col2, col3, col4 = st.columns(4)
@@ -1557,20 +1715,19 @@ with col_right:
                     with col1:
                         # Export PDF
                         st.markdown("#### 📄 Rapport PDF")
+                        if 'rapports' not in st.session_state:
+                            st.session_state.rapports = GenerateurRapports(generer_rapport)
+                        # Un rapport par (version des données, période, sports) : généré une seule fois,
+                        # en arrière-plan, puis gardé pour les téléchargements suivants
+                        cle_rapport = (st.session_state.tampon.version, date_debut, date_fin, tuple(sorted(sport_filtre)))
                         if st.button("📄 Générer le Rapport PDF", type="primary", use_container_width=True):
-                            with st.spinner("⏳ Génération du rapport en cours..."):
-                                graphiques_base64 = {}
-                                pdf_buffer = generer_rapport_pdf(df_export, metriques, graphiques_base64)
-                                
-                                st.success("✅ Rapport généré avec succès!")
-                                
-                                st.download_button(
-                                    label="📥 Télécharger le PDF",
-                                    data=pdf_buffer,
-                                    file_name=f"rapport_performances_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
-                                    mime="application/pdf",
-                                    use_container_width=True
-                                )
+                            # Graphiques tirés des agrégats, construits ici : le fil du rapport ne lit pas le tampon
+                            from rapport_pdf import graphiques_rapport
+                            graphiques = graphiques_rapport(
+                                st.session_state.tampon.agregats, sport_filtre, date_debut, date_fin
+                            )
+                            st.session_state.rapports.lancer(cle_rapport, df_export, metriques, graphiques)
+                        afficher_rapport(cle_rapport)
                     
                     with col2:
                         # Export CSV
@@ -1625,11 +1782,12 @@ with col_right:
             
             if uploaded_file is not None:
                 try:
-                    df_import = pd.read_csv(uploaded_file)
+                    # Seules les premières lignes sont lues pour l'aperçu ; l'import se fait par lots
+                    df_apercu = lire_apercu(uploaded_file)
                     
                     st.markdown("#### 👁️ Aperçu des données importées")
-                    st.dataframe(df_import.head(10), use_container_width=True)
-                    st.caption(f"Total: {len(df_import)} enregistrements")
+                    st.dataframe(df_apercu, use_container_width=True)
+                    st.caption(f"Fichier : {uploaded_file.size / 1e6:.1f} Mo — import par lots de {TAILLE_LOT:,} lignes")
                     
                     col1, col2 = st.columns(2)
                     with col1:
@@ -1640,28 +1798,94 @@ with col_right:
                         )
                     
                     if st.button("✅ Confirmer l'import", type="primary"):
-                        # Convertir les types
-                        numeric_cols = ['duree_min', 'distance_km', 'calories', 'frequence_cardiaque_moy', 
-                                       'frequence_cardiaque_max', 'vitesse_moy', 'elevation_m']
-                        for col in numeric_cols:
-                            if col in df_import.columns:
-                                df_import[col] = pd.to_numeric(df_import[col], errors='coerce').fillna(0)
+                        remplacer = mode_import == "Remplacer les données existantes"
+                        # En remplacement, l'import se fait dans un nouveau tampon échangé à la fin :
+                        # une erreur en cours de lecture laisse les données existantes intactes
+                        if remplacer:
+                            # Versions toujours croissantes : aucune clé de rapport ne désigne les anciennes données
+                            tampon = TamponPerformances(
+                                profil_trimp=st.session_state.tampon.profil_trimp,
+                                version=st.session_state.tampon.version + 1
+                            )
+                        else:
+                            tampon = st.session_state.tampon
+                        barre = st.progress(0.0, text="Import en cours...")
+                        try:
+                            importees, rejetees, doublons = importer_csv(
+                                uploaded_file, tampon,
+                                progression=lambda fraction: barre.progress(fraction, text=f"Import en cours... {fraction:.0%}"),
+                                dedoublonner=not remplacer
+                            )
+                        finally:
+                            # Les lots déjà ajoutés sont écrits sur disque même si la lecture échoue
+                            if not remplacer:
+                                sauvegarder_tampon(tampon)
                         
-                        if mode_import == "Remplacer les données existantes":
-                            st.session_state.performances = df_import
-                            st.success(f"✅ {len(df_import)} enregistrements importés (données remplacées)!")
+                        if remplacer:
+                            anciens = st.session_state.tampon.identifiants()
+                            st.session_state.tampon = tampon
+                            sauvegarder_tampon(tampon)
+                            # Les séances remplacées emportent leurs flux
+                            st.session_state.flux.purger(anciens)
+                            st.success(f"✅ {importees} enregistrements importés (données remplacées)!")
                         else:
-                            st.session_state.performances = pd.concat([
-                                st.session_state.performances,
-                                df_import
-                            ], ignore_index=True)
-                            st.success(f"✅ {len(df_import)} enregistrements ajoutés!")
+                            st.success(f"✅ {importees} enregistrements ajoutés!")
+                        if doublons:
+                            st.info(f"ℹ️ {doublons} séances déjà présentes ont été ignorées (doublons).")
+                        if rejetees:
+                            st.warning(f"⚠️ {rejetees} lignes sans date valide ont été ignorées.")
                         
                         st.balloons()
                         
                 except Exception as e:
                     st.error(f"❌ Erreur lors de l'import: {str(e)}")
             
+            st.markdown("---")
+            st.markdown("#### ⌚ Importer des fichiers d'activité (FIT, GPX, TCX)")
+            st.caption("Le résumé de chaque séance (sport, durée, distance, FC, dénivelé) est ajouté aux données existantes. "
+                       "Pour les traces GPX/TCX, la durée est le temps en mouvement.")
+            
+            fichiers_activite = st.file_uploader(
+                "📂 Choisir des fichiers d'activité", type=['fit', 'gpx', 'tcx'], accept_multiple_files=True
+            )
+            
+            if fichiers_activite and st.button("✅ Importer les fichiers d'activité", type="primary"):
+                fichiers_fit = [f for f in fichiers_activite if f.name.lower().endswith('.fit')]
+                fichiers_traces = [f for f in fichiers_activite if not f.name.lower().endswith('.fit')]
+                with st.spinner("Lecture des fichiers d'activité..."):
+                    importees, doublons, erreurs = importer_fit(fichiers_fit, st.session_state.tampon)
+                    importees_traces, doublons_traces, erreurs_traces = importer_traces(fichiers_traces, st.session_state.tampon)
+                importees += importees_traces
+                doublons += doublons_traces
+                erreurs.update(erreurs_traces)
+                if importees:
+                    sauvegarder_tampon(st.session_state.tampon)
+                st.success(f"✅ {importees} séances importées depuis {len(fichiers_activite) - len(erreurs)} fichiers!")
+                if doublons:
+                    st.info(f"ℹ️ {doublons} séances déjà présentes ont été ignorées (doublons).")
+                for nom, erreur in erreurs.items():
+                    st.error(f"❌ {nom} : {erreur}")
+            
+            st.markdown("---")
+            st.markdown("#### 📈 Importer des données seconde par seconde")
+            st.caption("CSV avec une ligne par échantillon : `temps_s` (ou horodatage), `fc`, `vitesse_kmh`, "
+                       "`altitude_m`, `cadence`. Les flux sont rattachés à une séance existante.")
+            
+            if st.session_state.performances.empty:
+                st.info("Enregistrez d'abord la séance à laquelle rattacher les flux.")
+            else:
+                # Séances datées, les plus récentes en premier
+                positions = np.flatnonzero(st.session_state.performances['date'].notna().to_numpy())[::-1][:500]
+                cle = choisir_seance("Séance concernée", positions, key="seance_import_flux")
+                fichier_flux = st.file_uploader("📂 Choisir un CSV d'échantillons", type=['csv'], key="import_flux")
+                if fichier_flux is not None and st.button("✅ Importer les flux", type="primary"):
+                    try:
+                        flux = lire_csv_flux(fichier_flux)
+                        st.session_state.flux.enregistrer(cle, flux)
+                        st.success(f"✅ {len(flux)} échantillons enregistrés ({flux['temps_s'][-1] / 60:.0f} min).")
+                    except Exception as e:
+                        st.error(f"❌ Erreur lors de l'import des flux: {str(e)}")
+            
             st.markdown("---")
             st.markdown("#### 📋 Télécharger un modèle CSV")
             
@@ -0,0 +1,318 @@
+"""
+Rapport PDF des performances (reportlab).
+
+Le tableau des séances couvre tout l'historique sélectionné. Les cellules
+sont formatées colonne par colonne (opérations NumPy sur les tableaux, sans
+``iterrows``), et le tableau est découpé en blocs ``LongTable`` de
+``TAILLE_BLOC_PDF`` lignes qui s'enchaînent de page en page (en-tête
+répété). Chaque bloc n'est formaté et construit qu'au moment de sa mise en
+page puis abandonné une fois dessiné : la mémoire ne dépend pas du nombre
+de séances du rapport.
+
+Les graphiques (volume hebdomadaire, tendance de la FC, répartition par
+sport) sont dessinés en vectoriel avec ``reportlab.graphics`` directement à
+partir des agrégats matérialisés : ni export d'image, ni passe sur les séances.
+"""
+from datetime import datetime
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+from reportlab.graphics.charts.barcharts import VerticalBarChart
+from reportlab.graphics.charts.lineplots import LinePlot
+from reportlab.graphics.charts.piecharts import Pie
+from reportlab.graphics.shapes import Drawing
+from reportlab.graphics.widgets.markers import makeMarker
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import (
+    Flowable, LongTable, PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+)
+
+# Un bloc couvre quelques pages : peu de découpes de tableau, peu de lignes en mémoire
+TAILLE_BLOC_PDF = 100
+
+# Texte des valeurs manquantes
+VIDE = '-'
+
+# Colonnes du tableau : (titre, colonne, format des nombres ou None pour du texte, largeur)
+COLONNES_TABLEAU = [
+    ('Date', 'date', None, 1.2 * inch),
+    ('Sport', 'sport', None, 1 * inch),
+    ('Type', 'type_entrainement', None, 1.2 * inch),
+    ('Durée', 'duree_min', '%.0f min', 1 * inch),
+    ('Distance', 'distance_km', '%.2f km', 1.2 * inch),
+    ('Vitesse', 'vitesse_moy', '%.2f km/h', 1.2 * inch),
+]
+
+STYLE_TABLEAU = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#667eea')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 8),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+
+def _texte_categories(serie):
+    """Textes d'une colonne de catégories : une chaîne par catégorie, indexée par les codes"""
+    if not isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.astype(object).where(serie.notna(), VIDE).astype(str).to_numpy()
+    libelles = np.append(serie.cat.categories.astype(str).to_numpy(dtype=object), VIDE)
+    # Code -1 (valeur manquante) -> dernier libellé
+    return libelles[serie.cat.codes.to_numpy()]
+
+
+def _texte_nombres(serie, format_nombre):
+    valeurs = serie.to_numpy(dtype=np.float64)
+    textes = np.char.mod(format_nombre, valeurs).astype(object)
+    textes[np.isnan(valeurs)] = VIDE
+    return textes
+
+
+def formater_seances(df):
+    """Lignes de texte du tableau (liste de listes), formatées colonne par colonne"""
+    colonnes = []
+    for _, colonne, format_nombre, _ in COLONNES_TABLEAU:
+        if colonne == 'date':
+            textes = df['date'].dt.strftime('%d/%m/%Y').fillna(VIDE).to_numpy(dtype=object)
+        elif format_nombre is None:
+            textes = _texte_categories(df[colonne])
+        else:
+            textes = _texte_nombres(df[colonne], format_nombre)
+        colonnes.append(textes)
+    return np.column_stack(colonnes).tolist() if len(df) else []
+
+
+class _BlocDiffere(Flowable):
+    """Bloc du tableau construit seulement au moment de sa mise en page"""
+
+    def __init__(self, construire):
+        super().__init__()
+        self._construire = construire
+        self._tableau = None
+
+    def _obtenir(self):
+        if self._tableau is None:
+            self._tableau = self._construire()
+        return self._tableau
+
+    def wrap(self, largeur, hauteur):
+        self.width, self.height = self._obtenir().wrapOn(self.canv, largeur, hauteur)
+        return self.width, self.height
+
+    def split(self, largeur, hauteur):
+        return self._obtenir().splitOn(self.canv, largeur, hauteur)
+
+    def drawOn(self, canvas, x, y, _sW=0):
+        self._obtenir().drawOn(canvas, x, y, _sW)
+        self._tableau = None
+
+
+def _bloc(df):
+    entete = [titre for titre, _, _, _ in COLONNES_TABLEAU]
+    largeurs = [largeur for _, _, _, largeur in COLONNES_TABLEAU]
+    return LongTable([entete] + formater_seances(df), colWidths=largeurs, repeatRows=1, style=STYLE_TABLEAU)
+
+
+def tableau_seances(df, taille_bloc=TAILLE_BLOC_PDF):
+    """Éléments reportlab du tableau de toutes les séances de df, par blocs de taille_bloc lignes"""
+    return [
+        _BlocDiffere(lambda debut=debut: _bloc(df.iloc[debut:debut + taille_bloc]))
+        for debut in range(0, len(df), taille_bloc)
+    ]
+
+
+# Dimensions des graphiques (points) : largeur utile d'une page A4 avec les marges du rapport
+LARGEUR_GRAPHIQUE = 500
+HAUTEUR_GRAPHIQUE = 200
+# Au-delà de ce nombre de semaines, le volume est présenté par mois
+MAX_SEMAINES_GRAPHIQUE = 104
+# Nombre d'étiquettes de dates sur l'axe horizontal
+N_ETIQUETTES = 8
+
+COULEURS_SPORTS = ['#667eea', '#48bb78', '#ed8936', '#f56565', '#9f7aea', '#4299e1', '#ecc94b', '#a0aec0']
+
+
+def _etiquettes(periodes, format_date):
+    """Libellés de l'axe des catégories : une date toutes les n périodes, vides entre les deux"""
+    pas = max(1, -(-len(periodes) // N_ETIQUETTES))
+    textes = periodes.dt.strftime(format_date).to_numpy(dtype=object)
+    textes[np.arange(len(textes)) % pas != 0] = ''
+    return textes.tolist()
+
+
+def _cumuls_actifs(agregats, periode, sports, debut, fin):
+    """Cumuls par période, périodes vides comprises, entre la première et la dernière période active"""
+    volumes = agregats.cumuls(periode, sports=sports, debut=debut, fin=fin, vides=True)
+    actives = np.flatnonzero(volumes['seances'].to_numpy() > 0)
+    if len(actives) == 0:
+        return volumes.iloc[:0]
+    return volumes.iloc[actives[0]:actives[-1] + 1].reset_index(drop=True)
+
+
+def _graphique_volume(agregats, sports, debut, fin):
+    format_date, titre = '%d/%m/%y', 'Volume hebdomadaire (km)'
+    volumes = _cumuls_actifs(agregats, 'semaine', sports, debut, fin)
+    if len(volumes) > MAX_SEMAINES_GRAPHIQUE:
+        format_date, titre = '%m/%Y', 'Volume mensuel (km)'
+        volumes = _cumuls_actifs(agregats, 'mois', sports, debut, fin)
+    if volumes.empty:
+        return None
+    dessin = Drawing(LARGEUR_GRAPHIQUE, HAUTEUR_GRAPHIQUE)
+    barres = VerticalBarChart()
+    barres.x, barres.y = 40, 30
+    barres.width, barres.height = LARGEUR_GRAPHIQUE - 60, HAUTEUR_GRAPHIQUE - 50
+    barres.data = [volumes['distance_km'].round(1).tolist()]
+    barres.bars[0].fillColor = colors.HexColor('#667eea')
+    barres.bars[0].strokeColor = None
+    barres.barSpacing = 0
+    barres.groupSpacing = 1 if len(volumes) > 30 else 3
+    barres.valueAxis.valueMin = 0
+    barres.valueAxis.labels.fontSize = 7
+    barres.categoryAxis.categoryNames = _etiquettes(volumes['periode'], format_date)
+    barres.categoryAxis.labels.fontSize = 7
+    barres.categoryAxis.labels.angle = 30
+    barres.categoryAxis.labels.boxAnchor = 'ne'
+    barres.categoryAxis.tickDown = 0
+    dessin.add(barres)
+    return titre, dessin
+
+
+def _graphique_fc(agregats, sports, debut, fin):
+    fc = agregats.moyennes('frequence_cardiaque_moy', 'semaine', sports=sports, debut=debut, fin=fin)
+    fc = fc[fc['frequence_cardiaque_moy'] > 0]
+    if len(fc) < 2:
+        return None
+    jours = (fc['periode'].to_numpy(dtype='datetime64[D]').astype(np.int64)).tolist()
+    dessin = Drawing(LARGEUR_GRAPHIQUE, HAUTEUR_GRAPHIQUE)
+    courbe = LinePlot()
+    courbe.x, courbe.y = 40, 30
+    courbe.width, courbe.height = LARGEUR_GRAPHIQUE - 60, HAUTEUR_GRAPHIQUE - 50
+    courbe.data = [list(zip(jours, fc['frequence_cardiaque_moy'].round(1).tolist()))]
+    courbe.lines[0].strokeColor = colors.HexColor('#e74c3c')
+    courbe.lines[0].strokeWidth = 1.5
+    if len(fc) <= 60:
+        courbe.lines[0].symbol = makeMarker('FilledCircle', size=3)
+    pas = max(1, -(-len(jours) // N_ETIQUETTES))
+    courbe.xValueAxis.valueMin, courbe.xValueAxis.valueMax = jours[0], jours[-1]
+    courbe.xValueAxis.valueSteps = jours[::pas]
+    courbe.xValueAxis.labelTextFormat = lambda jour: np.datetime64(int(jour), 'D').astype(object).strftime('%d/%m/%y')
+    courbe.xValueAxis.labels.fontSize = 7
+    courbe.yValueAxis.labels.fontSize = 7
+    dessin.add(courbe)
+    return 'FC moyenne par semaine (bpm)', dessin
+
+
+def _graphique_sports(agregats, sports, debut, fin):
+    repartition = agregats.seances_par_sport(sports=sports, debut=debut, fin=fin)
+    if repartition.empty:
+        return None
+    dessin = Drawing(LARGEUR_GRAPHIQUE, HAUTEUR_GRAPHIQUE)
+    camembert = Pie()
+    camembert.x, camembert.y = LARGEUR_GRAPHIQUE / 2 - 80, 20
+    camembert.width = camembert.height = 160
+    camembert.data = repartition.tolist()
+    total = repartition.sum()
+    camembert.labels = [f"{sport} ({n / total:.0%})" for sport, n in repartition.items()]
+    camembert.simpleLabels = False
+    camembert.slices.strokeColor = colors.white
+    camembert.slices.fontSize = 8
+    for i in range(len(repartition)):
+        camembert.slices[i].fillColor = colors.HexColor(COULEURS_SPORTS[i % len(COULEURS_SPORTS)])
+    dessin.add(camembert)
+    return 'Répartition des séances par sport', dessin
+
+
+def graphiques_rapport(agregats, sports=None, debut=None, fin=None):
+    """
+    Graphiques vectoriels du rapport, calculés depuis les agrégats (AgregatsPerformances) :
+    liste de (titre, Drawing) pour le volume, la tendance de la FC et la répartition par sport.
+    """
+    graphiques = [
+        construire(agregats, sports, debut, fin)
+        for construire in (_graphique_volume, _graphique_fc, _graphique_sports)
+    ]
+    return [graphique for graphique in graphiques if graphique is not None]
+
+
+def generer_rapport_pdf(df, metriques, graphiques, progression=None):
+    """
+    Rapport PDF ; graphiques : liste de (titre, Drawing) de graphiques_rapport,
+    progression(type, valeur) reçoit les rappels d'avancement de reportlab
+    """
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=18)
+    if progression is not None:
+        doc.setProgressCallBack(progression)
+    
+    elements = []
+    styles = getSampleStyleSheet()
+    
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=24,
+        textColor=colors.HexColor('#667eea'),
+        spaceAfter=30,
+        alignment=TA_CENTER
+    )
+    
+    elements.append(Paragraph("Rapport de Performance Sportive", title_style))
+    elements.append(Spacer(1, 12))
+    elements.append(Paragraph(f"Généré le {datetime.now().strftime('%d/%m/%Y à %H:%M')}", styles['Normal']))
+    elements.append(Spacer(1, 20))
+    
+    elements.append(Paragraph("Résumé des Performances", styles['Heading2']))
+    elements.append(Spacer(1, 12))
+    
+    metriques_data = [
+        ['Métrique', 'Valeur'],
+        ['Total d\'entraînements', f"{metriques['total_entrainements']}"],
+        ['Durée totale', f"{metriques['duree_totale']:.0f} min"],
+        ['Distance totale', f"{metriques['distance_totale']:.2f} km"],
+        ['Calories brûlées', f"{metriques['calories_totales']:.0f} kcal"],
+        ['Vitesse moyenne', f"{metriques['vitesse_moyenne']:.2f} km/h"],
+        ['FC moyenne', f"{metriques['fc_moyenne']:.0f} bpm"],
+        ['Élévation totale', f"{metriques['elevation_totale']:.0f} m"]
+    ]
+    
+    t = Table(metriques_data, colWidths=[3*inch, 2*inch])
+    t.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#667eea')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    
+    elements.append(t)
+    elements.append(Spacer(1, 20))
+    
+    if graphiques:
+        elements.append(Paragraph("Graphiques", styles['Heading2']))
+        for titre, dessin in graphiques:
+            elements.append(Paragraph(titre, styles['Heading4']))
+            elements.append(dessin)
+            elements.append(Spacer(1, 12))
+    
+    if not df.empty:
+        elements.append(PageBreak())
+        elements.append(Paragraph(f"Détail des Entraînements ({len(df)} séances)", styles['Heading2']))
+        elements.append(Spacer(1, 12))
+        
+        # Toutes les séances, par blocs construits au fil de la mise en page
+        elements.extend(tableau_seances(df))
+    
+    doc.build(elements)
+    buffer.seek(0)
+    return buffer
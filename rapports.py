@@ -0,0 +1,102 @@
+"""
+Génération des rapports PDF en arrière-plan.
+
+La construction d'un rapport (reportlab) ne bloque plus le script Streamlit :
+elle est confiée à un fil d'exécution dédié, et la page interroge
+l'avancement à intervalles réguliers. Les PDF terminés sont gardés en
+mémoire selon leur clé (version des données, période, sports) : cliquer de
+nouveau ou retélécharger ne reconstruit pas le rapport.
+"""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Nombre de rapports gardés (les plus anciens terminés sont abandonnés en premier)
+MAX_RAPPORTS = 8
+
+
+class TacheRapport:
+    """Rapport en cours de génération ou terminé"""
+
+    def __init__(self):
+        self.progression = 0.0
+        # Nombre d'éléments du document, annoncé par reportlab au début de la mise en page
+        self.total = 1
+        self.debut = time.monotonic()
+        self.fin = None
+        self.future = None
+
+    def terminee(self):
+        return self.future.done()
+
+    def erreur(self):
+        """Exception levée pendant la génération, None si elle a réussi ou est en cours"""
+        return self.future.exception() if self.future.done() else None
+
+    def pdf(self):
+        """Contenu du PDF (octets) ; uniquement quand la tâche est terminée"""
+        return self.future.result()
+
+    def duree(self):
+        """Durée de la génération (jusqu'à maintenant si elle est en cours)"""
+        return (self.fin or time.monotonic()) - self.debut
+
+
+class GenerateurRapports:
+    """
+    File de génération de rapports PDF : un rapport à la fois, dans un fil dédié.
+    generer(*args, progression=callable) doit renvoyer le PDF (BytesIO ou octets).
+    """
+
+    def __init__(self, generer, max_rapports=MAX_RAPPORTS):
+        self.generer = generer
+        self.max_rapports = max_rapports
+        self.taches = OrderedDict()
+        self._verrou = threading.Lock()
+        self._executeur = ThreadPoolExecutor(max_workers=1, thread_name_prefix='rapport')
+
+    def obtenir(self, cle):
+        """Tâche associée à cle (en cours ou terminée), None si aucune"""
+        with self._verrou:
+            tache = self.taches.get(cle)
+            if tache is not None:
+                self.taches.move_to_end(cle)
+            return tache
+
+    def lancer(self, cle, *args):
+        """
+        Lance la génération du rapport cle, sauf s'il est déjà prêt ou en cours.
+        Un rapport dont la génération a échoué est relancé.
+        """
+        with self._verrou:
+            tache = self.taches.get(cle)
+            if tache is not None and tache.erreur() is None:
+                self.taches.move_to_end(cle)
+                return tache
+            tache = TacheRapport()
+            tache.future = self._executeur.submit(self._executer, tache, args)
+            self.taches[cle] = tache
+            self._evincer()
+            return tache
+
+    def _executer(self, tache, args):
+        def progression(type_evenement, valeur):
+            # Rappels de reportlab : nombre d'éléments à placer, puis éléments placés
+            if type_evenement == 'SIZE_EST':
+                tache.total = max(valeur, 1)
+            elif type_evenement == 'PROGRESS':
+                tache.progression = min(valeur / tache.total, 1.0)
+
+        try:
+            pdf = self.generer(*args, progression=progression)
+        finally:
+            tache.fin = time.monotonic()
+        tache.progression = 1.0
+        return pdf.getvalue() if hasattr(pdf, 'getvalue') else bytes(pdf)
+
+    def _evincer(self):
+        """Abandonne les plus anciens rapports terminés au-delà de max_rapports"""
+        terminees = [cle for cle, tache in self.taches.items() if tache.terminee()]
+        for cle in terminees[:max(len(self.taches) - self.max_rapports, 0)]:
+            del self.taches[cle]
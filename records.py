@@ -0,0 +1,98 @@
+"""
+Index des records personnels par sport.
+
+Les records sont établis en une seule passe sur un lot de séances (un
+``groupby`` + ``idxmax`` par colonne), puis tenus à jour en O(1) à chaque
+nouvelle séance : il suffit de comparer ses valeurs aux records courants.
+Chaque record garde la séance qui l'a établi (identifiant stable et date).
+"""
+import numpy as np
+import pandas as pd
+
+# Record -> colonne de performance correspondante
+COLONNES_RECORDS = {
+    'distance_max': 'distance_km',
+    'duree_max': 'duree_min',
+    'vitesse_max': 'vitesse_moy',
+    'calories_max': 'calories'
+}
+
+LIBELLES_RECORDS = {
+    'distance_max': 'Plus longue distance',
+    'duree_max': 'Plus longue durée',
+    'vitesse_max': 'Meilleure vitesse',
+    'calories_max': 'Plus de calories'
+}
+
+
+class IndexRecords:
+    """Records par sport : valeur, séance (identifiant et date) et durée de la séance"""
+
+    def __init__(self):
+        self.reinitialiser()
+
+    def reinitialiser(self):
+        self.par_sport = {}
+
+    def _proposer(self, sport, record, valeur, seance, date, duree):
+        """Enregistre la valeur si elle bat le record courant ; renvoie l'ancien record battu"""
+        records = self.par_sport.setdefault(sport, {})
+        ancien = records.get(record)
+        if ancien is not None and valeur <= ancien['valeur']:
+            return None
+        records[record] = {'valeur': float(valeur), 'seance': int(seance), 'date': date, 'duree': float(duree)}
+        return ancien if ancien is not None else {}
+
+    def ajouter_lot(self, sports, seances, dates, valeurs):
+        """Met à jour les records avec un lot de séances (une seule passe groupby/idxmax)"""
+        sports = pd.Series(sports, dtype=object)
+        valides = sports.notna().to_numpy()
+        if not valides.any():
+            return
+        # Les valeurs manquantes ne peuvent pas établir de record
+        cadre = pd.DataFrame({
+            record: np.nan_to_num(np.asarray(valeurs[col], dtype=np.float64), nan=-np.inf)
+            for record, col in COLONNES_RECORDS.items()
+        })[valides]
+        meilleures = cadre.groupby(sports[valides].to_numpy(), sort=False).idxmax()
+        duree = valeurs['duree_min']
+        for sport, positions in meilleures.to_dict('index').items():
+            for record, i in positions.items():
+                valeur = cadre.at[i, record]
+                if np.isfinite(valeur):
+                    self._proposer(sport, record, valeur, seances[i], pd.Timestamp(dates[i]), duree[i])
+
+    def ajouter(self, sport, seance, date, valeurs):
+        """
+        Met à jour les records avec une séance en O(1).
+        Renvoie les records battus : liste de (record, ancienne valeur, nouvelle valeur).
+        """
+        if sport is None:
+            return []
+        battus = []
+        for record, col in COLONNES_RECORDS.items():
+            valeur = float(valeurs[col])
+            if np.isnan(valeur):
+                continue
+            ancien = self._proposer(sport, record, valeur, seance, pd.Timestamp(date), valeurs['duree_min'])
+            # Le premier record d'un sport n'est pas signalé comme battu
+            if ancien:
+                battus.append((record, ancien['valeur'], valeur))
+        return battus
+
+    def records(self):
+        """Records par sport, au format de obtenir_records_personnels (avec la séance de chaque record)"""
+        resultat = {}
+        for sport, records in self.par_sport.items():
+            resultat[sport] = {record: records[record]['valeur'] if record in records else np.nan
+                               for record in COLONNES_RECORDS}
+            distance = records.get('distance_max')
+            # Vitesse de la séance la plus longue en distance
+            if distance is not None and distance['valeur'] > 0 and distance['duree'] > 0:
+                resultat[sport]['meilleur_pace'] = distance['valeur'] / distance['duree'] * 60
+            else:
+                resultat[sport]['meilleur_pace'] = 0
+            resultat[sport]['seances'] = {
+                record: {'seance': detail['seance'], 'date': detail['date']} for record, detail in records.items()
+            }
+        return resultat
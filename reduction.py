@@ -0,0 +1,68 @@
+"""
+Réduction des séries temporelles avant affichage.
+
+Au-delà de quelques milliers de points, un graphique SVG fige le navigateur.
+Les séries longues sont réduites par l'algorithme LTTB (Largest Triangle
+Three Buckets), qui garde la forme visuelle de la courbe (pics et creux
+compris) avec un nombre fixe de points, puis tracées en WebGL
+(``Scattergl``). Une plage de dates plus courte redonne la pleine résolution.
+"""
+import numpy as np
+import plotly.graph_objects as go
+
+# Nombre de points par courbe au-delà duquel la série est réduite
+POINTS_MAX_GRAPHIQUE = 2_000
+# Nombre de points au-delà duquel le tracé passe en WebGL
+SEUIL_WEBGL = 1_000
+
+
+def lttb(x, y, n_points):
+    """
+    Indices des points retenus par LTTB (premier et dernier points toujours gardés).
+    x, y : tableaux numériques de même longueur (x croissant, sans NaN).
+    """
+    n = len(x)
+    if n_points >= n or n_points < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # n_points - 2 seaux entre le premier et le dernier point
+    bornes = np.linspace(1, n - 1, n_points - 1).astype(np.int64)
+    tailles = np.diff(bornes)
+    # Moyenne de chaque seau, en une passe ; le "seau suivant" du dernier est le dernier point
+    moy_x = np.append(np.add.reduceat(x[1:n - 1], bornes[:-1] - 1) / tailles, x[-1])
+    moy_y = np.append(np.add.reduceat(y[1:n - 1], bornes[:-1] - 1) / tailles, y[-1])
+
+    indices = np.empty(n_points, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    precedent = 0
+    for i in range(n_points - 2):
+        debut, fin = bornes[i], bornes[i + 1]
+        xa, ya = x[precedent], y[precedent]
+        # Double de l'aire du triangle (point retenu, candidat, moyenne du seau suivant)
+        aires = np.abs((xa - moy_x[i + 1]) * (y[debut:fin] - ya) - (xa - x[debut:fin]) * (moy_y[i + 1] - ya))
+        precedent = debut + int(np.argmax(aires))
+        indices[i + 1] = precedent
+    return indices
+
+
+def reduire_serie(dates, valeurs, points_max=POINTS_MAX_GRAPHIQUE):
+    """
+    Dates et valeurs à afficher (Series pandas triées par date) : la série entière
+    si elle est assez courte, sinon sa réduction LTTB. Les valeurs manquantes sont ignorées.
+    """
+    if len(dates) <= points_max:
+        return dates, valeurs
+    definies = valeurs.notna().to_numpy() & dates.notna().to_numpy()
+    dates, valeurs = dates[definies], valeurs[definies]
+    x = dates.to_numpy(dtype='datetime64[ns]').astype(np.int64)
+    indices = lttb(x, valeurs.to_numpy(dtype=np.float64), points_max)
+    return dates.iloc[indices], valeurs.iloc[indices]
+
+
+def trace_serie(dates, valeurs, points_max=POINTS_MAX_GRAPHIQUE, **options):
+    """Courbe Plotly d'une série, réduite et tracée en WebGL si elle est longue"""
+    dates, valeurs = reduire_serie(dates, valeurs, points_max)
+    classe = go.Scattergl if len(dates) > SEUIL_WEBGL else go.Scatter
+    return classe(x=dates, y=valeurs, **options)
@@ -0,0 +1,242 @@
+"""
+Stockage persistant des performances sur disque.
+
+Les performances sont conservées sous forme colonnaire dans un instantané
+``performances.npz`` (un tableau NumPy par colonne, les textes étant codés
+par catégories) complété par un journal d'ajouts ``journal.jsonl``.
+Chaque nouvelle séance est écrite immédiatement dans le journal ; le journal
+est replié dans l'instantané au chargement dès qu'il devient trop long.
+
+Plusieurs sessions peuvent partager le même dossier. Réécrire l'instantané
+ne retire du journal que les lignes déjà présentes dans les données de la
+session qui écrit ; les séances journalisées entre-temps par une autre
+session sont gardées.
+"""
+import json
+import os
+import threading
+import uuid
+
+import numpy as np
+import pandas as pd
+
+COLONNES = [
+    'date', 'sport', 'type_entrainement', 'duree_min', 'distance_km',
+    'calories', 'frequence_cardiaque_moy', 'frequence_cardiaque_max',
+    'vitesse_moy', 'elevation_m', 'notes'
+]
+COLONNES_NUMERIQUES = [
+    'duree_min', 'distance_km', 'calories', 'frequence_cardiaque_moy',
+    'frequence_cardiaque_max', 'vitesse_moy', 'elevation_m'
+]
+COLONNES_TEXTE = ['sport', 'type_entrainement', 'notes']
+COLONNES_CATEGORIELLES = ['sport', 'type_entrainement']
+# Colonnes calculées (persistées avec l'instantané, jamais importées)
+COLONNES_DERIVEES = ['trimp']
+
+# Schéma canonique appliqué une seule fois à l'ingestion
+SCHEMA = {
+    'date': 'datetime64[s]',
+    'sport': 'category',
+    'type_entrainement': 'category',
+    **{col: 'float32' for col in COLONNES_NUMERIQUES},
+    'notes': 'object'
+}
+
+# Nombre de lignes du journal au-delà duquel il est replié dans l'instantané
+SEUIL_COMPACTAGE = 500
+
+DOSSIER_DONNEES = os.environ.get(
+    'SPORTS_PERF_DATA',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'donnees')
+)
+
+
+# Identifiant de séance non attribué (lignes écrites avant les identifiants)
+IDENTIFIANT_ABSENT = np.uint64(0)
+
+# Un verrou par dossier : les sessions d'un serveur Streamlit sont des fils d'un même processus
+_VERROUS = {}
+_VERROU_VERROUS = threading.Lock()
+
+
+def _verrou(dossier):
+    with _VERROU_VERROUS:
+        return _VERROUS.setdefault(os.path.abspath(dossier), threading.RLock())
+
+
+def nouveaux_identifiants(n):
+    """
+    n identifiants de séance aléatoires sur 64 bits : uniques sans coordination
+    entre sessions, ils suivent la séance dans l'instantané et le journal.
+    """
+    return np.random.default_rng().integers(1, 2 ** 64, n, dtype=np.uint64)
+
+
+def appliquer_schema(df):
+    """Convertit un DataFrame de performances vers le schéma canonique"""
+    donnees = {}
+    if 'date' in df:
+        donnees['date'] = pd.to_datetime(df['date'], errors='coerce').astype(SCHEMA['date'])
+    else:
+        donnees['date'] = pd.Series(pd.NaT, index=df.index, dtype=SCHEMA['date'])
+    for col in COLONNES_CATEGORIELLES:
+        valeurs = df[col] if col in df else pd.Series(np.nan, index=df.index)
+        if not isinstance(valeurs.dtype, pd.CategoricalDtype):
+            valeurs = valeurs.astype(object).where(valeurs.isna(), valeurs.astype(str))
+        donnees[col] = valeurs.astype('category')
+    for col in COLONNES_NUMERIQUES:
+        valeurs = df[col] if col in df else pd.Series(np.nan, index=df.index)
+        donnees[col] = pd.to_numeric(valeurs, errors='coerce').astype(np.float32)
+    notes = df['notes'] if 'notes' in df else pd.Series('', index=df.index)
+    donnees['notes'] = notes.fillna('').astype(str).astype(object)
+    return pd.DataFrame(donnees, columns=COLONNES)
+
+
+def _vers_colonnes(df):
+    """Convertit un DataFrame de performances en tableaux NumPy colonnaires"""
+    colonnes = {}
+    # Dates à la seconde, comme en mémoire (SCHEMA) : l'heure des séances importées survit au rechargement
+    dates = (pd.to_datetime(df['date'], errors='coerce', format='ISO8601') if 'date' in df
+             else pd.Series(pd.NaT, index=df.index))
+    colonnes['date'] = dates.to_numpy(dtype='datetime64[ns]').astype(SCHEMA['date'])
+    for col in COLONNES_NUMERIQUES:
+        valeurs = df[col] if col in df else pd.Series(np.nan, index=df.index)
+        colonnes[col] = pd.to_numeric(valeurs, errors='coerce').to_numpy(dtype=np.float32)
+    for col in COLONNES_TEXTE:
+        valeurs = df[col] if col in df else pd.Series(np.nan, index=df.index)
+        if col not in COLONNES_CATEGORIELLES:
+            valeurs = valeurs.fillna('').astype(str)
+        # Les valeurs manquantes reçoivent le code -1
+        codes, categories = pd.factorize(valeurs)
+        colonnes[f'{col}__categories'] = np.asarray(categories, dtype=str)
+        colonnes[f'{col}__codes'] = codes.astype(np.int32)
+    if 'trimp' in df:
+        colonnes['trimp'] = pd.to_numeric(df['trimp'], errors='coerce').to_numpy(dtype=np.float32)
+        # Profil (FC repos, FC max, sexe) ayant servi au calcul du TRIMP
+        profil = df.attrs.get('profil_trimp')
+        if profil is not None:
+            colonnes['trimp__profil'] = np.asarray([str(valeur) for valeur in profil])
+    if 'cle' in df:
+        # Clés de l'index des doublons (0 : non calculée)
+        colonnes['cle'] = df['cle'].to_numpy(dtype=np.uint64)
+    if 'ident' in df:
+        colonnes['ident'] = df['ident'].to_numpy(dtype=np.uint64)
+    return colonnes
+
+
+def _vers_dataframe(colonnes):
+    """Reconstruit le DataFrame de performances à partir des tableaux colonnaires"""
+    donnees = {'date': colonnes['date'].astype(SCHEMA['date'])}
+    for col in COLONNES_CATEGORIELLES:
+        donnees[col] = pd.Categorical.from_codes(
+            colonnes[f'{col}__codes'], categories=colonnes[f'{col}__categories'].astype(object)
+        )
+    for col in COLONNES_NUMERIQUES:
+        donnees[col] = colonnes[col].astype(np.float32, copy=False)
+    donnees['notes'] = colonnes['notes__categories'].astype(object)[colonnes['notes__codes']]
+    df = pd.DataFrame(donnees, columns=COLONNES)
+    if 'trimp' in colonnes:
+        df['trimp'] = colonnes['trimp']
+        if 'trimp__profil' in colonnes:
+            fc_repos, fc_max, sexe = colonnes['trimp__profil'].tolist()
+            df.attrs['profil_trimp'] = (float(fc_repos), float(fc_max), sexe)
+    if 'cle' in colonnes:
+        df['cle'] = colonnes['cle']
+    if 'ident' in colonnes:
+        df['ident'] = colonnes['ident']
+    return df
+
+
+class StockagePerformances:
+    """Instantané colonnaire + journal d'ajouts pour l'historique des performances"""
+
+    def __init__(self, dossier=DOSSIER_DONNEES):
+        self.dossier = dossier
+        os.makedirs(dossier, exist_ok=True)
+        self.chemin_instantane = os.path.join(dossier, 'performances.npz')
+        self.chemin_journal = os.path.join(dossier, 'journal.jsonl')
+        self._verrou = _verrou(dossier)
+        # Lignes du journal présentes dans les données de cette session (lues ou écrites par elle)
+        self._lignes_connues = set()
+
+    def _lire_instantane(self):
+        if not os.path.exists(self.chemin_instantane):
+            return pd.DataFrame(columns=COLONNES)
+        with np.load(self.chemin_instantane, allow_pickle=False) as archive:
+            return _vers_dataframe({nom: archive[nom] for nom in archive.files})
+
+    def _lire_journal(self):
+        """Lignes brutes du journal"""
+        if not os.path.exists(self.chemin_journal):
+            return []
+        with open(self.chemin_journal, encoding='utf-8') as f:
+            return [ligne.rstrip('\n') for ligne in f if ligne.strip()]
+
+    def charger(self):
+        """Charge l'historique complet (instantané + journal)"""
+        with self._verrou:
+            df = self._lire_instantane()
+            lignes = self._lire_journal()
+            self._lignes_connues = set(lignes)
+            if not lignes:
+                return df
+
+            journal = [json.loads(ligne) for ligne in lignes]
+            df_journal = _vers_dataframe(_vers_colonnes(pd.DataFrame(journal)))
+            if 'cle' in df:
+                df_journal['cle'] = np.zeros(len(df_journal), dtype=np.uint64)
+            # Identifiants lus ligne à ligne : une colonne avec valeurs manquantes passerait en flottants
+            df_journal['ident'] = np.array([ligne.get('ident', 0) for ligne in journal], dtype=np.uint64)
+            if 'ident' not in df and not df.empty:
+                df['ident'] = np.zeros(len(df), dtype=np.uint64)
+            attrs = df.attrs
+            df = pd.concat([df, df_journal], ignore_index=True) if not df.empty else df_journal
+            # Les séances du journal n'ont ni TRIMP ni clé de doublon : elles seront calculées au chargement
+            df.attrs = attrs
+            if len(lignes) >= SEUIL_COMPACTAGE:
+                self.sauvegarder(df)
+            return df
+
+    def ajouter(self, perf):
+        """Écrit une nouvelle performance directement dans le journal"""
+        ligne = dict(perf)
+        if 'ident' in ligne:
+            ligne['ident'] = int(ligne['ident'])
+        ligne['date'] = pd.Timestamp(ligne['date']).strftime('%Y-%m-%dT%H:%M:%S')
+        # Identifiant unique : deux séances identiques restent deux lignes distinctes du journal
+        ligne['id_journal'] = uuid.uuid4().hex
+        texte = json.dumps(ligne, ensure_ascii=False)
+        with self._verrou:
+            with open(self.chemin_journal, 'a', encoding='utf-8') as f:
+                f.write(texte + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self._lignes_connues.add(texte)
+
+    def sauvegarder(self, df, cles=None, identifiants=None):
+        """
+        Réécrit l'instantané complet (avec les clés de doublons et les identifiants
+        de séance si fournis) et retire
+        du journal les lignes repliées ; celles écrites par d'autres sessions y restent.
+        """
+        if cles is not None:
+            df = df.assign(cle=cles)
+        if identifiants is not None:
+            df = df.assign(ident=identifiants)
+        with self._verrou:
+            chemin_tmp = self.chemin_instantane + '.tmp'
+            with open(chemin_tmp, 'wb') as f:
+                np.savez(f, **_vers_colonnes(df))
+            os.replace(chemin_tmp, self.chemin_instantane)
+            restantes = [ligne for ligne in self._lire_journal() if ligne not in self._lignes_connues]
+            self._lignes_connues = set()
+            if restantes:
+                chemin_tmp = self.chemin_journal + '.tmp'
+                with open(chemin_tmp, 'w', encoding='utf-8') as f:
+                    f.write('\n'.join(restantes) + '\n')
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(chemin_tmp, self.chemin_journal)
+            elif os.path.exists(self.chemin_journal):
+                os.remove(self.chemin_journal)
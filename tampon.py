@@ -0,0 +1,367 @@
+"""
+Tampon d'ajout amorti pour les performances.
+
+Les colonnes sont conservées dans des tableaux NumPy préalloués dont la
+capacité double lorsqu'ils sont pleins : un ajout coûte O(1) amorti au lieu
+de reconstruire tout le DataFrame avec ``pd.concat``. Le DataFrame exposé à
+l'interface n'est reconstruit qu'à la demande, puis réutilisé tant qu'aucune
+nouvelle ligne n'a été ajoutée.
+
+Les tableaux suivent le schéma canonique de ``stockage.SCHEMA`` : les sports
+et types d'entraînement sont gardés sous forme de codes de catégories.
+Chaque ajout met aussi à jour les agrégats incrémentaux (``agregats.py``).
+
+La colonne dérivée ``trimp`` est calculée à l'ajout avec le profil courant ;
+elle n'est recalculée pour tout l'historique que si le profil change. Le
+modèle de Banister (CTL/ATL/TSB) suit la charge quotidienne qui en découle.
+
+Les lignes sont gardées triées par date (séances sans date en dernier) : un
+ajout dans l'ordre chronologique ne coûte rien, un ajout antidaté marque le
+tampon comme à retrier lors de la prochaine consolidation. Les filtres de
+période se font alors par recherche dichotomique et renvoient des tranches.
+
+Un index des clés naturelles (``doublons.py``) permet d'écarter les séances
+déjà connues lors d'un import.
+
+Chaque modification incrémente ``version`` : les analyses mises en cache
+(``cache.py``) sont indexées par ce numéro et invalidées automatiquement.
+"""
+import numpy as np
+import pandas as pd
+
+from agregats import AgregatsPerformances
+from cache import TAILLE_MAX_FIGURES, CacheAnalyses
+from charge import ModeleBanister, calculer_trimp_lot
+from doublons import CLE_ABSENTE, IndexDoublons, calculer_cles
+from records import IndexRecords
+from stockage import (
+    COLONNES, COLONNES_CATEGORIELLES, COLONNES_DERIVEES, COLONNES_NUMERIQUES, IDENTIFIANT_ABSENT, SCHEMA,
+    appliquer_schema, nouveaux_identifiants
+)
+
+CAPACITE_INITIALE = 1024
+FIN_DATES = np.iinfo(np.int64).max
+
+
+def _convertir_date(valeur):
+    try:
+        return np.datetime64(pd.Timestamp(valeur), 's')
+    except (TypeError, ValueError):
+        return np.datetime64('NaT')
+
+
+def _cle_tri(dates):
+    """Clé de tri des dates : les NaT sont placés après toutes les dates"""
+    cle = dates.view(np.int64)
+    return np.where(np.isnat(dates), FIN_DATES, cle)
+
+
+def _convertir_nombre(valeur):
+    try:
+        return float(valeur)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class TamponPerformances:
+    """Stockage colonnaire en mémoire avec croissance géométrique"""
+
+    def __init__(self, df=None, profil_trimp=None, version=0):
+        self.taille = 0
+        self._vue = None
+        # Version de départ : un tampon qui en remplace un autre poursuit sa numérotation
+        self.version = version
+        self.cache = CacheAnalyses()
+        self.figures = CacheAnalyses(TAILLE_MAX_FIGURES)
+        self.trie = True
+        self.profil_trimp = profil_trimp
+        self.agregats = AgregatsPerformances()
+        self.banister = ModeleBanister()
+        self.records = IndexRecords()
+        self.doublons = IndexDoublons()
+        self.prochaine_seance = 0
+        # Nombre de séances reçues sans identifiant (données d'avant les identifiants)
+        self.identifiants_generes = 0
+        self._reinitialiser_categories()
+        self._allouer(CAPACITE_INITIALE)
+        if df is not None and not df.empty:
+            self.ajouter_lot(df)
+
+    def __len__(self):
+        return self.taille
+
+    def _reinitialiser_categories(self):
+        self.categories = {col: [] for col in COLONNES_CATEGORIELLES}
+        self._index_categories = {col: {} for col in COLONNES_CATEGORIELLES}
+
+    def _allouer(self, capacite):
+        self.capacite = capacite
+        self.colonnes = {'date': np.empty(capacite, dtype=SCHEMA['date'])}
+        for col in COLONNES_CATEGORIELLES:
+            self.colonnes[col] = np.empty(capacite, dtype=np.int32)
+        for col in COLONNES_NUMERIQUES:
+            self.colonnes[col] = np.empty(capacite, dtype=SCHEMA[col])
+        self.colonnes['notes'] = np.empty(capacite, dtype=object)
+        self.colonnes['trimp'] = np.empty(capacite, dtype=np.float32)
+        # Identifiant stable de la séance (ordre d'ajout), conservé lors des tris
+        self.colonnes['seance'] = np.empty(capacite, dtype=np.int64)
+        # Hachage de la clé naturelle (détection des doublons)
+        self.colonnes['cle'] = np.empty(capacite, dtype=np.uint64)
+        # Identifiant persistant et unique de la séance (rattachement des flux)
+        self.colonnes['ident'] = np.empty(capacite, dtype=np.uint64)
+
+    def _reserver(self, n_nouveaux):
+        """Agrandit les tableaux (capacité doublée) si nécessaire"""
+        besoin = self.taille + n_nouveaux
+        if besoin <= self.capacite:
+            return
+        capacite = self.capacite
+        while capacite < besoin:
+            capacite *= 2
+        anciennes = self.colonnes
+        self._allouer(capacite)
+        for col, tableau in anciennes.items():
+            self.colonnes[col][:self.taille] = tableau[:self.taille]
+
+    def _modifier(self):
+        """Invalide la vue consolidée et passe à une nouvelle version des données"""
+        self._vue = None
+        self.version += 1
+
+    def _verifier_ordre(self, debut, fin):
+        """Marque le tampon à retrier si les lignes [debut, fin) cassent l'ordre des dates"""
+        if not self.trie:
+            return
+        cle = _cle_tri(self.colonnes['date'][max(debut - 1, 0):fin])
+        if np.any(cle[1:] < cle[:-1]):
+            self.trie = False
+
+    def _trier(self):
+        """Trie toutes les colonnes par date (tri stable, dans de nouveaux tableaux)"""
+        ordre = np.argsort(_cle_tri(self.colonnes['date'][:self.taille]), kind='stable')
+        anciennes = self.colonnes
+        self._allouer(self.capacite)
+        for col, tableau in anciennes.items():
+            self.colonnes[col][:self.taille] = tableau[:self.taille][ordre]
+        self.trie = True
+
+    def _calculer_trimp(self, debut, fin):
+        """Calcule le TRIMP des lignes [debut, fin) avec le profil courant"""
+        if self.profil_trimp is None:
+            self.colonnes['trimp'][debut:fin] = np.nan
+            return
+        fc_repos, fc_max, sexe = self.profil_trimp
+        self.colonnes['trimp'][debut:fin] = calculer_trimp_lot(
+            self.colonnes['duree_min'][debut:fin], self.colonnes['frequence_cardiaque_moy'][debut:fin],
+            fc_repos, fc_max, sexe
+        )
+
+    def definir_profil_trimp(self, profil_trimp):
+        """Change le profil du TRIMP ; recalcule l'historique seulement s'il diffère"""
+        if profil_trimp == self.profil_trimp:
+            return
+        self.profil_trimp = profil_trimp
+        self._calculer_trimp(0, self.taille)
+        self._modifier()
+        self.banister.reconstruire(self.colonnes['date'][:self.taille], self.colonnes['trimp'][:self.taille])
+
+    def _code(self, col, valeur):
+        """Code de catégorie d'une valeur (créé au besoin), -1 si manquante"""
+        if valeur is None or (isinstance(valeur, float) and np.isnan(valeur)):
+            return -1
+        valeur = str(valeur)
+        index = self._index_categories[col]
+        code = index.get(valeur)
+        if code is None:
+            code = index[valeur] = len(self.categories[col])
+            self.categories[col].append(valeur)
+        return code
+
+    def _calculer_cles(self, lignes):
+        """Hachage de la clé naturelle des lignes données (tranche ou indices)"""
+        colonnes = {col: self.colonnes[col][lignes] for col in ('date', 'duree_min', 'distance_km', 'frequence_cardiaque_moy')}
+        colonnes['sport'] = pd.Categorical.from_codes(self.colonnes['sport'][lignes], categories=self.categories['sport'])
+        return calculer_cles(colonnes)
+
+    def filtrer_doublons(self, df):
+        """
+        Retire d'un lot (au schéma canonique) les séances déjà présentes ou répétées dans le lot.
+        Renvoie (lot filtré, nombre de doublons retirés).
+        """
+        cles = calculer_cles(df)
+        nouvelles = self.doublons.nouvelles(cles)
+        n_doublons = int(len(df) - nouvelles.sum())
+        return (df[nouvelles] if n_doublons else df), n_doublons
+
+    def cles_doublons(self):
+        """Clés de doublons alignées sur les lignes de vue() (pour la persistance)"""
+        self.vue()
+        return self.colonnes['cle'][:self.taille]
+
+    def identifiants(self):
+        """Identifiants de séance alignés sur les lignes de vue()"""
+        self.vue()
+        return self.colonnes['ident'][:self.taille]
+
+    def _identifier(self, debut, fin, identifiants=None):
+        """Identifiants des lignes [debut, fin) : ceux fournis, sinon de nouveaux"""
+        if identifiants is None:
+            identifiants = np.full(fin - debut, IDENTIFIANT_ABSENT, dtype=np.uint64)
+        self.colonnes['ident'][debut:fin] = identifiants
+        manquants = debut + np.flatnonzero(identifiants == IDENTIFIANT_ABSENT)
+        if len(manquants):
+            self.colonnes['ident'][manquants] = nouveaux_identifiants(len(manquants))
+            self.identifiants_generes += len(manquants)
+
+    def _numeroter(self, debut, fin):
+        """Attribue les identifiants de séance des lignes [debut, fin)"""
+        n = fin - debut
+        self.colonnes['seance'][debut:fin] = np.arange(self.prochaine_seance, self.prochaine_seance + n)
+        self.prochaine_seance += n
+
+    def ajouter(self, perf):
+        """
+        Ajoute une performance (dict) en convertissant ses types une seule fois.
+        Renvoie les records personnels battus par cette séance.
+        """
+        self._reserver(1)
+        i = self.taille
+        self.colonnes['date'][i] = _convertir_date(perf.get('date'))
+        for col in COLONNES_CATEGORIELLES:
+            self.colonnes[col][i] = self._code(col, perf.get(col))
+        for col in COLONNES_NUMERIQUES:
+            self.colonnes[col][i] = _convertir_nombre(perf.get(col))
+        notes = perf.get('notes')
+        self.colonnes['notes'][i] = '' if notes is None else str(notes)
+        self._calculer_trimp(i, i + 1)
+        self._numeroter(i, i + 1)
+        self._identifier(i, i + 1, np.array([perf.get('ident', IDENTIFIANT_ABSENT)], dtype=np.uint64))
+        self.colonnes['cle'][i] = self._calculer_cles(slice(i, i + 1))[0]
+        self.doublons.ajouter(self.colonnes['cle'][i:i + 1])
+        self.taille += 1
+        self._modifier()
+        self._verifier_ordre(i, i + 1)
+
+        code_sport = self.colonnes['sport'][i]
+        sport = self.categories['sport'][code_sport] if code_sport >= 0 else None
+        valeurs = {col: self.colonnes[col][i] for col in COLONNES_NUMERIQUES}
+        self.agregats.ajouter(self.colonnes['date'][i], sport, valeurs)
+        self.banister.ajouter(self.colonnes['date'][i], self.colonnes['trimp'][i])
+        return self.records.ajouter(sport, self.colonnes['seance'][i], self.colonnes['date'][i], valeurs)
+
+    def ajouter_lot(self, df):
+        """Ajoute un DataFrame complet, converti colonne par colonne"""
+        n = len(df)
+        if n == 0:
+            return
+        trimp = df['trimp'].to_numpy(dtype=np.float32) if 'trimp' in df else None
+        trimp_valide = trimp is not None and df.attrs.get('profil_trimp') == self.profil_trimp
+        cles = df['cle'].to_numpy(dtype=np.uint64) if 'cle' in df else None
+        identifiants = df['ident'].to_numpy(dtype=np.uint64) if 'ident' in df else None
+        df = appliquer_schema(df)
+        self._reserver(n)
+        debut, fin = self.taille, self.taille + n
+        self.colonnes['date'][debut:fin] = df['date'].to_numpy()
+        for col in COLONNES_CATEGORIELLES:
+            valeurs = df[col].array
+            correspondance = np.array(
+                [self._code(col, categorie) for categorie in valeurs.categories] + [-1],
+                dtype=np.int32
+            )
+            # Le code -1 (valeur manquante) pointe sur le dernier élément
+            self.colonnes[col][debut:fin] = correspondance[valeurs.codes]
+        for col in COLONNES_NUMERIQUES:
+            self.colonnes[col][debut:fin] = df[col].to_numpy()
+        self.colonnes['notes'][debut:fin] = df['notes'].to_numpy()
+        if trimp_valide:
+            # TRIMP persisté avec le même profil : seules les lignes sans valeur sont calculées
+            self.colonnes['trimp'][debut:fin] = trimp
+            manquants = debut + np.flatnonzero(np.isnan(trimp))
+            if len(manquants) and self.profil_trimp is not None:
+                self.colonnes['trimp'][manquants] = calculer_trimp_lot(
+                    self.colonnes['duree_min'][manquants], self.colonnes['frequence_cardiaque_moy'][manquants],
+                    *self.profil_trimp
+                )
+        else:
+            self._calculer_trimp(debut, fin)
+        self._numeroter(debut, fin)
+        self._identifier(debut, fin, identifiants)
+        if cles is not None:
+            # Clés persistées : seules les lignes du journal (sans clé) sont hachées
+            self.colonnes['cle'][debut:fin] = cles
+            manquantes = debut + np.flatnonzero(cles == CLE_ABSENTE)
+            if len(manquantes):
+                self.colonnes['cle'][manquantes] = self._calculer_cles(manquantes)
+        else:
+            self.colonnes['cle'][debut:fin] = self._calculer_cles(slice(debut, fin))
+        self.doublons.ajouter(self.colonnes['cle'][debut:fin])
+        self.taille = fin
+        self._modifier()
+        self._verifier_ordre(debut, fin)
+
+        sports = df['sport'].to_numpy(dtype=object)
+        valeurs = {col: self.colonnes[col][debut:fin] for col in COLONNES_NUMERIQUES}
+        self.agregats.ajouter_lot(self.colonnes['date'][debut:fin], sports, valeurs)
+        self.banister.ajouter_lot(self.colonnes['date'][debut:fin], self.colonnes['trimp'][debut:fin])
+        self.records.ajouter_lot(sports, self.colonnes['seance'][debut:fin], self.colonnes['date'][debut:fin], valeurs)
+
+    def remplacer(self, df):
+        """Remplace tout le contenu du tampon"""
+        self.taille = 0
+        self.trie = True
+        self.prochaine_seance = 0
+        self._reinitialiser_categories()
+        self._allouer(CAPACITE_INITIALE)
+        self._modifier()
+        self.agregats.reinitialiser()
+        self.banister.reinitialiser()
+        self.records.reinitialiser()
+        self.doublons.reinitialiser()
+        self.ajouter_lot(df)
+
+    def vue(self):
+        """DataFrame des performances trié par date, consolidé seulement après un ajout"""
+        if self._vue is None:
+            if not self.trie:
+                self._trier()
+            donnees = {}
+            for col in COLONNES + COLONNES_DERIVEES:
+                tableau = self.colonnes[col][:self.taille]
+                if col in COLONNES_CATEGORIELLES:
+                    donnees[col] = pd.Categorical.from_codes(tableau, categories=self.categories[col])
+                else:
+                    donnees[col] = pd.Series(tableau, dtype=tableau.dtype, copy=False)
+            self._vue = pd.DataFrame(donnees, columns=COLONNES + COLONNES_DERIVEES, copy=False)
+            self._vue.attrs['profil_trimp'] = self.profil_trimp
+        return self._vue
+
+    def _n_dates(self):
+        """Nombre de lignes ayant une date (les NaT sont en fin de tampon)"""
+        return int(np.searchsorted(self.colonnes['date'][:self.taille], np.datetime64('NaT'), side='left'))
+
+    def bornes_dates(self):
+        """Première et dernière date de l'historique (None si vide)"""
+        self.vue()
+        n = self._n_dates()
+        if n == 0:
+            return None, None
+        dates = self.colonnes['date']
+        return pd.Timestamp(dates[0]), pd.Timestamp(dates[n - 1])
+
+    def plage(self, debut=None, fin=None):
+        """
+        Séances de debut au jour de fin inclus (fin couvre toute sa journée, comme
+        dans les agrégats), obtenues par recherche dichotomique :
+        O(log N) et une tranche du DataFrame trié plutôt qu'une copie filtrée.
+        """
+        df = self.vue()
+        if debut is None and fin is None:
+            return df
+        dates = self.colonnes['date'][:self._n_dates()]
+        i = 0 if debut is None else int(np.searchsorted(dates, np.datetime64(pd.Timestamp(debut), 's'), side='left'))
+        if fin is None:
+            j = len(dates)
+        else:
+            lendemain = pd.Timestamp(fin).normalize() + pd.Timedelta(days=1)
+            j = int(np.searchsorted(dates, np.datetime64(lendemain, 's'), side='left'))
+        return df.iloc[i:max(i, j)]
@@ -0,0 +1,241 @@
+"""
+Import de traces GPS (GPX, TCX).
+
+Le XML est lu de façon incrémentale, par blocs, avec un ``XMLParser`` dont la
+cible ne garde que les champs utiles de chaque point : aucun arbre n'est
+construit (ni complet, ni partiel comme avec ``iterparse``), la mémoire ne
+contient que les listes de valeurs. Les mesures de la séance (distance,
+dénivelé positif, temps en mouvement, vitesse, fréquence cardiaque) sont
+ensuite calculées sur les tableaux de points en une seule passe NumPy
+vectorisée.
+"""
+import os
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pandas as pd
+
+from importation import importer_fichiers
+
+RAYON_TERRE_M = 6_371_008.8
+
+# En dessous de cette vitesse entre deux points, on considère l'athlète à l'arrêt
+VITESSE_MIN_MOUVEMENT = 0.5   # m/s
+# Au-delà de cet écart entre deux points, l'intervalle est une pause (perte de signal, arrêt)
+ECART_MAX_S = 30
+# Fenêtre de lissage de l'altitude avant le calcul du dénivelé (bruit GPS/baromètre)
+FENETRE_ALTITUDE = 5
+
+TAILLE_BLOC = 1 << 20
+
+CHAMPS_POINTS = ('lat', 'lon', 'altitude', 'temps', 'fc')
+# Balise d'un point -> indice du champ dans CHAMPS_POINTS
+CHAMPS_POINT = {
+    'LatitudeDegrees': 0, 'LongitudeDegrees': 1,
+    'ele': 2, 'AltitudeMeters': 2,
+    'time': 3, 'Time': 3,
+    'hr': 4, 'Value': 4,
+}
+BALISES_POINT = ('trkpt', 'Trackpoint')
+# Balises lues hors des points : type d'activité (GPX) et calories des tours (TCX)
+CHAMPS_ACTIVITE = {'type': 'type', 'Calories': 'calories'}
+
+# Mot-clé du type d'activité -> sport de l'application
+SPORTS_TRACE = [
+    ('run', 'Course à pied'), ('course', 'Course à pied'),
+    ('bik', 'Cyclisme'), ('cycl', 'Cyclisme'), ('ride', 'Cyclisme'), ('velo', 'Cyclisme'),
+    ('swim', 'Natation'), ('natation', 'Natation'),
+    ('hik', 'Randonnée'), ('rando', 'Randonnée'),
+    ('walk', 'Marche'), ('marche', 'Marche'),
+]
+
+
+def _nom_local(balise):
+    return balise[balise.rfind('}') + 1:]
+
+
+class _LecteurTrace:
+    """Cible du parseur XML : accumule les champs des points au fil de la lecture"""
+
+    def __init__(self):
+        self.lignes = []
+        self.type_activite = None
+        self.calories = None
+        self._noms = {}
+        self._dans_point = False
+        self._point = []
+        self._champ = None
+        self._texte = []
+
+    def _nom(self, balise):
+        nom = self._noms.get(balise)
+        if nom is None:
+            nom = self._noms[balise] = _nom_local(balise)
+        return nom
+
+    def start(self, balise, attributs):
+        nom = self._noms.get(balise) or self._nom(balise)
+        if self._dans_point:
+            self._champ = CHAMPS_POINT.get(nom)
+            self._texte = []
+        elif nom in BALISES_POINT:
+            self._dans_point = True
+            self._point = [attributs.get('lat', 'nan'), attributs.get('lon', 'nan'), 'nan', 'nan', 'nan']
+        elif nom == 'Activity':
+            self.type_activite = attributs.get('Sport', self.type_activite)
+        else:
+            self._champ = CHAMPS_ACTIVITE.get(nom)
+            self._texte = []
+
+    def data(self, texte):
+        if self._champ is not None:
+            self._texte.append(texte)
+
+    def end(self, balise):
+        champ = self._champ
+        if champ is None:
+            if self._dans_point and self._noms[balise] in BALISES_POINT:
+                self.lignes.append(self._point)
+                self._dans_point = False
+            return
+        self._champ = None
+        texte = ''.join(self._texte).strip()
+        if self._dans_point:
+            self._point[champ] = texte or 'nan'
+        elif champ == 'type':
+            self.type_activite = self.type_activite or texte
+        elif texte:
+            self.calories = (self.calories or 0) + float(texte)
+
+    def close(self):
+        return self
+
+    def points(self):
+        """Colonnes des points : {champ: liste de textes}"""
+        colonnes = zip(*self.lignes) if self.lignes else [[] for _ in CHAMPS_POINTS]
+        return dict(zip(CHAMPS_POINTS, colonnes))
+
+
+def _sport(type_activite):
+    type_activite = (type_activite or '').lower()
+    for mot, sport in SPORTS_TRACE:
+        if mot in type_activite:
+            return sport
+    return 'Autre'
+
+
+def lire_points(source):
+    """
+    Lit les points d'une trace GPX ou TCX (fichier binaire), bloc par bloc.
+    Renvoie (dict de listes lat/lon/altitude/temps/fc, type d'activité, calories).
+    """
+    lecteur = _LecteurTrace()
+    parseur = ET.XMLParser(target=lecteur)
+    while bloc := source.read(TAILLE_BLOC):
+        parseur.feed(bloc)
+    parseur.close()
+    return lecteur.points(), lecteur.type_activite, lecteur.calories
+
+
+def _en_nombres(valeurs):
+    """Conversion directe des textes en flottants ('nan' pour les valeurs absentes)"""
+    try:
+        return np.array(valeurs, dtype=np.float64)
+    except ValueError:
+        return pd.to_numeric(pd.Series(valeurs, dtype=object), errors='coerce').to_numpy(dtype=np.float64)
+
+
+def distances_haversine(lat, lon):
+    """Distances (m) entre points consécutifs, formule de haversine vectorisée"""
+    phi, lam = np.radians(lat), np.radians(lon)
+    dphi, dlam = np.diff(phi), np.diff(lam)
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi[:-1]) * np.cos(phi[1:]) * np.sin(dlam / 2) ** 2
+    return 2 * RAYON_TERRE_M * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def denivele_positif(altitude, fenetre=FENETRE_ALTITUDE):
+    """Dénivelé positif (m) après lissage de l'altitude par moyenne glissante"""
+    altitude = altitude[~np.isnan(altitude)]
+    if len(altitude) < 2:
+        return np.nan
+    if len(altitude) > fenetre:
+        noyau = np.ones(fenetre) / fenetre
+        altitude = np.convolve(altitude, noyau, mode='valid')
+    ecarts = np.diff(altitude)
+    return float(ecarts[ecarts > 0].sum())
+
+
+def analyser_trace(points):
+    """Mesures d'une séance à partir de ses points (tableaux NumPy, aucune boucle par point)"""
+    lat, lon = _en_nombres(points['lat']), _en_nombres(points['lon'])
+    positions = ~(np.isnan(lat) | np.isnan(lon))
+    lat, lon = lat[positions], lon[positions]
+    temps = pd.to_datetime(
+        pd.Series(points['temps'], dtype=object)[positions].replace('nan', None), utc=True, errors='coerce', format='ISO8601'
+    )
+    secondes = temps.to_numpy(dtype='datetime64[ns]').astype(np.int64) / 1e9
+    secondes[temps.isna().to_numpy()] = np.nan
+
+    distances = distances_haversine(lat, lon) if len(lat) > 1 else np.zeros(0)
+    ecarts = np.diff(secondes)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        vitesses = distances / ecarts
+    en_mouvement = (ecarts > 0) & (ecarts <= ECART_MAX_S) & (vitesses >= VITESSE_MIN_MOUVEMENT)
+    temps_mouvement = float(ecarts[en_mouvement].sum())
+    distance_mouvement = float(distances[en_mouvement].sum())
+
+    fc = _en_nombres(points['fc'])
+    fc = fc[~np.isnan(fc)]
+    debut = temps.min()
+    return {
+        'debut': debut,
+        'distance_m': float(distances.sum()),
+        'denivele_m': denivele_positif(_en_nombres(points['altitude'])[positions]),
+        'temps_mouvement_s': temps_mouvement,
+        'temps_total_s': float(np.nanmax(secondes) - np.nanmin(secondes)) if temps.notna().any() else np.nan,
+        'vitesse_ms': distance_mouvement / temps_mouvement if temps_mouvement > 0 else np.nan,
+        'fc_moy': float(fc.mean()) if len(fc) else np.nan,
+        'fc_max': float(fc.max()) if len(fc) else np.nan,
+    }
+
+
+def lire_trace(source, nom_fichier='', format_trace='GPX'):
+    """Performance (dict des colonnes de l'application) d'un fichier GPX ou TCX"""
+    points, type_activite, calories = lire_points(source)
+    if not points['lat']:
+        raise ValueError("Aucun point de trace trouvé")
+    mesures = analyser_trace(points)
+    temps_total = mesures['temps_total_s']
+    notes = f"Import {format_trace} : {nom_fichier}" if nom_fichier else f"Import {format_trace}"
+    if not np.isnan(temps_total):
+        notes += f" (temps total {temps_total / 60:.0f} min)"
+    debut = mesures['debut']
+    if pd.isna(debut):
+        # Sans date, la séance serait écartée silencieusement par le tampon
+        raise ValueError("Aucun horodatage <time> exploitable dans la trace")
+    return {
+        'date': debut.tz_convert(None),
+        'sport': _sport(type_activite),
+        'type_entrainement': None,
+        'duree_min': mesures['temps_mouvement_s'] / 60,
+        'distance_km': mesures['distance_m'] / 1000,
+        'calories': calories if calories is not None else np.nan,
+        'frequence_cardiaque_moy': mesures['fc_moy'],
+        'frequence_cardiaque_max': mesures['fc_max'],
+        'vitesse_moy': mesures['vitesse_ms'] * 3.6,
+        'elevation_m': mesures['denivele_m'],
+        'notes': notes
+    }
+
+
+def _lire_fichier_trace(fichier):
+    format_trace = os.path.splitext(fichier.name)[1].lstrip('.').upper() or 'GPX'
+    return [lire_trace(fichier, fichier.name, format_trace)]
+
+
+def importer_traces(fichiers, tampon, dedoublonner=True):
+    """
+    Importe des fichiers GPX/TCX (une séance par fichier) dans le tampon.
+    Renvoie (séances importées, doublons ignorés, {nom de fichier: erreur}).
+    """
+    return importer_fichiers(fichiers, _lire_fichier_trace, tampon, (ValueError, ET.ParseError), dedoublonner)